@@ -1,17 +1,95 @@
+"""
+SQLAlchemy engines and sessions for the users table.
+
+DATABASE_URL picks the database (default: SQLite file in the backend folder):
+
+    DATABASE_URL=sqlite:///./aether.db
+    DATABASE_URL=postgresql://aether:secret@db:5432/aether     # needs psycopg2 and asyncpg
+
+The async engine used by the auth routes is derived from it (sqlite+aiosqlite,
+postgresql+asyncpg); set ASYNC_DATABASE_URL to use another driver.
+"""
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# Use an SQLite database stored in the backend directory
-DATABASE_URL = "sqlite:///./aether.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aether.db")
+
+# Connection pool tuning (ignored for in-memory SQLite)
+POOL_SIZE = int(os.getenv("AETHER_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("AETHER_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.getenv("AETHER_DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("AETHER_DB_POOL_RECYCLE", "1800"))
+# How long SQLite waits for a competing writer before "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("AETHER_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """The same database addressed through an asyncio driver."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.drivername}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
 
-# Create the SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
 
-# Create a scoped session factory
+def _is_memory(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    if _is_sqlite(url):
+        options = {"connect_args": {"check_same_thread": False}}
+        if _is_memory(url):
+            return options
+    else:
+        # Server databases drop idle connections; check before handing one out
+        options = {"pool_pre_ping": True, "pool_recycle": POOL_RECYCLE}
+    options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+    return options
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside the single writer, NORMAL only fsyncs at
+    checkpoints (still durable against application crashes) and busy_timeout
+    makes a second writer wait instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# Create the SQLAlchemy engines
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+
+if _is_sqlite(DATABASE_URL) and not _is_memory(DATABASE_URL):
+    event.listen(engine, "connect", _sqlite_pragmas)
+if _is_sqlite(ASYNC_DATABASE_URL) and not _is_memory(ASYNC_DATABASE_URL):
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: objects stay readable after the session is gone
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
 
 # Base class for declarative models
 Base = declarative_base()
@@ -22,3 +100,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,74 @@
+"""
+Bulk-loads meeting transcripts into AETHER's memory store.
+
+    python import_memories.py archive.jsonl --user alice
+    cat archive.jsonl | python import_memories.py - --user alice
+    python import_memories.py archive.jsonl --user alice --summarize
+
+Each line is {"text": "...", "meeting_id": "...", "timestamp": "ISO-8601"} (only
+"text" is required). Run from the backend folder, like main.py, so the same
+./chroma_db (or AETHER_CHROMA_PATH) is used. Transcripts already stored are skipped.
+No LLM is called unless --summarize is given, which then builds the memory
+summaries and rollups (services/summary_store.py) for the imported transcripts.
+"""
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+from services.memory_service import MemoryService
+from services.bulk_import import BULK_BATCH_SIZE, ImportStats, parse_line
+
+load_dotenv(dotenv_path="../.env")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import meeting transcripts from JSONL.")
+    parser.add_argument("path", help="JSONL file, or - for stdin")
+    parser.add_argument("--user", default="guest", help="username that will own the memories")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--summarize", action="store_true", help="summarize the imported transcripts afterwards")
+    args = parser.parse_args()
+
+    memory_service = MemoryService()
+    stats = ImportStats()
+    memory_ids = []
+    source = sys.stdin if args.path == "-" else open(args.path, "r", encoding="utf-8")
+
+    def ingest(batch):
+        result = memory_service.add_memories(batch, args.user, summarize=False)
+        stats.record(result)
+        memory_ids.extend(result["memory_ids"])
+        print(f"\r{stats.progress_line()}", end="", flush=True)
+
+    # One writer thread: the next batch is parsed while the previous one is embedded
+    with source, ThreadPoolExecutor(max_workers=1) as writer:
+        in_flight = None
+        batch = []
+        for line in source:
+            item = parse_line(line)
+            if item is None:
+                if line.strip():
+                    stats.invalid += 1
+                continue
+            stats.received += 1
+            batch.append(item)
+            if len(batch) >= args.batch_size:
+                if in_flight:
+                    in_flight.result()
+                in_flight = writer.submit(ingest, batch)
+                batch = []
+        if in_flight:
+            in_flight.result()
+        if batch:
+            ingest(batch)
+
+    print()
+    print(f"Done: {stats.as_dict()}")
+    if args.summarize:
+        # Already summarized memories are skipped, so a re-run only pays for what's missing
+        print(f"Summaries: {memory_service.refresh_summaries(args.user, memory_ids)}")
+
+
+if __name__ == "__main__":
+    main()
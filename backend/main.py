@@ -1,25 +1,68 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, File, UploadFile, Depends, Query, Header, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 import os
-import traceback
-import shutil
+import json
+import asyncio
+import time
+import re
+import math
+import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import List, Optional
 from dotenv import load_dotenv
 
-# Import your services
-from services.memory_service import MemoryService
-from services.calendar_service import CalendarService
-from services.audio_service import AudioService
-from services.google_calendar_service import GoogleCalendarService
+# Import your services (built lazily, see services/providers.py)
+from services import providers
+from services.providers import ServiceUnavailable
+from services.concurrency import run_in_pool, shutdown_pools
+from services.metrics import registry, stage, start_profile, server_timing
+from services.llm_gateway import gateway as llm_gateway
+from services.logging_setup import configure_logging, request_id
+from services.job_service import JobQueue, TERMINAL_STATES
+from services.bulk_import import BULK_BATCH_SIZE, ImportStats, aiter_lines, parse_line
+from services.live_transcription import LiveSegmenter, pcm16_to_float
+from services.audio_preprocess import TARGET_RATE, to_mono_16k
 
 # 1. Load environment variables from the root PA folder
 load_dotenv(dotenv_path="../.env") 
 
-app = FastAPI(title="AETHER Executive Assistant API")
+configure_logging()
+logger = logging.getLogger("aether.api")
+
+# Build every service and load the embedding model in the background after
+# startup; set to 0 to build each service on its first request instead
+WARMUP_ENABLED = os.getenv("AETHER_WARMUP", "1") != "0"
+warm_up_state = {"status": "pending" if WARMUP_ENABLED else "disabled", "errors": {}, "ms": None}
+
+def _warm_up():
+    warm_up_state["status"] = "running"
+    started = time.perf_counter()
+    warm_up_state["errors"] = providers.warm_up()
+    warm_up_state["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    warm_up_state["status"] = "failed" if warm_up_state["errors"] else "done"
+    for name, error in warm_up_state["errors"].items():
+        logger.warning("Warm-up failed", extra={"service": name, "error": error})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    warm_up = asyncio.ensure_future(run_in_pool("chroma", _warm_up)) if WARMUP_ENABLED else None
+    try:
+        yield
+    finally:
+        if warm_up:
+            warm_up.cancel()
+        await job_queue.stop()
+        await async_engine.dispose()
+        shutdown_pools(wait=False)
+
+app = FastAPI(title="AETHER Executive Assistant API", lifespan=lifespan)
 
 # 2. CORS Configuration for React (Port 3000)
 app.add_middleware(
@@ -30,33 +73,103 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Services
-memory_service = MemoryService()
-calendar_service = CalendarService()
-audio_service = AudioService()
-google_calendar_service = GoogleCalendarService()
+# Any client may send "X-Aether-Profile: 1" and get a Server-Timing stage breakdown back;
+# set to 0 to ignore the header (the timings are still recorded in /metrics)
+PROFILE_HEADER_ENABLED = os.getenv("AETHER_PROFILE_HEADER", "1") != "0"
+
+HTTP_REQUESTS = registry.counter("aether_http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+HTTP_SECONDS = registry.histogram("aether_http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge("aether_http_requests_in_flight", "HTTP requests being served.")
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    Times every request under its route template (not the raw path, which would
+    explode the label space), tags log lines with a request id and, on request,
+    returns the per-stage profile in a Server-Timing header.
+    """
+    request_id.set(request.headers.get("x-request-id") or os.urandom(8).hex())
+    profile = start_profile() if PROFILE_HEADER_ENABLED and request.headers.get("x-aether-profile") else None
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        HTTP_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        template = getattr(route, "path", "unmatched")
+        HTTP_SECONDS.observe(elapsed, method=request.method, route=template)
+        HTTP_REQUESTS.inc(method=request.method, route=template, status=status_code)
+    response.headers["X-Request-ID"] = request_id.get()
+    if profile is not None:
+        response.headers["Server-Timing"] = server_timing(profile, elapsed)
+    return response
+
+@app.exception_handler(ServiceUnavailable)
+async def service_unavailable(request: Request, exc: ServiceUnavailable):
+    # LLMUnavailable carries the provider's retry-after when it sent one
+    retry_after = getattr(exc, "retry_after", None) or 5
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": str(math.ceil(retry_after))})
+
+# Service dependencies: the first caller builds the instance, everyone after shares it
+def get_memory_service():
+    return providers.memory.get()
 
-from database import engine, SessionLocal, Base
-from sqlalchemy.orm import Session
+def get_calendar_service():
+    return providers.calendar.get()
+
+def get_audio_service():
+    return providers.audio.get()
+
+def get_google_calendar_service():
+    return providers.google_calendar.get()
+
+from database import engine, async_engine, AsyncSessionLocal
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 import models
-from services.auth_service import AuthService
+from services.auth_service import AuthService, hash_password, check_password
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
 auth_service = AuthService()
 
-# Dependency for DB
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# One short async session per query rather than a request-scoped one: no
+# connection is held while a request waits for bcrypt, so a login storm
+# cannot drain the connection pool
+async def _lookup_user(username: str):
+    with stage("db.select_user"):
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(models.User).where(models.User.username == username))
+
+async def _create_user(username: str, hashed_password: str):
+    """Inserts the user; returns None if the name was taken in the meantime."""
+    with stage("db.insert_user"):
+        async with AsyncSessionLocal() as db:
+            new_user = models.User(username=username, hashed_password=hashed_password)
+            db.add(new_user)
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                return None
+            return new_user
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Resolves the bearer token to the signed-in user. Tokens seen before are
+    answered from auth_service's token cache without a JWT decode or a query.
+    """
+    cached = auth_service.cached_user(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -68,34 +181,38 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.username == username).first()
+    generation = auth_service.token_cache.generation(username)
+    user = await _lookup_user(username)
     if user is None:
         raise credentials_exception
-    return user
+    return auth_service.remember_user(token, payload, user, generation)
 
 class UserCreate(BaseModel):
     username: str
     password: str
 
 @app.post("/api/signup")
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.User).filter(models.User.username == user.username).first()
-    if db_user:
+async def signup(user: UserCreate):
+    if await _lookup_user(user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    hashed_password = auth_service.get_password_hash(user.password)
-    new_user = models.User(username=user.username, hashed_password=hashed_password)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    with stage("bcrypt"):
+        hashed_password = await run_in_pool("bcrypt", hash_password, user.password)
+    new_user = await _create_user(user.username, hashed_password)
+    if new_user is None:
+        raise HTTPException(status_code=400, detail="Username already registered")
+    auth_service.invalidate_user(new_user.username)
     
     access_token = auth_service.create_access_token(data={"sub": new_user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not auth_service.verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    user = await _lookup_user(form_data.username)
+    if user:
+        with stage("bcrypt"):
+            valid = await run_in_pool("bcrypt", check_password, form_data.password, user.hashed_password)
+    if not user or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -105,6 +222,10 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     access_token = auth_service.create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.get("/api/me")
+async def read_me(current_user=Depends(get_current_user)):
+    return {"id": current_user.id, "username": current_user.username}
+
 class CalendarEvent(BaseModel):
     title: str
     date: str
@@ -112,18 +233,41 @@ class CalendarEvent(BaseModel):
     description: str
 
 @app.post("/api/sync-calendar")
-async def sync_calendar(event: CalendarEvent):
+async def sync_calendar(event: CalendarEvent, google_calendar_service=Depends(get_google_calendar_service)):
     """
     Inserts an event into the user's Google Calendar.
     """
     try:
-        result = google_calendar_service.create_event(event.dict())
+        result = await run_in_pool("google", google_calendar_service.create_event, event.dict())
         if result["status"] == "success":
             return result
         else:
             return JSONResponse(status_code=400, content=result)
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Calendar sync failed")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+class CalendarBatchRequest(BaseModel):
+    # Events as returned by /process-transcript; each one is validated on its own
+    calendar_events: List[dict]
+
+@app.post("/api/sync-calendar/batch")
+async def sync_calendar_batch(request: CalendarBatchRequest, google_calendar_service=Depends(get_google_calendar_service)):
+    """
+    Inserts all extracted events with batched Calendar API requests (up to 50
+    per HTTP round-trip) and reports a result for every event, in order.
+    """
+    if not request.calendar_events:
+        return {"status": "success", "created": 0, "failed": 0, "results": []}
+    try:
+        results = await run_in_pool("google", google_calendar_service.create_events, request.calendar_events)
+        if results is None:
+            return JSONResponse(status_code=400, content={"status": "error", "message": "Authentication required"})
+        created = sum(1 for r in results if r["status"] == "success")
+        status = "success" if created == len(results) else ("partial" if created else "error")
+        return {"status": status, "created": created, "failed": len(results) - created, "results": results}
+    except Exception as e:
+        logger.exception("Batch calendar sync failed")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 class TranscriptRequest(BaseModel):
@@ -135,97 +279,570 @@ class TranscriptRequest(BaseModel):
 async def root():
     return {"message": "AETHER Backend is Active on Port 8005"}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving. Never touches a dependency."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: 200 once the required services are built and the embedding
+    model is loaded (or, with warm-up disabled, as long as none has failed).
+    Reports the state without building anything itself.
+    """
+    services = {provider.name: provider.status() for provider in providers.ALL}
+    required = [provider for provider in providers.ALL if provider.required]
+    if WARMUP_ENABLED:
+        memory_loaded = providers.memory.ready and providers.memory.get().embeddings_ready
+        ready = memory_loaded and all(provider.ready for provider in required)
+    else:
+        ready = not any(provider.error for provider in required)
+    if ready:
+        state = "ready"
+    else:
+        state = "starting" if warm_up_state["status"] in ("pending", "running") else "unavailable"
+    body = {"status": state, "services": services, "warm_up": warm_up_state}
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+# Long recordings are split into chunks well under Whisper's 25 MB limit, so
+# this only guards the server itself; refuse bigger bodies before decoding them.
+# Uploads are decoded in blocks straight to 16 kHz mono (services/audio_preprocess.py),
+# so a request holds ~4 MB per minute of audio whatever the source format
+MAX_AUDIO_BYTES = int(os.getenv("AETHER_MAX_AUDIO_BYTES", str(200 * 1024 * 1024)))
+
+def _safe_audio_name(filename: Optional[str]) -> str:
+    """Only the extension matters to Whisper; never trust the client's path."""
+    extension = os.path.splitext(os.path.basename(filename or ""))[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,5}", extension):
+        extension = ".wav"
+    return f"audio{extension}"
+
 @app.post("/api/transcribe")
-async def transcribe_audio(file: UploadFile = File(...), user_id: str = "guest"):
+async def transcribe_audio(file: UploadFile = File(...), user_id: str = "guest", audio_service=Depends(get_audio_service)):
     """
-    Handles raw audio blobs from the React frontend, 
-    saves them temporarily, and sends them to Groq Whisper.
+    Handles raw audio blobs from the React frontend and sends them to Groq Whisper.
+    The upload is streamed from Starlette's spooled buffer (memory for small blobs,
+    an anonymous temp file above the threshold), so concurrent uploads never share
+    a path and nothing is left in the working directory.
     """
-    # Use a unique name to avoid permission errors if a previous process crashed
-    temp_file_path = f"active_session_{file.filename}" if file.filename else "active_session.wav"
-    
     try:
-        # Save the incoming audio stream to disk
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Send the local file path to the Groq Audio Service
-        transcript = audio_service.transcribe_audio(temp_file_path)
+        size = file.size
+        if size is None:
+            file.file.seek(0, os.SEEK_END)
+            size = file.file.tell()
+        if size > MAX_AUDIO_BYTES:
+            return JSONResponse(
+                status_code=413,
+                content={"error": f"Audio exceeds the {MAX_AUDIO_BYTES // (1024 * 1024)} MB limit"},
+            )
+        file.file.seek(0)
+
+        transcript, report = await run_in_pool(
+            "whisper", audio_service.transcribe_audio_with_report, file.file, _safe_audio_name(file.filename)
+        )
         
         if transcript:
-            return {"transcript": transcript}
+            return {"transcript": transcript, "preprocessing": report}
         else:
-            # This happens if Groq is reached but the audio was silent/corrupt
-            return {"transcript": "[Unintelligible Audio or Silence]"}
+            # Silent blobs are caught locally; otherwise Groq found nothing intelligible
+            return {"transcript": "[Unintelligible Audio or Silence]", "preprocessing": report}
             
+    except ServiceUnavailable:
+        raise
     except Exception as e:
-        print("--- BACKEND CRASH LOG ---")
-        traceback.print_exc()
+        logger.exception("Transcription failed")
         return JSONResponse(status_code=500, content={"error": str(e)})
     
     finally:
-        # Crucial: Close and delete the file so Port 8005 doesn't lock up
-        if os.path.exists(temp_file_path):
+        await file.close()
+
+@app.websocket("/ws/transcribe")
+async def live_transcribe(
+    websocket: WebSocket,
+    user_id: str = "guest",
+    meeting_id: str = "live_session",
+    sample_rate: int = TARGET_RATE,
+    memorize: bool = False,
+    extract_calendar: bool = False,
+):
+    """
+    Live transcription. The client streams binary frames of mono 16-bit PCM
+    (16 kHz unless sample_rate says otherwise) and sends {"type": "stop"} when done.
+    Each pause closes a segment, which is transcribed while audio keeps arriving:
+      {"type": "partial", "segment", "text"}    the open segment's speech since its last partial
+      {"type": "final", "segment", "text", "start", "end", "latency_ms"}
+      {"type": "calendar_events", "segment", "events"}   with extract_calendar=true
+      {"type": "calendar_error", "segment", "message"}   extraction was rate limited
+      {"type": "memorized", "segment", "memory_id"}      with memorize=true
+      {"type": "end", "segments"}
+    Finals are sent in segment order even when later segments finish first.
+    """
+    await websocket.accept()
+    try:
+        audio_service = await run_in_threadpool(get_audio_service)
+        memory_service = await run_in_threadpool(get_memory_service) if memorize else None
+        calendar_service = await run_in_threadpool(get_calendar_service) if extract_calendar else None
+    except ServiceUnavailable as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close(code=1011)
+        return
+    segmenter = LiveSegmenter()
+    finals = asyncio.Queue()
+    finalized = set()
+    follow_ups = set()
+    send_lock = asyncio.Lock()
+    partial_task = None
+    current_date = datetime.now().strftime("%A, %B %d, %Y")
+
+    async def send(event):
+        async with send_lock:
+            await websocket.send_json(event)
+
+    def submit(segment):
+        closed_at = time.perf_counter()
+        task = asyncio.ensure_future(run_in_pool("whisper", audio_service.transcribe_samples, segment["samples"]))
+        finals.put_nowait((segment, closed_at, task))
+
+    async def partial(index, samples):
+        text = await run_in_pool("whisper", audio_service.transcribe_samples, samples)
+        async with send_lock:
+            # A partial that lost the race with its segment's final is stale
+            if text and index not in finalized:
+                await websocket.send_json({"type": "partial", "segment": index, "text": text.strip()})
+
+    async def follow_up(index, text):
+        # Same work /process-transcript does, one finished segment at a time
+        if memorize:
+            memory_id = await run_in_pool("chroma", memory_service.add_memory, text, meeting_id, user_id)
+            await send({"type": "memorized", "segment": index, "memory_id": memory_id})
+        if extract_calendar:
             try:
-                os.remove(temp_file_path)
-            except:
-                pass
+                events = await run_in_pool("groq", calendar_service.extract_calendar_intent, text, current_date)
+            except ServiceUnavailable as e:
+                await send({"type": "calendar_error", "segment": index, "message": str(e)})
+                return
+            if events:
+                await send({"type": "calendar_events", "segment": index, "events": events})
+
+    async def deliver():
+        while True:
+            item = await finals.get()
+            if item is None:
+                return
+            segment, closed_at, task = item
+            text = ((await task) or "").strip()
+            finalized.add(segment["index"])
+            await send({
+                "type": "final",
+                "segment": segment["index"],
+                "text": text,
+                "start": segment["start"],
+                "end": segment["end"],
+                "latency_ms": round((time.perf_counter() - closed_at) * 1000, 1),
+            })
+            if text and (memorize or extract_calendar):
+                task = asyncio.ensure_future(follow_up(segment["index"], text))
+                follow_ups.add(task)
+                task.add_done_callback(follow_ups.discard)
+
+    deliverer = asyncio.ensure_future(deliver())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                samples = pcm16_to_float(message["bytes"])
+                if sample_rate != TARGET_RATE:
+                    samples = to_mono_16k(samples, sample_rate)
+                for segment in segmenter.feed(samples):
+                    submit(segment)
+                if segmenter.partial_due() and (partial_task is None or partial_task.done()):
+                    partial_task = asyncio.ensure_future(partial(*segmenter.snapshot()))
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if control.get("type") == "stop":
+                    break
+
+        segment = segmenter.flush()
+        if segment:
+            submit(segment)
+        finals.put_nowait(None)
+        await deliverer
+        await asyncio.gather(*follow_ups)
+        if partial_task:
+            partial_task.cancel()
+        await send({"type": "end", "segments": segmenter.segment_index})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.exception("Live transcription failed")
+        try:
+            await send({"type": "error", "message": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        deliverer.cancel()
+        for task in list(follow_ups) + ([partial_task] if partial_task else []):
+            task.cancel()
+
+async def run_transcript_pipeline(request: TranscriptRequest, user_id: str, job=None):
+    """
+    Memory sync and calendar extraction are independent, so they run side by side.
+    When a job is given, each stage's duration is recorded on it.
+    """
+    # Outside dependency injection; the first call builds the services off the event loop
+    memory_service = await run_in_threadpool(get_memory_service)
+    calendar_service = await run_in_threadpool(get_calendar_service)
+    # We pass the current date to fix the "null" time issue
+    current_date = datetime.now().strftime("%A, %B %d, %Y")
+
+    async def timed(name, coroutine):
+        if job is None:
+            return await coroutine
+        async with job.stage(name):
+            return await coroutine
+
+    async def memory_sync():
+        # 1. Memory Sync (ChromaDB)
+        if not request.ghost_mode:
+            await run_in_pool("chroma", memory_service.add_memory, request.text, request.meeting_id, user_id)
+
+    # 2. Intelligence Layer (Groq Llama 3)
+    _, calendar_events = await asyncio.gather(
+        timed("memory_sync", memory_sync()),
+        timed("calendar_extraction", run_in_pool("groq", calendar_service.extract_calendar_intent, request.text, current_date)),
+    )
+    return {
+        "status": "success",
+        "transcript": request.text,
+        "calendar_events": calendar_events
+    }
+
+async def _transcript_job(job):
+    request, user_id = job.payload
+    return await run_transcript_pipeline(request, user_id, job)
+
+job_queue = JobQueue(handlers={"process_transcript": _transcript_job})
 
 @app.post("/process-transcript")
-async def process_transcript(request: TranscriptRequest, user_id: str = "guest"):
+async def process_transcript(
+    request: TranscriptRequest,
+    user_id: str = "guest",
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+    prefer: Optional[str] = Header(None),
+):
     """
     Takes the text transcript and extracts Action Items using Llama 3.
+    With mode=async (or "Prefer: respond-async") the work is queued and a 202 with
+    a job id is returned at once; poll /api/jobs/{id} or stream /api/jobs/{id}/events.
     """
+    if mode == "async" or (prefer and "respond-async" in prefer.lower()):
+        try:
+            job = job_queue.submit("process_transcript", (request, user_id))
+        except asyncio.QueueFull:
+            return JSONResponse(
+                status_code=503,
+                content={"error": "Too many pending jobs, retry shortly"},
+                headers={"Retry-After": "2"},
+            )
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/jobs/{job.id}",
+                "events_url": f"/api/jobs/{job.id}/events",
+            },
+            headers={"Location": f"/api/jobs/{job.id}"},
+        )
+
     try:
-        # 1. Memory Sync (ChromaDB)
-        if not request.ghost_mode:
-            memory_service.add_memory(request.text, request.meeting_id, user_id)
-        
-        # 2. Intelligence Layer (Groq Llama 3)
-        # We pass the current date to fix the "null" time issue
-        current_date = datetime.now().strftime("%A, %B %d, %Y")
-        calendar_events = calendar_service.extract_calendar_intent(request.text, current_date)
-        
-        return {
-            "status": "success",
-            "transcript": request.text,
-            "calendar_events": calendar_events
-        }
+        return await run_transcript_pipeline(request, user_id)
+    except ServiceUnavailable:
+        raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Transcript processing failed")
         return JSONResponse(status_code=500, content={"error": "AI Processing failed"})
 
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Current state, per-stage timings and (once finished) the result of a job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events: one 'update' per state or stage change, ending with 'done'."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        seen = -1
+        while True:
+            if job.version != seen:
+                seen = job.version
+                finished = job.status in TERMINAL_STATES
+                event = "done" if finished else "update"
+                yield f"event: {event}\ndata: {json.dumps(job.to_dict())}\n\n"
+                if finished:
+                    return
+            elif not await job_queue.wait_for_change(job, seen):
+                # Keep proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/api/memories/bulk")
+async def bulk_import_memories(
+    request: Request,
+    user_id: str = "guest",
+    extract_calendar: bool = False,
+    summarize: bool = False,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=5000),
+    memory_service=Depends(get_memory_service),
+):
+    """
+    Backfills meeting archives from a JSONL body, one {"text", "meeting_id", "timestamp"?}
+    per line. The body is streamed and written in batches, with the next batch parsed
+    while the previous one is being embedded. Duplicates are skipped by content hash;
+    calendar extraction only runs when extract_calendar=true, and background
+    summaries (services/summary_store.py) only when summarize=true.
+    """
+    calendar_service = await run_in_threadpool(get_calendar_service) if extract_calendar else None
+    stats = ImportStats()
+    calendar_events = []
+    current_date = datetime.now().strftime("%A, %B %d, %Y")
+    in_flight = None
+
+    async def ingest(batch):
+        result = await run_in_pool("chroma", memory_service.add_memories, batch, user_id, summarize)
+        stats.record(result)
+        if extract_calendar:
+            found = await asyncio.gather(*(
+                run_in_pool("groq", calendar_service.extract_calendar_intent, item["text"], current_date)
+                for item in batch
+            ))
+            for item, events in zip(batch, found):
+                if events:
+                    calendar_events.append({"meeting_id": item["meeting_id"], "calendar_events": events})
+        logger.info("Bulk import progress", extra={"user_id": user_id, **stats.as_dict()})
+
+    try:
+        batch = []
+        async for line in aiter_lines(request.stream()):
+            item = parse_line(line)
+            if item is None:
+                if line.strip():
+                    stats.invalid += 1
+                continue
+            stats.received += 1
+            batch.append(item)
+            if len(batch) >= batch_size:
+                # At most one batch being written and one being parsed
+                if in_flight:
+                    await in_flight
+                in_flight = asyncio.ensure_future(ingest(batch))
+                batch = []
+        if in_flight:
+            await in_flight
+        if batch:
+            await ingest(batch)
+
+        response = {"status": "success", **stats.as_dict()}
+        if extract_calendar:
+            response["calendar_events"] = calendar_events
+        return response
+    except Exception as e:
+        logger.exception("Bulk import failed")
+        if in_flight and not in_flight.done():
+            in_flight.cancel()
+        return JSONResponse(status_code=500, content={"error": "Bulk import failed", **stats.as_dict()})
+
+@app.get("/api/memories/export")
+async def export_memories(current_user=Depends(get_current_user), memory_service=Depends(get_memory_service)):
+    """
+    Streams all of the signed-in user's memories as JSONL in the bulk-import format,
+    so the export can be fed straight back into /api/memories/bulk or import_memories.py.
+    """
+    def stream():
+        for record in memory_service.export_memories(current_user.username):
+            yield json.dumps(record) + "\n"
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="aether-memories.jsonl"'},
+    )
+
+@app.delete("/api/memories")
+async def delete_memories(current_user=Depends(get_current_user), memory_service=Depends(get_memory_service)):
+    """Deletes every memory of the signed-in user; only that user's partition is touched."""
+    try:
+        removed = await run_in_pool("chroma", memory_service.delete_user, current_user.username)
+        return {"status": "deleted", "memories_removed": removed}
+    except Exception as e:
+        logger.exception("Memory deletion failed")
+        return JSONResponse(status_code=500, content={"error": "Delete failed"})
+
 @app.get("/api/analytics")
-async def get_analytics(user_id: str = "guest"):
+async def get_analytics(
+    user_id: str = "guest",
+    mode: Optional[str] = Query(None, pattern="^(llm|local)$"),
+    name_themes: bool = False,
+    memory_service=Depends(get_memory_service),
+):
     """
     Returns the top 5 recurring themes from all stored meeting memories.
+    Served from the per-user cache unless new meetings have been added.
+    mode=local clusters the stored embeddings instead of prompting the LLM.
     """
     try:
-        analytics = memory_service.get_analytics(user_id)
-        total_meetings = len(memory_service.get_all_memories(user_id))
-        analytics["totalMeetings"] = total_meetings
-        return analytics
+        return await run_in_pool("groq", memory_service.get_analytics, user_id, mode, name_themes)
+    except ServiceUnavailable:
+        raise
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Analytics failed")
         return JSONResponse(status_code=500, content={"error": "Analytics failed"})
 
+@app.get("/api/cache-stats")
+async def cache_stats(memory_service=Depends(get_memory_service), calendar_service=Depends(get_calendar_service)):
+    """Hit rates and sizes of the search, extraction and auth token caches."""
+    return {
+        **memory_service.cache_stats(),
+        "calendar_extractions": calendar_service.cache.stats(),
+        "auth_tokens": auth_service.token_cache.stats(),
+    }
+
+@app.get("/api/llm-stats")
+async def llm_stats():
+    """Per-model adaptive limits, queue depth and wait times from the LLM gateway."""
+    return llm_gateway.stats()
+
+CACHE_HITS = registry.gauge("aether_cache_hits", "Cache hits since start.", ("cache",))
+CACHE_MISSES = registry.gauge("aether_cache_misses", "Cache misses since start.", ("cache",))
+CACHE_HIT_RATIO = registry.gauge("aether_cache_hit_ratio", "Cache hits / lookups since start.", ("cache",))
+CACHE_ENTRIES = registry.gauge("aether_cache_entries", "Entries currently cached.", ("cache",))
+PREFILTER_SKIPS = registry.gauge("aether_intent_prefilter_skips", "Transcripts the intent pre-filter kept away from the LLM.")
+JOBS_QUEUED = registry.gauge("aether_jobs_queued", "Background jobs waiting for a worker.")
+
+def _collect_service_stats():
+    """Copies cache counters into gauges at scrape time; services that aren't built yet are skipped."""
+    caches = {"auth_tokens": auth_service.token_cache.stats()}
+    if providers.memory.ready:
+        caches.update(providers.memory.get().cache_stats())
+    if providers.calendar.ready:
+        calendar_service = providers.calendar.get()
+        extraction = calendar_service.cache.stats()
+        caches["calendar_extractions"] = {
+            "hits": extraction["memory_hits"] + extraction["disk_hits"],
+            "misses": extraction["misses"],
+            "hit_rate": extraction["hit_rate"],
+            "entries": extraction["entries_in_memory"],
+        }
+        PREFILTER_SKIPS.set(calendar_service.prefilter_skips)
+    for name, stats in caches.items():
+        CACHE_HITS.set(stats["hits"], cache=name)
+        CACHE_MISSES.set(stats["misses"], cache=name)
+        CACHE_HIT_RATIO.set(stats["hit_rate"], cache=name)
+        CACHE_ENTRIES.set(stats["entries"], cache=name)
+    JOBS_QUEUED.set(job_queue.depth)
+
+registry.add_collector(_collect_service_stats)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: route and stage latencies, LLM tokens, caches, in-flight gauges."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+def _parse_when(value: Optional[str], end_of_day: bool = False) -> Optional[float]:
+    """Epoch seconds from an ISO date/datetime or a number; a bare 'until' date covers that whole day."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    moment = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        moment = moment.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return moment.timestamp()
+
 @app.get("/flashbacks")
-async def get_flashbacks(query: str, user_id: str = "guest"):
+async def get_flashbacks(
+    query: str,
+    user_id: str = "guest",
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: str = Query("full", pattern="^(full|snippet|ids)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    n_results: int = Query(3, ge=1, le=50),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    meeting_id: Optional[str] = None,
+    level: Optional[str] = Query(None, pattern="^(memory|meeting|week|month)$"),
+    memory_service=Depends(get_memory_service),
+):
     """
-    Retrieves meeting memories. If query is 'all', returns every stored memory.
-    Otherwise, performs a semantic search.
+    Retrieves meeting memories. If query is 'all', returns stored memories newest first:
+    paged with limit/cursor, streamed as NDJSON with format=ndjson, or the whole
+    history when neither is given. Otherwise, runs a hybrid keyword + semantic search
+    for the n_results best transcripts, optionally restricted to a meeting_id and a
+    since/until window (ISO dates or epoch seconds).
+    With level=memory|meeting|week|month the same lookups run over the stored
+    per-memory summaries or the meeting/weekly/monthly rollups instead of the transcripts.
     """
     try:
+        window = (_parse_when(since), _parse_when(until, end_of_day=True))
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "since/until must be ISO dates or epoch seconds"})
+
+    try:
+        if level:
+            if query == "all":
+                results = await run_in_pool("chroma", memory_service.list_summaries, user_id, level)
+            else:
+                results = await run_in_pool(
+                    "chroma", memory_service.search_summaries, query, user_id, level, n_results
+                )
+            return {"flashbacks": results}
+
         if query == "all":
-            results = memory_service.get_all_memories(user_id)
+            if format == "ndjson":
+                def stream():
+                    for memory in memory_service.iter_memories(user_id, fields=fields):
+                        yield json.dumps(memory) + "\n"
+                return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+            if limit is not None or cursor:
+                if cursor:
+                    try:
+                        memory_service.decode_cursor(cursor)
+                    except (ValueError, TypeError):
+                        return JSONResponse(status_code=400, content={"error": "Invalid cursor"})
+                page = await run_in_pool(
+                    "chroma", memory_service.list_memories, user_id, limit or 50, cursor, fields
+                )
+                return {"flashbacks": page["items"], "next_cursor": page["next_cursor"]}
+
+            results = await run_in_pool("chroma", memory_service.get_all_memories, user_id)
         else:
-            # Semantic search returns a list of texts, convert to match the "all" format
-            search_results = memory_service.search_memories(query, user_id)
-            results = [{"text": text, "metadata": {}} for text in search_results]
+            # One result per transcript, with its best-matching passage as the text
+            results = await run_in_pool(
+                "chroma", memory_service.search_memories, query, user_id, n_results, *window, meeting_id
+            )
             
         return {"flashbacks": results}
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Flashback lookup failed")
         return JSONResponse(status_code=500, content={"error": "Failed to fetch flashbacks"})
 
 # ... (Keep all your imports and app.post routes exactly as they are)
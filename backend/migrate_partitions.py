@@ -0,0 +1,111 @@
+"""
+Moves memories out of the shared "meeting_memories" collection into the
+partitioned layout MemoryService uses (one collection per user by default).
+
+    python migrate_partitions.py                      # per-user collections
+    python migrate_partitions.py --strategy bucket --buckets 64
+    python migrate_partitions.py --dry-run            # only report what would move
+    python migrate_partitions.py --drop-source        # delete the shared collection afterwards
+
+Run from the backend folder, like main.py, so the same ./chroma_db is used.
+Stored embeddings are copied as they are, nothing is re-embedded, and rows
+are upserted by id, so an interrupted migration can simply be run again.
+While the shared collection has rows, MemoryService keeps using it unless
+AETHER_PARTITIONING is set, so run with --drop-source to switch over.
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter, defaultdict
+
+import chromadb
+
+from services.embeddings import make_embedding_function
+from services.partitioning import collection_name, LEGACY_COLLECTION, PARTITION_BUCKETS, STRATEGIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition the shared memory collection per user.")
+    parser.add_argument("--path", default=os.getenv("AETHER_CHROMA_PATH", "./chroma_db"), help="Chroma persistence directory")
+    parser.add_argument("--strategy", choices=[s for s in STRATEGIES if s != "shared"], default="user")
+    parser.add_argument("--buckets", type=int, default=PARTITION_BUCKETS, help="collections for --strategy bucket")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="count rows per target, write nothing")
+    parser.add_argument("--drop-source", action="store_true", help="delete the shared collection once copied")
+    args = parser.parse_args()
+
+    client = chromadb.PersistentClient(path=args.path)
+    try:
+        source = client.get_collection(LEGACY_COLLECTION)
+    except Exception:
+        print(f"No '{LEGACY_COLLECTION}' collection in {args.path}; nothing to migrate.")
+        return
+
+    embedding_function = make_embedding_function()
+    targets = {}
+    per_target = Counter()
+    users = set()
+    orphans = 0
+    total = source.count()
+    started = time.perf_counter()
+    include = ["metadatas"] if args.dry_run else ["documents", "metadatas", "embeddings"]
+
+    for offset in range(0, total, args.batch_size):
+        page = source.get(limit=args.batch_size, offset=offset, include=include)
+        groups = defaultdict(lambda: {"ids": [], "documents": [], "metadatas": [], "embeddings": []})
+        for n, (row_id, metadata) in enumerate(zip(page["ids"], page["metadatas"])):
+            username = (metadata or {}).get("username")
+            if not username:
+                orphans += 1
+                continue
+            users.add(username)
+            group = groups[collection_name(username, args.strategy, args.buckets)]
+            group["ids"].append(row_id)
+            group["metadatas"].append(metadata)
+            if not args.dry_run:
+                group["documents"].append(page["documents"][n])
+                group["embeddings"].append(page["embeddings"][n])
+
+        for name, group in groups.items():
+            per_target[name] += len(group["ids"])
+            if args.dry_run:
+                continue
+            target = targets.get(name)
+            if target is None:
+                target = client.get_or_create_collection(name=name, embedding_function=embedding_function)
+                targets[name] = target
+            target.upsert(**group)
+
+        done = min(offset + args.batch_size, total)
+        print(f"\r{done}/{total} rows, {len(users)} users, {len(per_target)} collections", end="", flush=True)
+
+    print()
+    report = {
+        "rows": total,
+        "users": len(users),
+        "collections": len(per_target),
+        "rows_without_username": orphans,
+        "seconds": round(time.perf_counter() - started, 2),
+        "dry_run": args.dry_run,
+    }
+    print(f"Done: {report}")
+
+    if args.drop_source and not args.dry_run:
+        if orphans:
+            # Those rows exist only in the source; keep it rather than lose them
+            print(f"Not dropping '{LEGACY_COLLECTION}': {orphans} rows have no username.")
+            sys.exit(1)
+        # Bucket collections may also hold rows written since; each needs at least what was copied into it
+        counts = {name: targets[name].count() for name in per_target}
+        short = [name for name, rows in per_target.items() if counts[name] < rows]
+        if short:
+            print(f"Not dropping '{LEGACY_COLLECTION}': {len(short)} of {len(per_target)} collections are missing rows "
+                  f"({short[0]} has {counts[short[0]]} of {per_target[short[0]]}).")
+            sys.exit(1)
+        client.delete_collection(LEGACY_COLLECTION)
+        print(f"Dropped '{LEGACY_COLLECTION}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+import io
+import os
+import time
+import shutil
+import threading
+import subprocess
+
+import numpy as np
+import soundfile as sf
+
+TARGET_RATE = 16000
+FRAME_MS = 30
+# Frames quieter than this are never speech, whatever the noise floor
+ABSOLUTE_FLOOR_DB = -50.0
+# Speech must stand this far above the estimated noise floor
+NOISE_MARGIN_DB = 12.0
+# Keep this much context around detected speech so words are not clipped
+PAD_MS = 250
+# Blobs with less detected speech than this are treated as silence
+MIN_SPEECH_MS = 200
+# "flac" is lossless, "opus" is ~10x smaller; "auto" takes whichever beats the original
+CODEC = os.getenv("AETHER_AUDIO_CODEC", "auto")
+
+
+# Seconds of audio decoded at a time; only this much ever exists at the source rate
+DECODE_BLOCK_SECONDS = 10
+# Bytes fed to / read from ffmpeg per pipe operation
+PIPE_CHUNK_BYTES = 1 << 20
+
+
+class StreamResampler:
+    """
+    Downmixes and resamples consecutive blocks to 16 kHz mono, producing the
+    same samples to_mono_16k() would for the whole signal without holding it.
+    """
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.carry = np.empty(0, dtype=np.float32)
+        # Input samples consumed so far and output samples produced so far
+        self.consumed = 0
+        self.produced = 0
+
+    def feed(self, block: np.ndarray) -> np.ndarray:
+        if block.ndim == 2:
+            block = block.mean(axis=1, dtype=np.float32)
+        block = block.astype(np.float32, copy=False)
+        if self.rate == TARGET_RATE:
+            return block
+        if self.rate % TARGET_RATE == 0:
+            factor = self.rate // TARGET_RATE
+            block = np.concatenate((self.carry, block))
+            usable = block.size - block.size % factor
+            self.carry = block[usable:]
+            return block[:usable].reshape(-1, factor).mean(axis=1).astype(np.float32)
+        # Linear interpolation; the last input sample is kept to bridge into the next block
+        first = self.consumed - self.carry.size
+        block = np.concatenate((self.carry, block))
+        self.consumed += block.size - self.carry.size
+        last = first + block.size - 1
+        count = int(np.floor(last * TARGET_RATE / self.rate)) + 1 - self.produced
+        if count <= 0 or block.size == 0:
+            self.carry = block[-1:]
+            return np.empty(0, dtype=np.float32)
+        positions = (self.produced + np.arange(count)) * (self.rate / TARGET_RATE)
+        self.produced += count
+        self.carry = block[-1:]
+        return np.interp(positions, np.arange(first, last + 1), block).astype(np.float32)
+
+
+def _size(source) -> int:
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    position = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    return position
+
+
+def _decode_with_ffmpeg(source):
+    """
+    Browser formats (WebM/Opus, MP4/AAC) need ffmpeg; returns 16 kHz mono or None.
+    The input is piped in and the output read back in chunks, so neither the
+    upload nor ffmpeg's output is ever held twice.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    source.seek(0)
+    try:
+        process = subprocess.Popen(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+             "-f", "s16le", "-ac", "1", "-ar", str(TARGET_RATE), "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+
+    def feed():
+        try:
+            while True:
+                data = source.read(PIPE_CHUNK_BYTES)
+                if not data:
+                    break
+                process.stdin.write(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    # Same 60 s ceiling the one-shot call had
+    timeout = threading.Timer(60, process.kill)
+    timeout.start()
+    blocks, pending = [], b""
+    try:
+        while True:
+            data = process.stdout.read(PIPE_CHUNK_BYTES)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % 2
+            pending = data[usable:]
+            blocks.append(np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0)
+        writer.join()
+        if process.wait() != 0:
+            return None
+    finally:
+        timeout.cancel()
+    samples = np.concatenate(blocks) if blocks else np.empty(0, dtype=np.float32)
+    return samples, TARGET_RATE
+
+
+def decode(source):
+    """
+    Decodes bytes or a seekable binary file in any format libsndfile (or
+    ffmpeg, if installed) understands, straight to 16 kHz mono in blocks of
+    DECODE_BLOCK_SECONDS, so memory follows the 16 kHz output rather than
+    the source rate and channel count. Returns (samples, TARGET_RATE) or None.
+    """
+    handle = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    handle.seek(0)
+    try:
+        with sf.SoundFile(handle) as audio:
+            resampler = StreamResampler(audio.samplerate)
+            # Preallocated for the expected length, so there is no concatenation copy at the end
+            samples = np.empty(int(audio.frames * TARGET_RATE / audio.samplerate) + 1 if audio.frames > 0 else 0,
+                               dtype=np.float32)
+            blocks, filled = [], 0
+            for block in audio.blocks(blocksize=audio.samplerate * DECODE_BLOCK_SECONDS, dtype="float32", always_2d=True):
+                out = resampler.feed(block)
+                if filled + out.size <= samples.size:
+                    samples[filled:filled + out.size] = out
+                    filled += out.size
+                else:
+                    # The header understated the length (streamed WAV, some OGG)
+                    blocks.append(out)
+        if blocks:
+            return np.concatenate([samples[:filled]] + blocks), TARGET_RATE
+        return samples[:filled], TARGET_RATE
+    except (sf.LibsndfileError, RuntimeError, TypeError, ValueError):
+        return _decode_with_ffmpeg(source)
+
+
+def to_mono_16k(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Downmixes to mono and resamples to 16 kHz (what Whisper works at internally)."""
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    if rate == TARGET_RATE or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    if rate % TARGET_RATE == 0:
+        # Integer ratio (48k/32k): block-average, which also low-passes
+        factor = rate // TARGET_RATE
+        usable = samples[: samples.size - samples.size % factor]
+        return usable.reshape(-1, factor).mean(axis=1).astype(np.float32)
+    duration = samples.size / rate
+    target_positions = np.arange(int(duration * TARGET_RATE)) / TARGET_RATE
+    return np.interp(target_positions, np.arange(samples.size) / rate, samples).astype(np.float32)
+
+
+def frame_energies_db(samples: np.ndarray, rate: int = TARGET_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames, in dBFS."""
+    frame = max(1, rate * frame_ms // 1000)
+    count = samples.size // frame
+    if count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[: count * frame].reshape(count, frame)
+    energies = np.empty(count, dtype=np.float32)
+    # In slices, so the float64 copy never spans the whole recording
+    step = 4096
+    for start in range(0, count, step):
+        part = frames[start:start + step].astype(np.float64)
+        rms = np.sqrt(np.mean(part * part, axis=1))
+        energies[start:start + step] = 20 * np.log10(np.maximum(rms, 1e-10))
+    return energies
+
+
+def voice_activity(samples: np.ndarray, rate: int = TARGET_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """
+    Energy-based VAD. A frame is voiced when it is above both the absolute
+    floor and the adaptive noise floor (10th percentile) plus a margin; the
+    mask is then dilated so short gaps inside words stay voiced.
+    """
+    energies = frame_energies_db(samples, rate, frame_ms)
+    if energies.size == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(energies, 10)
+    threshold = max(ABSOLUTE_FLOOR_DB, noise_floor + NOISE_MARGIN_DB)
+    voiced = energies > threshold
+    hangover = max(1, PAD_MS // frame_ms)
+    kernel = np.ones(2 * hangover + 1)
+    return np.convolve(voiced.astype(np.float32), kernel, mode="same") > 0
+
+
+def encode(samples: np.ndarray, codec: str):
+    """Encodes 16 kHz mono audio; returns (bytes, filename)."""
+    buffer = io.BytesIO()
+    if codec == "opus":
+        sf.write(buffer, samples, TARGET_RATE, format="OGG", subtype="OPUS")
+        return buffer.getvalue(), "audio.ogg"
+    sf.write(buffer, samples, TARGET_RATE, format="FLAC", subtype="PCM_16")
+    return buffer.getvalue(), "audio.flac"
+
+
+def split_at_silences(voiced: np.ndarray, total_samples: int, chunk_seconds: float, overlap_seconds: float = 0.5):
+    """
+    Plans chunks of at most chunk_seconds over audio with the given VAD mask.
+    Each cut goes in the middle of the longest pause found in the last 40% of
+    the window; only when there is no pause at all is speech cut mid-way. Every
+    chunk after the first starts overlap_seconds early so no word is lost at a
+    boundary. Returns [(start_sample, end_sample)].
+    """
+    frame = TARGET_RATE * FRAME_MS // 1000
+    window = max(1, int(chunk_seconds * 1000 / FRAME_MS))
+    overlap = int(overlap_seconds * TARGET_RATE)
+    total_frames = voiced.size
+
+    cuts = [0]
+    start = 0
+    while total_frames - start > window:
+        search_from = start + int(window * 0.6)
+        region = ~voiced[search_from: start + window]
+        cut = start + window
+        if region.any():
+            # Longest run of unvoiced frames in the search region
+            padded = np.concatenate(([0], region.astype(np.int8), [0]))
+            edges = np.flatnonzero(np.diff(padded))
+            runs = edges.reshape(-1, 2)
+            longest = runs[np.argmax(runs[:, 1] - runs[:, 0])]
+            cut = search_from + (longest[0] + longest[1]) // 2
+        cuts.append(cut)
+        start = cut
+    cuts.append(total_frames)
+
+    spans = []
+    for index, (first, last) in enumerate(zip(cuts, cuts[1:])):
+        begin = first * frame - (overlap if index else 0)
+        end = total_samples if last == total_frames else last * frame
+        spans.append((max(0, begin), end))
+    return spans
+
+
+def preprocess(data, filename: str = "audio.wav", encode_up_to_seconds: float = None):
+    """
+    Decode -> downmix/resample -> VAD -> trim -> re-encode.
+    data is bytes or a seekable binary file, which is decoded in blocks and
+    never read into memory whole. Returns a report dict; report["audio"] is
+    None when the blob holds no speech (so the caller can skip Whisper
+    entirely). Undecodable input is passed through unchanged.
+    Trimmed speech longer than encode_up_to_seconds is not re-encoded at all
+    (report["deferred"] is True, report["audio"] None): the caller splits
+    report["samples"] and encodes the chunks itself.
+    """
+    size = _size(data)
+    report = {
+        "original_bytes": size,
+        "processed_bytes": size,
+        "bytes_saved": 0,
+        "silent": False,
+        "deferred": False,
+        "passthrough": True,
+        "duration_seconds": None,
+        "speech_seconds": None,
+        "codec": None,
+        "timings_ms": {},
+        "audio": data,
+        "filename": filename,
+        # Trimmed 16 kHz samples and their VAD mask, for callers that split long audio
+        "samples": None,
+        "voiced": None,
+    }
+    timings = report["timings_ms"]
+
+    started = time.perf_counter()
+    decoded = decode(data)
+    timings["decode"] = round((time.perf_counter() - started) * 1000, 3)
+    if decoded is None:
+        return report
+
+    # Downmixing and resampling happen block by block inside decode()
+    samples = decoded[0]
+
+    started = time.perf_counter()
+    voiced = voice_activity(samples)
+    timings["vad"] = round((time.perf_counter() - started) * 1000, 3)
+
+    frame = TARGET_RATE * FRAME_MS // 1000
+    report["duration_seconds"] = round(samples.size / TARGET_RATE, 3)
+    report["speech_seconds"] = round(int(voiced.sum()) * FRAME_MS / 1000, 3)
+    report["passthrough"] = False
+
+    if voiced.sum() * FRAME_MS < MIN_SPEECH_MS:
+        report.update(silent=True, audio=None, processed_bytes=0, bytes_saved=size)
+        return report
+
+    indexes = np.flatnonzero(voiced)
+    trimmed = samples[indexes[0] * frame: (indexes[-1] + 1) * frame]
+    report["samples"] = trimmed
+    report["voiced"] = voiced[indexes[0]: indexes[-1] + 1]
+    if encode_up_to_seconds is not None and trimmed.size / TARGET_RATE > encode_up_to_seconds:
+        report.update(deferred=True, audio=None, processed_bytes=None, bytes_saved=None)
+        return report
+
+    started = time.perf_counter()
+    codecs = ["flac", "opus"] if CODEC == "auto" else [CODEC]
+    best = None
+    for codec in codecs:
+        try:
+            encoded, name = encode(trimmed, codec)
+        except (sf.LibsndfileError, RuntimeError, ValueError):
+            continue
+        if best is None or len(encoded) < len(best[0]):
+            best = (encoded, name, codec)
+        if len(encoded) < size:
+            break
+    timings["encode"] = round((time.perf_counter() - started) * 1000, 3)
+
+    if best is None or len(best[0]) >= size and trimmed.size == samples.size:
+        # Nothing trimmed and no smaller encoding: the original is the better upload
+        report["passthrough"] = True
+        return report
+
+    report.update(
+        audio=best[0],
+        filename=best[1],
+        codec=best[2],
+        processed_bytes=len(best[0]),
+        bytes_saved=size - len(best[0]),
+    )
+    return report
@@ -1,36 +1,194 @@
 from groq import Groq
 import os
+import re
+import time
+import logging
+import contextvars
 from dotenv import load_dotenv
+from services.audio_preprocess import preprocess, split_at_silences, encode, CODEC
+from services.concurrency import get_pool
+from services.metrics import stage
+from services.llm_gateway import gateway, LLMUnavailable
 
 load_dotenv()
 
+logger = logging.getLogger("aether.audio")
+
+# Decode, trim silence and re-encode before upload; set to 0 to send blobs as recorded
+PREPROCESS_ENABLED = os.getenv("AETHER_AUDIO_PREPROCESS", "1") != "0"
+# Recordings with more speech than this are split and transcribed in parallel
+CHUNK_THRESHOLD_SECONDS = float(os.getenv("AETHER_CHUNK_THRESHOLD_SECONDS", "90"))
+CHUNK_SECONDS = float(os.getenv("AETHER_CHUNK_SECONDS", "60"))
+CHUNK_OVERLAP_SECONDS = float(os.getenv("AETHER_CHUNK_OVERLAP_SECONDS", "0.5"))
+# Retries per chunk (the gateway's jittered backoff); AETHER_LLM_RETRIES applies elsewhere
+CHUNK_RETRIES = int(os.getenv("AETHER_CHUNK_RETRIES", "2"))
+WHISPER_MODEL = "whisper-large-v3-turbo"
+# Longest run of repeated words looked for where two chunks overlap
+MAX_OVERLAP_WORDS = 12
+
+_WORD = re.compile(r"[^\w']+")
+
+
+def _normalize_word(word: str) -> str:
+    return _WORD.sub("", word.lower())
+
+
+def stitch_transcripts(parts):
+    """
+    Joins chunk transcripts in order. Overlapping audio makes the tail of one
+    chunk reappear at the head of the next; the longest such repeated run
+    (compared case- and punctuation-insensitively) is dropped from the later chunk.
+    """
+    words = []
+    for part in parts:
+        incoming = (part or "").split()
+        if not incoming:
+            continue
+        tail = [_normalize_word(w) for w in words[-MAX_OVERLAP_WORDS:]]
+        head = [_normalize_word(w) for w in incoming[:MAX_OVERLAP_WORDS]]
+        overlap = 0
+        for size in range(min(len(tail), len(head)), 0, -1):
+            if tail[-size:] == head[:size]:
+                overlap = size
+                break
+        words.extend(incoming[overlap:])
+    return " ".join(words)
+
+
+def _read_all(audio) -> bytes:
+    if isinstance(audio, (bytes, bytearray)):
+        return bytes(audio)
+    audio.seek(0)
+    return audio.read()
+
+
 class AudioService:
-    def __init__(self):
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            raise ValueError("GROQ_API_KEY missing. Check your .env file.")
-        self.client = Groq(api_key=self.api_key)
+    def __init__(self, client=None):
+        # main.py passes the shared Groq client; standalone use builds its own
+        if client is None:
+            self.api_key = os.getenv("GROQ_API_KEY")
+            if not self.api_key:
+                raise ValueError("GROQ_API_KEY missing. Check your .env file.")
+            client = Groq(api_key=self.api_key, max_retries=0)
+        self.client = client
 
-    def transcribe_audio(self, audio_file_path: str):
+    def transcribe_audio(self, audio, filename: str = None):
         """
         Transcribes audio using Groq's whisper-large-v3-turbo model.
+        audio may be a file path, raw bytes or a binary file-like object; the
+        latter two never touch the working directory.
+        """
+        return self.transcribe_audio_with_report(audio, filename)[0]
+
+    def transcribe_audio_with_report(self, audio, filename: str = None):
+        """
+        Same as transcribe_audio, but also returns the preprocessing report
+        (bytes saved, speech duration, per-stage milliseconds), or None when
+        preprocessing is disabled. Blobs without speech never reach Whisper.
+        """
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                logger.error("Audio file path is invalid", extra={"path": audio})
+                return None, None
+            with open(audio, "rb") as audio_file:
+                return self._transcribe_source(audio_file, filename or os.path.basename(audio))
+        return self._transcribe_source(audio, filename or "audio.wav")
+
+    def _transcribe_source(self, audio, filename: str):
+        """audio is bytes or a seekable binary file; a file is decoded in blocks, not read whole."""
+        if not PREPROCESS_ENABLED:
+            return self._transcribe(_read_all(audio), filename), None
+
+        with stage("audio.preprocess"):
+            # Long speech is encoded chunk by chunk below, never as a whole
+            report = preprocess(audio, filename, encode_up_to_seconds=CHUNK_THRESHOLD_SECONDS)
+        upload = report.pop("audio")
+        if report["silent"]:
+            return "", report
+
+        samples, voiced = report.pop("samples"), report.pop("voiced")
+        started = time.perf_counter()
+        if report["deferred"]:
+            transcript = self._transcribe_chunked(samples, voiced, report)
+        else:
+            if upload is audio:
+                # Passed through as uploaded: retries need bytes they can send again
+                upload = _read_all(audio)
+            transcript = self._transcribe(upload, report["filename"])
+        report["timings_ms"]["whisper"] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info("Audio transcribed", extra={
+            "original_bytes": report["original_bytes"],
+            "processed_bytes": report["processed_bytes"],
+            "speech_seconds": report["speech_seconds"],
+            "duration_seconds": report["duration_seconds"],
+            "timings_ms": report["timings_ms"],
+        })
+        return transcript, report
+
+    def transcribe_samples(self, samples):
+        """Transcribes 16 kHz mono float samples (e.g. one live segment); None on error."""
+        audio, filename = encode(samples, "flac" if CODEC == "auto" else CODEC)
+        try:
+            return self._transcribe(audio, filename)
+        except LLMUnavailable as e:
+            # One lost segment shouldn't end a live session
+            logger.warning("Whisper unavailable for segment", extra={"error": str(e)})
+            return None
+
+    def _transcribe_chunked(self, samples, voiced, report: dict):
         """
-        if not os.path.exists(audio_file_path):
-            print(f"ERROR: Audio file path {audio_file_path} is invalid.")
+        Splits long audio at pauses and transcribes the pieces concurrently on
+        the shared "whisper_chunks" pool, so wall time follows the longest chunk
+        rather than the whole recording. Returns None only if every chunk failed.
+        """
+        spans = split_at_silences(voiced, samples.size, CHUNK_SECONDS, CHUNK_OVERLAP_SECONDS)
+        codec = "flac" if CODEC == "auto" else CODEC
+        pool = get_pool("whisper_chunks")
+        # Each chunk runs in a copy of this context, so its timings count towards the request
+        futures = [
+            pool.submit(contextvars.copy_context().run, self._transcribe_chunk, samples[start:end], codec, index)
+            for index, (start, end) in enumerate(spans)
+        ]
+        results, sizes = zip(*(future.result() for future in futures))
+
+        failed = [index for index, text in enumerate(results) if text is None]
+        report["chunks"] = len(spans)
+        report["failed_chunks"] = failed
+        report.update(codec=codec, processed_bytes=sum(sizes), bytes_saved=report["original_bytes"] - sum(sizes))
+        if len(failed) == len(spans):
             return None
+        return stitch_transcripts(results)
 
+    def _transcribe_chunk(self, samples, codec: str, index: int):
+        """
+        One chunk with its own retries, so a flaky request costs only that chunk.
+        Returns (text or None, encoded bytes).
+        """
+        audio, filename = encode(samples, codec)
         try:
-            # We open the file and pass the handle directly to the Groq SDK
-            with open(audio_file_path, "rb") as audio_file:
-                transcription = self.client.audio.transcriptions.create(
-                    file=(os.path.basename(audio_file_path), audio_file),
-                    model="whisper-large-v3-turbo",
-                    response_format="text",
-                )
-            
-            # transcription will be a string since response_format="text"
-            return transcription if transcription else ""
-            
+            return self._request_transcription(audio, filename, retries=CHUNK_RETRIES), len(audio)
         except Exception as e:
-            print(f"GROQ API TRANSCRIPTION ERROR: {e}")
-            return None
\ No newline at end of file
+            logger.warning("Whisper transcription failed", extra={"chunk": index, "error": str(e)})
+            return None, len(audio)
+
+    def _request_transcription(self, audio, filename: str, retries: int = None):
+        # The Groq SDK accepts bytes or an open binary handle alongside the name
+        transcription = gateway.transcribe(
+            self.client,
+            model=WHISPER_MODEL,
+            file=(filename, audio),
+            response_format="text",
+            retries=retries,
+        )
+        # transcription will be a string since response_format="text"
+        return transcription if transcription else ""
+
+    def _transcribe(self, audio, filename: str):
+        """None if Whisper rejected the audio; LLMUnavailable (rate limited, down) propagates."""
+        try:
+            return self._request_transcription(audio, filename)
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            logger.warning("Whisper transcription failed", extra={"error": str(e)})
+            return None
@@ -1,24 +1,115 @@
 import os
+import time
+import hashlib
+import threading
+from typing import NamedTuple
 from datetime import datetime, timedelta
-from passlib.context import CryptContext
+
+import bcrypt
 from jose import jwt, JWTError
 
+from services.cache_service import LRUCache, MISSING
+
 # Secret key for JWT signing. In production, this should be a secure random string from .env
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "aether_super_secret_development_key_2026")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7 # 7 days
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Same work factor passlib used, so existing $2b$ hashes verify unchanged
+BCRYPT_ROUNDS = int(os.getenv("AETHER_BCRYPT_ROUNDS", "12"))
+# bcrypt only looks at the first 72 bytes; passlib truncated silently, bcrypt>=5 raises instead
+BCRYPT_MAX_BYTES = 72
+
+# Verified tokens are trusted for at most this long (and never past their exp)
+TOKEN_CACHE_TTL = float(os.getenv("AETHER_TOKEN_CACHE_TTL", "300"))
+TOKEN_CACHE_SIZE = int(os.getenv("AETHER_TOKEN_CACHE_SIZE", "10000"))
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+# Module-level so they can also run on a process pool (AETHER_BCRYPT_EXECUTOR=process)
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        return False
+
+
+class AuthenticatedUser(NamedTuple):
+    """What get_current_user hands to routes; detached from any DB session, so it can be cached."""
+    id: int
+    username: str
+
+
+class TokenCache:
+    """
+    token -> user snapshot for tokens that were already decoded and looked up.
+    Entries expire with the token, and invalidate(username) retires every
+    cached token of that user (password change, deletion, ...) at once.
+    """
+
+    def __init__(self, ttl_seconds: float = TOKEN_CACHE_TTL, max_entries: int = TOKEN_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.entries = LRUCache(max_entries=max_entries)
+        # Bumped per user on invalidation; entries from older generations are ignored
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Raw bearer tokens are not kept in memory longer than the request
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str):
+        """Returns the cached AuthenticatedUser or None."""
+        if not self.ttl_seconds:
+            return None
+        entry = self.entries.get(self._key(token))
+        if entry is MISSING:
+            return None
+        user, generation = entry
+        if self.generation(user.username) != generation:
+            return None
+        return user
+
+    def generation(self, username: str) -> int:
+        """Read before looking the user up; set() drops the entry if it changed meanwhile."""
+        return self._generations.get(username, 0)
+
+    def set(self, token: str, user: AuthenticatedUser, generation: int, expires_at: float = None):
+        ttl = self.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0 or generation != self.generation(user.username):
+            return
+        self.entries.set(self._key(token), (user, generation), ttl_seconds=ttl)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
 
 class AuthService:
+    def __init__(self):
+        self.token_cache = TokenCache()
+
     def verify_password(self, plain_password, hashed_password):
         """Verifies if the plain password matches the hashed password."""
-        return pwd_context.verify(plain_password, hashed_password)
+        return check_password(plain_password, hashed_password)
 
     def get_password_hash(self, password):
         """Hashes a password using bcrypt."""
-        return pwd_context.hash(password)
+        return hash_password(password)
 
     def create_access_token(self, data: dict, expires_delta: timedelta | None = None):
         """Generates a JWT token for the user."""
@@ -27,7 +118,7 @@ class AuthService:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        
+
         to_encode.update({"exp": expire})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
@@ -39,3 +130,17 @@ class AuthService:
             return payload
         except JWTError:
             return None
+
+    def cached_user(self, token: str):
+        """The user a token was last verified for, or None when it has to be checked again."""
+        return self.token_cache.get(token)
+
+    def remember_user(self, token: str, payload: dict, user, generation: int):
+        """Caches the lookup for a verified token until its exp (or the cache TTL)."""
+        snapshot = AuthenticatedUser(id=user.id, username=user.username)
+        self.token_cache.set(token, snapshot, generation, expires_at=payload.get("exp"))
+        return snapshot
+
+    def invalidate_user(self, username: str):
+        """Call whenever a user row changes so cached tokens are re-checked."""
+        self.token_cache.invalidate(username)
@@ -0,0 +1,83 @@
+import json
+import time
+
+# Transcripts per MemoryService.add_memories call. Big enough to amortize the
+# embedding model, small enough to keep memory flat for huge archives.
+BULK_BATCH_SIZE = 256
+
+
+def parse_line(line):
+    """
+    One JSONL record -> {"text", "meeting_id", "timestamp"?}, or None if unusable.
+    A bare JSON string is accepted as a transcript without a meeting id.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(record, str):
+        record = {"text": record}
+    if not isinstance(record, dict):
+        return None
+    text = record.get("text") or record.get("transcript")
+    if not isinstance(text, str) or not text.strip():
+        return None
+    item = {"text": text, "meeting_id": str(record.get("meeting_id") or "import")}
+    if record.get("timestamp"):
+        item["timestamp"] = str(record["timestamp"])
+    return item
+
+
+async def aiter_lines(byte_chunks):
+    """Splits an async stream of byte chunks into lines without buffering the whole body."""
+    pending = b""
+    async for chunk in byte_chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+class ImportStats:
+    """Running totals and throughput for one bulk import."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.chunks = 0
+
+    def record(self, result: dict):
+        self.inserted += result["inserted"]
+        self.duplicates += result["duplicates"]
+        self.invalid += result["invalid"]
+        self.chunks += result["chunks"]
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "chunks": self.chunks,
+            "seconds": round(elapsed, 3),
+            "transcripts_per_second": round(self.received / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def progress_line(self) -> str:
+        stats = self.as_dict()
+        return (
+            f"{stats['received']:,} transcripts | {stats['inserted']:,} new | "
+            f"{stats['duplicates']:,} duplicates | {stats['invalid']:,} invalid | "
+            f"{stats['transcripts_per_second']:,.0f}/s"
+        )
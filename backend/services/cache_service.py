@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU with optional per-entry TTL and hit/miss counters.
+    With max_bytes set, entries are also evicted until the summed sizeof(value)
+    fits the budget.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = None, max_bytes: int = None, sizeof=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: len(value))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl_seconds: float = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def pop(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for LLM extraction results: an in-memory LRU in front of a
+    SQLite table, so results survive restarts and are shared between workers.
+    Values are JSON-serializable; both tiers honour the same TTL.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 2048, ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path or os.getenv("AETHER_EXTRACTION_CACHE_PATH", "./extraction_cache.db")
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extraction_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM extraction_cache WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Whitespace, case and Unicode differences should not defeat the cache; wording should."""
+        return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+    @classmethod
+    def make_key(cls, *parts) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(cls.normalize(str(part)).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Returns the cached value or MISSING."""
+        raw = self.memory.get(key)
+        if raw is not MISSING:
+            return json.loads(raw)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+        now = time.time()
+        if row is None or row[1] < now:
+            self.misses += 1
+            return MISSING
+        self.disk_hits += 1
+        self.memory.set(key, row[0], ttl_seconds=row[1] - now)
+        return json.loads(row[0])
+
+    def set(self, key: str, value):
+        raw = json.dumps(value)
+        self.memory.set(key, raw)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, raw, time.time() + self.ttl_seconds),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.misses
+        return {
+            "memory_hits": memory["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries_in_memory": memory["entries"],
+            "evictions": memory["evictions"],
+            "hit_rate": round((memory["hits"] + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
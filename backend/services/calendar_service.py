@@ -2,17 +2,117 @@ from groq import Groq
 import os
 import json
 import re
+import logging
 from typing import Optional
+from services.cache_service import ExtractionCache, MISSING
+from services.intent_filter import has_scheduling_intent, resolve_dates
+from services.llm_gateway import gateway, MicroBatcher, LLMUnavailable
+from services.context_packer import select_sentences
+
+logger = logging.getLogger("aether.calendar")
+
+EXTRACTION_MODEL = "llama-3.3-70b-versatile"
+# Bump whenever the prompt below changes so stale cached extractions are not reused
+PROMPT_VERSION = "3"
+# Skip the LLM for transcripts with no date, time or scheduling language
+PREFILTER_ENABLED = os.getenv("AETHER_INTENT_PREFILTER", "1") != "0"
+# Micro-batching: short transcripts arriving within this window share one
+# extraction prompt (0, the default, sends each alone). Meant for live
+# transcription, where every pause closes a segment of a sentence or two.
+BATCH_WINDOW_MS = float(os.getenv("AETHER_EXTRACTION_BATCH_WINDOW_MS", "0"))
+BATCH_MAX_SEGMENTS = int(os.getenv("AETHER_EXTRACTION_BATCH_SIZE", "8"))
+# Longer transcripts are always extracted on their own
+BATCH_MAX_CHARS = int(os.getenv("AETHER_EXTRACTION_BATCH_MAX_CHARS", "1500"))
+# Token budget for the transcript in one extraction prompt. Longer transcripts
+# keep only their date, time and scheduling sentences plus their neighbours.
+EXTRACTION_CONTEXT_TOKENS = int(os.getenv("AETHER_EXTRACTION_CONTEXT_TOKENS", "4000"))
+
+def normalize_events(data):
+    """The model's JSON as a list of events, whether it sent a list, a wrapper object or a single event."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        # If the AI wrapped it in a key, extract it
+        for key in ["events", "calendar_events", "meetings"]:
+            if key in data and isinstance(data[key], list):
+                return data[key]
+        if any(k in data for k in ["title", "date"]):
+            # It's a single object, wrap it
+            return [data]
+    return []
 
 class CalendarService:
-    def __init__(self):
+    def __init__(self, client=None):
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=self.api_key)
+        # The gateway retries, so the SDK shouldn't as well
+        self.client = client if client is not None else Groq(api_key=self.api_key, max_retries=0)
+        self.cache = ExtractionCache()
+        self.prefilter_skips = 0
+        self.batcher = None
+        if BATCH_WINDOW_MS > 0:
+            self.batcher = MicroBatcher("calendar_extraction", self._extract_batch, BATCH_WINDOW_MS / 1000, BATCH_MAX_SEGMENTS)
 
     def extract_calendar_intent(self, transcript: str, current_date: Optional[str] = None):
+        """
+        Returns the events found in the transcript ([] for none). Raises
+        LLMUnavailable when Groq keeps refusing, so callers can tell "no
+        events" from "couldn't check".
+        """
         # Use the provided date or fallback to the specific one requested
         date_context = current_date if current_date else "Friday, February 27, 2026"
-        
+
+        if PREFILTER_ENABLED and not has_scheduling_intent(transcript):
+            self.prefilter_skips += 1
+            return []
+
+        # Identical (transcript, date, model, prompt) extractions are served from cache
+        cache_key = ExtractionCache.make_key(transcript, date_context, EXTRACTION_MODEL, PROMPT_VERSION)
+        cached = self.cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+
+        if self.batcher is not None and len(transcript) <= BATCH_MAX_CHARS:
+            events = self.batcher.submit(date_context, transcript)
+        else:
+            events = self._extract_one(transcript, date_context)
+        if events is None:
+            return []
+        self.cache.set(cache_key, events)
+        return events
+
+    def _system_content(self, date_context: str, hints: str = "") -> str:
+        system_content = f"Today is {date_context}. You are an elite Executive Assistant. When a user mentions 'tomorrow', 'next Monday', or 'at 5', calculate the exact ISO date and time."
+        if hints:
+            system_content += f" Already resolved: {hints}."
+        return system_content
+
+    def _ask(self, system_content: str, prompt: str):
+        """
+        One JSON-mode completion, parsed. None if the request was rejected or the
+        reply isn't JSON; LLMUnavailable (rate limited, overloaded) propagates.
+        """
+        try:
+            response = gateway.chat(
+                self.client,
+                model=EXTRACTION_MODEL,
+                messages=[
+                    {"role": "system", "content": system_content},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            content = response.choices[0].message.content
+            logger.debug("Groq response", extra={"content": content})
+            return json.loads(content)
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            logger.warning("Calendar extraction failed", extra={"error": str(e)})
+            return None
+
+    def _extract_one(self, transcript: str, date_context: str):
+        """Events for one transcript, or None if the model's answer was unusable (not cached)."""
+        transcript = select_sentences(transcript, EXTRACTION_CONTEXT_TOKENS, has_scheduling_intent)
         prompt = f"""
         Extract any meeting or event scheduling intents from the following transcript.
         
@@ -27,45 +127,61 @@ class CalendarService:
         
         Return ONLY valid JSON.
         """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": f"Today is {date_context}. You are an elite Executive Assistant. When a user mentions 'tomorrow', 'next Monday', or 'at 5', calculate the exact ISO date and time."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            content = response.choices[0].message.content
-            print(f"DEBUG: Groq Response: {content}")
-            
-            data = json.loads(content)
-            
-            # Normalize response - user expects a list of events
-            events = []
-            if isinstance(data, list):
-                events = data
-            elif isinstance(data, dict):
-                # If the AI wrapped it in a key, extract it
-                for key in ["events", "calendar_events", "meetings"]:
-                    if key in data and isinstance(data[key], list):
-                        events = data[key]
-                        break
-                if not events and any(k in data for k in ["title", "date"]):
-                    # It's a single object, wrap it
-                    events = [data]
-            
-            return events
-        except Exception as e:
-            print(f"Error extracting intent: {e}")
-            return []
+
+        # Dates the local resolver is sure about are handed over as facts
+        resolved = resolve_dates(transcript, date_context)
+        hints = "; ".join(f"'{r['phrase']}' = {r['date']}" for r in resolved)
+        data = self._ask(self._system_content(date_context, hints), prompt)
+        return None if data is None else normalize_events(data)
+
+    def _extract_batch(self, date_context: str, transcripts):
+        """
+        One prompt for several short transcripts; the answer is split back out by
+        segment number. Segments the model skipped are extracted on their own.
+        """
+        if len(transcripts) == 1:
+            return [self._extract_one(transcripts[0], date_context)]
+
+        segments = "\n        ".join(f'Segment {i}: "{text}"' for i, text in enumerate(transcripts))
+        prompt = f"""
+        Extract any meeting or event scheduling intents from each numbered transcript segment
+        below. The segments are unrelated; never combine details from two of them.
+
+        {segments}
+
+        Rules:
+        1. Return a JSON object {{"results": [{{"segment": 0, "events": [...]}}, ...]}} with one entry per segment.
+        2. Each event MUST have these keys: "title", "date", "time", "description".
+        3. Format 'date' as YYYY-MM-DD.
+        4. Format 'time' as HH:MM (24-hour).
+        5. A segment without events gets "events": [].
+
+        Return ONLY valid JSON.
+        """
+        hints = "; ".join(
+            f"segment {i}: '{r['phrase']}' = {r['date']}"
+            for i, text in enumerate(transcripts)
+            for r in resolve_dates(text, date_context)
+        )
+        data = self._ask(self._system_content(date_context, hints), prompt)
+
+        found = {}
+        entries = data.get("results") if isinstance(data, dict) else None
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                found[int(entry["segment"])] = normalize_events(entry.get("events", []))
+            except (AttributeError, TypeError, KeyError, ValueError):
+                continue
+        if len(found) < len(transcripts):
+            logger.info("Batched extraction incomplete, retrying segments alone", extra={
+                "segments": len(transcripts), "answered": len(found),
+            })
+        return [
+            found[i] if i in found else self._extract_one(text, date_context)
+            for i, text in enumerate(transcripts)
+        ]
 
     def _mock_create_calendar_event(self, event_data: dict):
-        print(f"[MOCK] Creating Google Calendar Event: {event_data}")
+        logger.info("[MOCK] Creating Google Calendar event", extra={"event": event_data})
         # In a real implementation, this would use google-api-python-client
         return True
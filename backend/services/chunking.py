@@ -0,0 +1,92 @@
+import re
+import hashlib
+
+# Sentence boundaries: terminal punctuation followed by whitespace, or blank lines
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+DEFAULT_CHUNK_CHARS = 1200
+DEFAULT_OVERLAP_CHARS = 200
+
+
+def memory_hash(text: str, meeting_id: str, username: str) -> str:
+    """Deterministic id for one transcript, so re-ingesting it is a no-op."""
+    digest = hashlib.sha256()
+    for part in (username, meeting_id, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def chunk_id(memory_id: str, index: int) -> str:
+    return f"mem_{memory_id}_{index:04d}"
+
+
+def _sentence_spans(text: str):
+    """(start, end) character spans of the sentences in text."""
+    spans = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def _split_long(start: int, end: int, text: str, max_chars: int):
+    """Breaks a single over-long sentence at whitespace."""
+    spans = []
+    while end - start > max_chars:
+        cut = text.rfind(" ", start, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        spans.append((start, cut))
+        start = cut
+        while start < end and text[start] == " ":
+            start += 1
+    if start < end:
+        spans.append((start, end))
+    return spans
+
+
+def chunk_text(text: str, max_chars: int = DEFAULT_CHUNK_CHARS, overlap_chars: int = DEFAULT_OVERLAP_CHARS):
+    """
+    Sentence-aware sliding windows over text.
+    Returns [(start, chunk)] where start is the chunk's offset in text; consecutive
+    chunks share roughly overlap_chars of trailing sentences.
+    """
+    spans = []
+    for start, end in _sentence_spans(text):
+        spans.extend(_split_long(start, end, text, max_chars))
+    if not spans:
+        return [(0, text)] if text else []
+
+    chunks = []
+    first = 0
+    while first < len(spans):
+        last = first
+        while last + 1 < len(spans) and spans[last + 1][1] - spans[first][0] <= max_chars:
+            last += 1
+        start, end = spans[first][0], spans[last][1]
+        chunks.append((start, text[start:end]))
+        if last + 1 >= len(spans):
+            break
+
+        # Step back over trailing sentences to build the overlap, always advancing
+        next_first = last + 1
+        while next_first - 1 > first and end - spans[next_first - 1][0] <= overlap_chars:
+            next_first -= 1
+        first = next_first
+    return chunks
+
+
+def assemble(chunks):
+    """Rebuilds the original text from [(start, chunk)] produced by chunk_text."""
+    text = ""
+    for start, chunk in sorted(chunks, key=lambda c: c[0]):
+        # Gaps between chunks are the whitespace the sentence splitter dropped
+        if start > len(text):
+            text += " " * (start - len(text))
+        text = text[:start] + chunk
+    return text
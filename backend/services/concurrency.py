@@ -0,0 +1,71 @@
+import os
+import asyncio
+import threading
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# One bounded pool per blocking dependency, so a burst of slow LLM calls
+# can never starve Chroma writes or password checks (and vice versa).
+# Sizes can be tuned per deployment through the environment.
+POOL_SIZES = {
+    "groq": int(os.getenv("AETHER_GROQ_WORKERS", "64")),
+    "whisper": int(os.getenv("AETHER_WHISPER_WORKERS", "16")),
+    # Chunks of long recordings; separate from "whisper" so a request waiting
+    # on its chunks can never hold the threads those chunks need
+    "whisper_chunks": int(os.getenv("AETHER_WHISPER_CHUNK_WORKERS", "16")),
+    "chroma": int(os.getenv("AETHER_CHROMA_WORKERS", "8")),
+    # Also the cap on concurrent hashes: a login storm queues here instead of
+    # taking every core away from the request handlers
+    "bcrypt": int(os.getenv("AETHER_BCRYPT_WORKERS", "4")),
+    "google": int(os.getenv("AETHER_GOOGLE_WORKERS", "8")),
+}
+
+# bcrypt releases the GIL, so threads are enough; "process" isolates hashing
+# completely (functions sent there must be module-level and picklable)
+POOL_KINDS = {
+    "bcrypt": os.getenv("AETHER_BCRYPT_EXECUTOR", "thread"),
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str):
+    """Returns the executor for a dependency, creating it on first use."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                if POOL_KINDS.get(name) == "process":
+                    pool = ProcessPoolExecutor(max_workers=POOL_SIZES.get(name, 4))
+                else:
+                    pool = ThreadPoolExecutor(
+                        max_workers=POOL_SIZES.get(name, 4),
+                        thread_name_prefix=f"aether-{name}",
+                    )
+                _pools[name] = pool
+    return pool
+
+
+async def run_in_pool(name: str, func, *args, **kwargs):
+    """
+    Runs a blocking call on the named pool without blocking the event loop.
+    Thread pools run it in a copy of the caller's context, so the request id
+    and stage profile follow the work (as asyncio.to_thread does).
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(func, *args, **kwargs)
+    if POOL_KINDS.get(name) != "process":
+        call = partial(contextvars.copy_context().run, call)
+    return await loop.run_in_executor(get_pool(name), call)
+
+
+def shutdown_pools(wait: bool = True):
+    """Stops every executor. Called when the app shuts down."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
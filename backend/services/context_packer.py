@@ -0,0 +1,199 @@
+"""
+Keeps every prompt built from meeting history inside a token budget.
+
+    packed = pack(memories, budget=6000, item_budget=800)
+    prompt = f"Meeting Notes:\n{packed.text}"
+
+Token counts come from estimate_tokens(), a local approximation of the
+Llama 3 tokenizer: no model files, a single regex pass (a few microseconds
+per KB). Common English words are one token, longer words and numbers are
+charged per few characters and every punctuation mark counts, which lands
+slightly above the real count on prose; for a budget that is the safe side.
+"""
+import re
+from typing import Callable, NamedTuple, Optional
+
+from services.chunking import SENTENCE_BOUNDARY
+
+# Letters, digit runs or a single other visible character
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+# Placed where text was cut out
+OMISSION = " [...] "
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Llama 3 token count of text."""
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isdigit():
+            # Digits are split in groups of three
+            tokens += (len(piece) + 2) // 3
+        elif piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+def _sentences(text: str):
+    return [s for s in SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def _cut_words(text: str, budget: int, from_end: bool = False) -> str:
+    """The longest run of whole words from one end of text that fits budget."""
+    words = text.split()
+    if from_end:
+        words.reverse()
+    kept, used = [], 0
+    for word in words:
+        cost = estimate_tokens(word)
+        if used + cost > budget:
+            break
+        kept.append(word)
+        used += cost
+    if from_end:
+        kept.reverse()
+    return " ".join(kept)
+
+
+def truncate(text: str, budget: int) -> str:
+    """
+    text if it fits in budget tokens; otherwise its opening and closing
+    sentences (two thirds / one third of the budget) around an omission mark,
+    since meetings tend to state their agenda first and their decisions last.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    budget = max(budget - estimate_tokens(OMISSION), 1)
+    sentences = _sentences(text)
+    head, used = [], 0
+    for sentence in sentences:
+        cost = estimate_tokens(sentence)
+        if used + cost > budget * 2 // 3:
+            break
+        head.append(sentence)
+        used += cost
+    if not head:
+        # The opening sentence alone is over budget
+        return _cut_words(text, budget) + OMISSION.rstrip()
+    tail = []
+    for sentence in reversed(sentences[len(head):]):
+        cost = estimate_tokens(sentence)
+        if used + cost > budget:
+            break
+        tail.append(sentence)
+        used += cost
+    tail.reverse()
+    return " ".join(head) + OMISSION + " ".join(tail)
+
+
+def select_sentences(text: str, budget: int, keep: Callable[[str], bool]) -> str:
+    """
+    Fits text into budget by keeping the sentences keep() matches together with
+    their neighbours, in their original order, marking the gaps. Falls back to
+    truncate() when nothing matches.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sentences = _sentences(text)
+    costs = [estimate_tokens(s) for s in sentences]
+    matches = [i for i, s in enumerate(sentences) if keep(s)]
+    if not matches:
+        return truncate(text, budget)
+
+    chosen, used = set(), 0
+    # Matching sentences first, then the context either side of each
+    for indexes in (matches, [j for i in matches for j in (i - 1, i + 1)]):
+        for i in indexes:
+            if 0 <= i < len(sentences) and i not in chosen and used + costs[i] <= budget:
+                chosen.add(i)
+                used += costs[i]
+    if not chosen:
+        return _cut_words(sentences[matches[0]], budget)
+
+    parts, previous = [], -1
+    for i in sorted(chosen):
+        if previous >= 0 and i != previous + 1:
+            parts.append(OMISSION.strip())
+        parts.append(sentences[i])
+        previous = i
+    return " ".join(parts)
+
+
+def split_to_budget(text: str, budget: int):
+    """Consecutive sentence-aligned parts of text, each within budget tokens."""
+    units = []
+    for sentence in _sentences(text):
+        if estimate_tokens(sentence) <= budget:
+            units.append(sentence)
+        else:
+            # A sentence longer than a whole part is split between words
+            units.extend(sentence.split())
+
+    parts, current, used = [], [], 0
+    for unit in units:
+        cost = estimate_tokens(unit)
+        if current and used + cost > budget:
+            parts.append(" ".join(current))
+            current, used = [], 0
+        current.append(unit)
+        used += cost
+    if current:
+        parts.append(" ".join(current))
+    return parts
+
+
+def _recency(memory: dict):
+    metadata = memory.get("metadata") or {}
+    return (metadata.get("ts") or 0, metadata.get("timestamp") or "")
+
+
+class Packed(NamedTuple):
+    text: str
+    ids: list        # ids of the memories included, in prompt order
+    tokens: int      # estimated tokens of text
+    truncated: int   # memories shortened to fit item_budget
+    omitted: int     # memories left out for lack of budget
+
+
+def pack(
+    memories,
+    budget: int,
+    item_budget: Optional[int] = None,
+    order: str = "recent",
+    separator: str = "\n---\n",
+    shrink: Optional[Callable[[str, int], str]] = None,
+) -> Packed:
+    """
+    Joins as many memories ({"text", "id", "metadata"}) as fit in budget tokens.
+
+    order="recent" takes the newest first by their "ts"/"timestamp" metadata;
+    order="relevance" keeps the given order (search results, best first).
+    Memories over item_budget are passed through shrink(text, item_budget)
+    (truncate by default) so one long meeting can't crowd out the rest. A
+    memory that doesn't fit is skipped, but smaller ones after it still can.
+    """
+    if order == "recent":
+        memories = sorted(memories, key=_recency, reverse=True)
+    elif order != "relevance":
+        raise ValueError(f"Unknown order: {order}")
+    item_budget = min(item_budget or budget, budget)
+    shrink = shrink or truncate
+    separator_cost = estimate_tokens(separator)
+
+    texts, ids, used, truncated, omitted = [], [], 0, 0, 0
+    for memory in memories:
+        text = memory["text"]
+        cost = estimate_tokens(text)
+        if cost > item_budget:
+            text = shrink(text, item_budget)
+            cost = estimate_tokens(text)
+            truncated += 1
+        extra = cost + (separator_cost if texts else 0)
+        if used + extra > budget:
+            omitted += 1
+            continue
+        texts.append(text)
+        ids.append(memory.get("id"))
+        used += extra
+    return Packed(separator.join(texts), ids, used, truncated, omitted)
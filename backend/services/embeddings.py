@@ -0,0 +1,70 @@
+"""
+Embedding functions for the memory store.
+
+AETHER_EMBEDDINGS picks one:
+
+    onnx      Chroma's default all-MiniLM-L6-v2 (downloaded on first use)
+    hashing   word/bigram feature hashing; no model, no network
+
+"hashing" exists for benchmarks, CI and air-gapped machines: it is fast and
+deterministic, but only matches shared words, so it is no substitute for the
+model in production. Both produce 384-dimensional vectors. A collection
+remembers the function it was created with, so switching needs a fresh
+AETHER_CHROMA_PATH (or re-importing the memories).
+"""
+import os
+import re
+import hashlib
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+from chromadb.utils.embedding_functions import register_embedding_function
+
+EMBEDDINGS = os.getenv("AETHER_EMBEDDINGS", "onnx")
+DIMENSIONS = 384
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+@register_embedding_function
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    def __init__(self, dimensions: int = DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _features(self, text: str):
+        words = _WORD.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = []
+        for text in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                # The sign bit keeps colliding features from always adding up
+                vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = np.linalg.norm(vector)
+            vectors.append(vector / norm if norm else vector)
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "aether-hashing"
+
+    def get_config(self) -> dict:
+        return {"dimensions": self.dimensions}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(config.get("dimensions", DIMENSIONS))
+
+
+def make_embedding_function(kind: str = None):
+    kind = kind or EMBEDDINGS
+    if kind == "hashing":
+        return HashingEmbeddingFunction()
+    if kind == "onnx":
+        return embedding_functions.DefaultEmbeddingFunction()
+    raise ValueError(f"Unknown AETHER_EMBEDDINGS={kind!r}; expected 'onnx' or 'hashing'")
@@ -1,32 +1,88 @@
 import os
 import datetime
+import logging
+import threading
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest
+
+from services.metrics import stage
+
+logger = logging.getLogger("aether.google_calendar")
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+# Point the client at another Calendar API host (e.g. a local fake in tests)
+API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+# Google accepts at most 50 calls in one batch request
+BATCH_LIMIT = 50
 
 class GoogleCalendarService:
-    def __init__(self):
+    def __init__(self, api_endpoint: str = None):
+        self.api_endpoint = (api_endpoint or API_ENDPOINT or "").rstrip("/") or None
+        # Built once: parsing the discovery document is the expensive part of build()
+        self._service = None
+        # Serializes token refreshes and the one-time build across worker threads
+        self._lock = threading.Lock()
         self.creds = None
-        # The file token.json stores the user's access and refresh tokens
+        # The file token.json stores the user's access and refresh tokens.
+        # Nothing interactive or networked happens here: an expired token is
+        # refreshed on first use, and a missing one is created with authorize().
         if os.path.exists('token.json'):
             self.creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-        
-        # If there are no (valid) credentials available, let the user log in.
-        # NOTE: In a headless environment, this would fail. 
-        # For this demo, we check if credentials.json exists.
-        if not self.creds or not getattr(self.creds, 'valid', False):
-            if self.creds and getattr(self.creds, 'expired', False) and getattr(self.creds, 'refresh_token', None):
+
+    def authorize(self):
+        """
+        One-time browser consent using credentials.json; saves token.json.
+        Run `python -m services.google_calendar_service` from the backend folder.
+        """
+        flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
+        self.creds = flow.run_local_server(port=0)
+        # Save the credentials for the next run
+        with open('token.json', 'w') as token:
+            token.write(self.creds.to_json())
+        with self._lock:
+            self._service = None
+
+    def _client(self):
+        """
+        Returns (service, http). The discovery client is built once and shared;
+        each call gets its own authorized Http because httplib2 is not thread-safe.
+        An expired token is refreshed once under the lock, not by every caller.
+        """
+        with self._lock:
+            if self.creds.expired and self.creds.refresh_token:
                 self.creds.refresh(Request())
-            elif os.path.exists('credentials.json'):
-                flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-                self.creds = flow.run_local_server(port=0)
-                # Save the credentials for the next run
-                with open('token.json', 'w') as token:
-                    token.write(self.creds.to_json())
+            if self._service is None:
+                options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+                self._service = build('calendar', 'v3', credentials=self.creds, client_options=options, cache_discovery=False)
+        return self._service, AuthorizedHttp(self.creds, http=httplib2.Http(timeout=30))
+
+    @staticmethod
+    def _event_body(event_data: dict) -> dict:
+        """Maps an extracted event ({"title", "date", "time", "description"}) to a Calendar resource."""
+        # Combine date and time for ISO format
+        start_datetime = f"{event_data['date']}T{event_data['time']}:00Z"
+        # Default durartion 1 hour
+        end_time = (datetime.datetime.strptime(event_data['time'], "%H:%M") + datetime.timedelta(hours=1)).strftime("%H:%M")
+        end_datetime = f"{event_data['date']}T{end_time}:00Z"
+
+        return {
+            'summary': event_data.get('title', 'AETHER Meeting'),
+            'description': event_data.get('description', ''),
+            'start': {
+                'dateTime': start_datetime,
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': end_datetime,
+                'timeZone': 'UTC',
+            },
+        }
 
     def create_event(self, event_data: dict):
         """
@@ -34,35 +90,72 @@ class GoogleCalendarService:
         {"title": "...", "date": "YYYY-MM-DD", "time": "HH:MM", "description": "..."}
         """
         if not self.creds:
-            print("[ERROR] Google Calendar credentials not found. Ensure 'credentials.json' is present.")
+            logger.error("Google Calendar credentials not found. Run `python -m services.google_calendar_service` once.")
             return {"status": "error", "message": "Authentication required"}
 
         try:
-            service = build('calendar', 'v3', credentials=self.creds)
-
-            # Combine date and time for ISO format
-            start_datetime = f"{event_data['date']}T{event_data['time']}:00Z"
-            # Default durartion 1 hour
-            end_time = (datetime.datetime.strptime(event_data['time'], "%H:%M") + datetime.timedelta(hours=1)).strftime("%H:%M")
-            end_datetime = f"{event_data['date']}T{end_time}:00Z"
-
-            event = {
-                'summary': event_data.get('title', 'AETHER Meeting'),
-                'description': event_data.get('description', ''),
-                'start': {
-                    'dateTime': start_datetime,
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': end_datetime,
-                    'timeZone': 'UTC',
-                },
-            }
-
-            event = service.events().insert(calendarId='primary', body=event).execute()
-            print(f"Event created: {event.get('htmlLink')}")
+            service, http = self._client()
+            with stage("google_calendar.insert"):
+                event = service.events().insert(calendarId='primary', body=self._event_body(event_data)).execute(http=http)
+            logger.info("Event created", extra={"link": event.get('htmlLink')})
             return {"status": "success", "link": event.get('htmlLink')}
 
         except Exception as e:
-            print(f"An error occurred: {e}")
+            logger.warning("Event creation failed", extra={"error": str(e)})
             return {"status": "error", "message": str(e)}
+
+    def create_events(self, events: list):
+        """
+        Inserts many events with one batched HTTP request per 50 events instead of
+        one round-trip each. Returns one result per input event, in order:
+        {"index", "status": "success", "id", "link"} or {"index", "status": "error", "message"}.
+        Events that can't be mapped (bad date/time) fail alone without being sent.
+        """
+        if not self.creds:
+            logger.error("Google Calendar credentials not found. Run `python -m services.google_calendar_service` once.")
+            return None
+
+        results = [None] * len(events)
+        pending = []
+        for index, event_data in enumerate(events):
+            try:
+                pending.append((index, self._event_body(event_data)))
+            except (KeyError, TypeError, ValueError) as e:
+                results[index] = {"index": index, "status": "error", "message": f"Invalid event: {e}"}
+
+        service, http = self._client()
+
+        def on_response(request_id, response, exception):
+            index = int(request_id)
+            if exception is not None:
+                results[index] = {"index": index, "status": "error", "message": str(exception)}
+            else:
+                results[index] = {
+                    "index": index,
+                    "status": "success",
+                    "id": response.get('id'),
+                    "link": response.get('htmlLink'),
+                }
+
+        for start in range(0, len(pending), BATCH_LIMIT):
+            if self.api_endpoint:
+                # The discovery document's batch path always points at Google
+                batch = BatchHttpRequest(callback=on_response, batch_uri=f"{self.api_endpoint}/batch/calendar/v3")
+            else:
+                batch = service.new_batch_http_request(callback=on_response)
+            for index, body in pending[start:start + BATCH_LIMIT]:
+                batch.add(service.events().insert(calendarId='primary', body=body), request_id=str(index))
+            try:
+                with stage("google_calendar.batch"):
+                    batch.execute(http=http)
+            except Exception as e:
+                logger.warning("Calendar batch request failed", extra={"error": str(e)})
+                for index, _ in pending[start:start + BATCH_LIMIT]:
+                    if results[index] is None:
+                        results[index] = {"index": index, "status": "error", "message": str(e)}
+        return results
+
+
+if __name__ == "__main__":
+    GoogleCalendarService().authorize()
+    print("Google Calendar authorized; token.json saved.")
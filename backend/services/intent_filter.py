@@ -0,0 +1,133 @@
+import re
+import datetime
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+_MONTH_ALT = "jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+_WEEKDAY_ALT = "monday|tuesday|wednesday|thursday|friday|saturday|sunday|tues|thurs"
+_ORDINAL = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+# Expressions that pin something to a point in time
+TEMPORAL = re.compile(
+    r"\b(?:"
+    rf"(?:this|next|coming|on)?\s*(?:{_WEEKDAY_ALT})s?"
+    r"|tomorrow|tonight|day after tomorrow"
+    r"|next (?:week|month|quarter|year)"
+    r"|end of (?:the )?(?:day|week|month|quarter)|eod|eow"
+    r"|in (?:a|an|one|two|three|four|five|\d+) (?:minutes?|hours?|days?|weeks?|months?)"
+    r"|at \d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\.?)?"
+    r"|\d{1,2}(?::\d{2})\s*(?:[ap]\.?m\.?)?"
+    r"|\d{1,2}\s*[ap]\.?m\.?"
+    r"|noon|midnight"
+    rf"|(?:{_MONTH_ALT})\.?\s+{_ORDINAL}"
+    rf"|{_ORDINAL} of (?:{_MONTH_ALT})"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}/\d{1,2}(?:/\d{2,4})?"
+    r")\b",
+    re.IGNORECASE,
+)
+
+# Language that asks for something to be put on a calendar
+INTENT = re.compile(
+    r"\b(?:"
+    r"let'?s (?:sync|meet|talk|catch up|reconvene|regroup|hop on|get together|circle back|schedule)"
+    r"|schedul(?:e|ed|ing)|reschedul\w*|book (?:a|the)|set up (?:a|the)? ?(?:call|meeting|sync|time)"
+    r"|calendar invite|send (?:an? )?invite|block (?:some )?time|find (?:a )?(?:slot|time)|remind me|follow[- ]up (?:call|meeting)"
+    r"|deadline|due (?:on|by)|stand-?up|one-on-one|1:1"
+    r")\b",
+    re.IGNORECASE,
+)
+
+
+def has_scheduling_intent(text: str) -> bool:
+    """
+    Cheap recall-oriented check: True if the text mentions a point in time or
+    scheduling language. When it is False the LLM would only return [].
+    """
+    return bool(TEMPORAL.search(text) or INTENT.search(text))
+
+
+def parse_current_date(current_date: str):
+    """Parses the "Friday, February 27, 2026" format main.py sends; None if unrecognised."""
+    for fmt in ("%A, %B %d, %Y", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(current_date, fmt).date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+_RELATIVE = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b", re.IGNORECASE)
+_WEEKDAY_REF = re.compile(rf"\b(?:(this|next|coming|on)\s+)?({_WEEKDAY_ALT})\b", re.IGNORECASE)
+_MONTH_DAY = re.compile(rf"\b({_MONTH_ALT})\.?\s+{_ORDINAL}\b|\b{_ORDINAL} of ({_MONTH_ALT})\b", re.IGNORECASE)
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+def _month_number(name: str) -> int:
+    name = name.lower()
+    for index, month in enumerate(MONTHS):
+        if month.startswith(name[:3]):
+            return index + 1
+    raise ValueError(name)
+
+
+def _weekday_number(name: str) -> int:
+    name = name.lower()
+    for index, day in enumerate(WEEKDAYS):
+        if day.startswith(name[:3]):
+            return index
+    raise ValueError(name)
+
+
+def resolve_dates(text: str, current_date: str):
+    """
+    Resolves the date expressions that have only one reading relative to
+    current_date. Returns [{"phrase", "date": "YYYY-MM-DD"}]. "next <weekday>"
+    is skipped on purpose: whether it means this week or the one after is
+    ambiguous and is left to the LLM.
+    """
+    today = parse_current_date(current_date)
+    if today is None:
+        return []
+    resolved = []
+
+    for match in _RELATIVE.finditer(text):
+        word = match.group(1).lower()
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}[word]
+        resolved.append({"phrase": match.group(0), "date": (today + datetime.timedelta(days=offset)).isoformat()})
+
+    for match in _WEEKDAY_REF.finditer(text):
+        qualifier = (match.group(1) or "").lower()
+        if qualifier in ("next", "coming"):
+            continue
+        days_ahead = (_weekday_number(match.group(2)) - today.weekday()) % 7
+        if days_ahead == 0:
+            # "Friday" said on a Friday may mean today or a week out
+            continue
+        resolved.append({"phrase": match.group(0), "date": (today + datetime.timedelta(days=days_ahead)).isoformat()})
+
+    for match in _MONTH_DAY.finditer(text):
+        month_name, day = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+        try:
+            candidate = datetime.date(today.year, _month_number(month_name), int(day))
+        except ValueError:
+            continue
+        if candidate < today:
+            # A bare month/day in the past almost always means next year's
+            try:
+                candidate = candidate.replace(year=today.year + 1)
+            except ValueError:
+                continue
+        resolved.append({"phrase": match.group(0), "date": candidate.isoformat()})
+
+    for match in _ISO_DATE.finditer(text):
+        try:
+            date = datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            continue
+        resolved.append({"phrase": match.group(0), "date": date.isoformat()})
+
+    return resolved
@@ -0,0 +1,186 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+
+class Job:
+    """One unit of background work plus everything a client may poll for."""
+
+    def __init__(self, kind: str, payload):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stages = {}
+        self.result = None
+        self.error = None
+        self.version = 0
+        # Set by JobQueue so stage progress reaches SSE listeners
+        self.on_change = None
+
+    def stage(self, name: str):
+        """Async context manager that records how long a stage took and whether it failed."""
+        return _StageTimer(self, name)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round(self.started_at - self.created_at, 4) if self.started_at else None,
+            "total_seconds": round(self.finished_at - self.created_at, 4) if self.finished_at else None,
+            "stages": self.stages,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class _StageTimer:
+    def __init__(self, job: Job, name: str):
+        self.job = job
+        self.name = name
+
+    async def __aenter__(self):
+        self.started = time.perf_counter()
+        self.job.stages[self.name] = {"status": "running", "seconds": None}
+        if self.job.on_change:
+            self.job.on_change(self.job)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.job.stages[self.name] = {
+            "status": "failed" if exc_type else "done",
+            "seconds": round(time.perf_counter() - self.started, 4),
+        }
+        if self.job.on_change:
+            self.job.on_change(self.job)
+        return False
+
+
+class InMemoryJobStore:
+    """
+    Default job backend: a bounded, process-local dict.
+    Any object with the same save/get methods (Redis, SQL...) can replace it.
+    """
+
+    def __init__(self, max_jobs: int = 10000, ttl_seconds: float = 3600):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs = OrderedDict()
+
+    def save(self, job: Job):
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        self._prune()
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            finished_long_ago = oldest.finished_at is not None and oldest.finished_at < cutoff
+            if len(self._jobs) > self.max_jobs or finished_long_ago:
+                self._jobs.popitem(last=False)
+            else:
+                break
+
+
+class JobQueue:
+    """
+    Bounded in-process queue drained by a fixed number of asyncio workers.
+    submit() raises asyncio.QueueFull once max_pending jobs are waiting, which
+    the API turns into a 503 so clients back off instead of piling up.
+    """
+
+    def __init__(self, handlers: dict, store=None, workers: int = None, max_pending: int = None, timeout_seconds: float = None):
+        self.handlers = handlers
+        self.store = store or InMemoryJobStore()
+        self.workers = workers or int(os.getenv("AETHER_JOB_WORKERS", "16"))
+        self.max_pending = max_pending or int(os.getenv("AETHER_JOB_MAX_PENDING", "500"))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("AETHER_JOB_TIMEOUT_SECONDS", "120"))
+        self._queue = None
+        self._tasks = []
+        self._changed = {}
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def submit(self, kind: str, payload) -> Job:
+        if self._queue is None:
+            raise RuntimeError("JobQueue.start() has not been awaited")
+        job = Job(kind, payload)
+        job.on_change = self._notify
+        self._queue.put_nowait(job)
+        self.store.save(job)
+        return job
+
+    def get(self, job_id: str):
+        return self.store.get(job_id)
+
+    def _notify(self, job: Job):
+        job.version += 1
+        self.store.save(job)
+        event = self._changed.pop(job.id, None)
+        if event:
+            event.set()
+
+    async def wait_for_change(self, job: Job, seen_version: int, timeout: float = 15.0) -> bool:
+        """Waits until the job moves past seen_version. Returns False on timeout."""
+        if job.version != seen_version:
+            return True
+        event = self._changed.setdefault(job.id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = "running"
+                job.started_at = time.time()
+                self._notify(job)
+                handler = self.handlers[job.kind]
+                job.result = await asyncio.wait_for(handler(job), self.timeout_seconds)
+                job.status = "succeeded"
+            except asyncio.TimeoutError:
+                job.status = "failed"
+                job.error = f"Timed out after {self.timeout_seconds:g}s"
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e) or e.__class__.__name__
+            finally:
+                job.finished_at = time.time()
+                self._notify(job)
+                self._queue.task_done()
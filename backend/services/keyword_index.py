@@ -0,0 +1,137 @@
+import re
+import math
+import time
+import threading
+from collections import Counter
+
+# Words, numbers and joined identifiers such as "jira-1234", "v2.1" or "node.js"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./#][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or so that the their them then
+there they this to was we were what when which who will with you your
+""".split())
+
+
+def tokenize(text: str):
+    """
+    Search terms: lowercased words and numbers, stopwords dropped. A joined
+    identifier is indexed whole and by its parts, so "JIRA-1234" matches a
+    query for either "jira-1234" or "1234".
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(part for part in re.split(r"[-_./#]", token) if part and part not in STOPWORDS)
+    return terms
+
+
+class _UserIndex:
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}
+        # chunk id -> (memory key, ts, meeting_id), for grouping and filtering hits
+        self.docs = {}
+        self.total_length = 0
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+
+class KeywordIndex:
+    """
+    Per-user BM25 inverted index over memory chunks, kept beside the Chroma
+    collection. Chroma stays the source of truth: MemoryService loads a user's
+    chunks on first search and feeds every later write through add().
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._users = {}
+        self._guard = threading.Lock()
+
+    def _user(self, username: str) -> _UserIndex:
+        with self._guard:
+            return self._users.setdefault(username, _UserIndex())
+
+    def is_loaded(self, username: str) -> bool:
+        return username in self._users
+
+    def synced_at(self, username: str) -> float:
+        index = self._users.get(username)
+        return index.synced_at if index else 0.0
+
+    def known_ids(self, username: str) -> set:
+        index = self._users.get(username)
+        if index is None:
+            return set()
+        with index.lock:
+            return set(index.docs)
+
+    def add(self, username: str, ids, documents, entries, synced: bool = False):
+        """
+        Indexes chunks: entries[i] is (memory key, ts, meeting_id) for ids[i].
+        Chunks already indexed are skipped, so overlapping syncs are harmless.
+        """
+        index = self._user(username)
+        with index.lock:
+            for chunk_id, document, entry in zip(ids, documents, entries):
+                if chunk_id in index.docs:
+                    continue
+                counts = Counter(tokenize(document or ""))
+                for term, count in counts.items():
+                    index.postings.setdefault(term, {})[chunk_id] = count
+                length = sum(counts.values())
+                index.lengths[chunk_id] = length
+                index.total_length += length
+                index.docs[chunk_id] = entry
+            if synced:
+                index.synced_at = time.time()
+
+    def drop(self, username: str):
+        with self._guard:
+            self._users.pop(username, None)
+
+    def search(self, username: str, query: str, limit: int, since: float = None, until: float = None, meeting_id: str = None):
+        """
+        BM25-ranked [(chunk_id, memory_key, score)], best first, restricted to
+        chunks that pass the same time and meeting filters as the vector search.
+        """
+        index = self._users.get(username)
+        terms = set(tokenize(query))
+        if index is None or not terms:
+            return []
+
+        def allowed(chunk_id):
+            _, ts, meeting = index.docs[chunk_id]
+            if meeting_id is not None and meeting != meeting_id:
+                return False
+            if since is not None and (ts is None or ts < since):
+                return False
+            if until is not None and (ts is None or ts > until):
+                return False
+            return True
+
+        with index.lock:
+            count = len(index.docs)
+            if not count:
+                return []
+            average_length = index.total_length / count or 1.0
+            scores = {}
+            for term in terms:
+                postings = index.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * index.lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            ranked = sorted(
+                ((chunk_id, index.docs[chunk_id][0], score) for chunk_id, score in scores.items() if allowed(chunk_id)),
+                key=lambda item: item[2],
+                reverse=True,
+            )
+        return ranked[:limit]
@@ -0,0 +1,144 @@
+import os
+
+import numpy as np
+
+from services.audio_preprocess import TARGET_RATE, FRAME_MS, ABSOLUTE_FLOOR_DB, NOISE_MARGIN_DB, PAD_MS, MIN_SPEECH_MS
+
+# Trailing silence that closes a segment; lower means faster finals but more mid-sentence cuts
+PAUSE_MS = int(os.getenv("AETHER_LIVE_PAUSE_MS", "600"))
+# Someone talking without a pause still gets a final every this many seconds
+MAX_SEGMENT_SECONDS = float(os.getenv("AETHER_LIVE_MAX_SEGMENT_SECONDS", "20"))
+# How much new speech triggers another partial transcript, which covers only that new audio
+PARTIAL_INTERVAL_MS = int(os.getenv("AETHER_LIVE_PARTIAL_MS", "1500"))
+
+FRAME = TARGET_RATE * FRAME_MS // 1000
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """Little-endian signed 16-bit PCM -> float32 in [-1, 1)."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class LiveSegmenter:
+    """
+    Rolling buffer for one live-transcription session. Audio is fed in as it
+    arrives; every pause after enough speech closes a segment, which feed()
+    returns so it can be transcribed while the speaker carries on.
+
+    The noise floor adapts as audio streams in (falls quickly, rises slowly),
+    so the same thresholds as the upload VAD work without seeing the whole
+    recording first.
+    """
+
+    def __init__(self, pause_ms: int = None, max_segment_seconds: float = None, partial_interval_ms: int = None):
+        self.pause_frames = max(1, (pause_ms or PAUSE_MS) // FRAME_MS)
+        self.max_frames = int((max_segment_seconds or MAX_SEGMENT_SECONDS) * 1000 / FRAME_MS)
+        self.partial_frames = max(1, (partial_interval_ms or PARTIAL_INTERVAL_MS) // FRAME_MS)
+        self.pad_frames = PAD_MS // FRAME_MS
+        self.min_speech_frames = MIN_SPEECH_MS // FRAME_MS
+
+        self.segment_index = 0
+        self._samples = np.empty(0, dtype=np.float32)
+        self._unframed = np.empty(0, dtype=np.float32)
+        self._energies = []
+        self._offset = 0
+        self._noise_floor = None
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._partial_mark = 0
+
+    @property
+    def has_speech(self) -> bool:
+        return self._speech_frames >= self.min_speech_frames
+
+    def feed(self, samples: np.ndarray):
+        """Appends 16 kHz mono samples; returns the segments this audio closed."""
+        data = np.concatenate((self._unframed, samples))
+        usable = data.size - data.size % FRAME
+        self._unframed = data[usable:]
+        if not usable:
+            return []
+
+        frames = data[:usable].reshape(-1, FRAME)
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        energies = 20 * np.log10(np.maximum(rms, 1e-10))
+
+        self._samples = np.concatenate((self._samples, data[:usable]))
+        segments = []
+        for energy in energies:
+            self._energies.append(energy)
+            if self._is_voiced(energy):
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+
+            if self.has_speech and self._silence_run >= self.pause_frames:
+                segments.append(self._cut(len(self._energies) - self._silence_run + self.pad_frames))
+            elif len(self._energies) >= self.max_frames:
+                segments.append(self._cut(self._quietest_frame()))
+            elif self._speech_frames == 0 and len(self._energies) > self.pad_frames:
+                # Nothing said yet: keep only enough lead-in to not clip the first word
+                self._drop(len(self._energies) - self.pad_frames)
+        return segments
+
+    def partial_due(self) -> bool:
+        """True once enough new speech has arrived since the last partial."""
+        return self.has_speech and len(self._energies) - self._partial_mark >= self.partial_frames
+
+    def snapshot(self):
+        """
+        The audio of the open segment since the previous partial, so each
+        partial costs one interval of Whisper time however long the segment
+        runs; the client appends the texts until the segment's final arrives.
+        """
+        start, self._partial_mark = self._partial_mark, len(self._energies)
+        return self.segment_index, self._samples[start * FRAME: self._partial_mark * FRAME].copy()
+
+    def flush(self):
+        """Closes whatever is buffered (end of stream); None if it holds no speech."""
+        if not self.has_speech:
+            return None
+        if self._unframed.size:
+            self._samples = np.concatenate((self._samples, self._unframed))
+            self._unframed = np.empty(0, dtype=np.float32)
+        segment = self._cut(len(self._energies), include_tail=True)
+        self._samples = np.empty(0, dtype=np.float32)
+        return segment
+
+    def _is_voiced(self, energy: float) -> bool:
+        if self._noise_floor is None:
+            # Assume a quiet room until proven otherwise, so a session that opens mid-word still counts it
+            self._noise_floor = min(energy, ABSOLUTE_FLOOR_DB - NOISE_MARGIN_DB)
+        if energy < self._noise_floor:
+            self._noise_floor += 0.3 * (energy - self._noise_floor)
+        else:
+            self._noise_floor += 0.005 * (energy - self._noise_floor)
+        return energy > max(ABSOLUTE_FLOOR_DB, self._noise_floor + NOISE_MARGIN_DB)
+
+    def _quietest_frame(self) -> int:
+        # Forced cut: pick the quietest frame in the last third of the segment
+        start = len(self._energies) * 2 // 3
+        return start + int(np.argmin(self._energies[start:])) + 1
+
+    def _cut(self, frames: int, include_tail: bool = False) -> dict:
+        frames = min(frames, len(self._energies))
+        end = self._samples.size if include_tail else frames * FRAME
+        segment = {
+            "index": self.segment_index,
+            "samples": self._samples[:end],
+            "start": round(self._offset / TARGET_RATE, 3),
+            "end": round((self._offset + end) / TARGET_RATE, 3),
+        }
+        self.segment_index += 1
+        self._drop(frames)
+        self._speech_frames = 0
+        self._silence_run = min(self._silence_run, len(self._energies))
+        self._partial_mark = 0
+        return segment
+
+    def _drop(self, frames: int):
+        self._offset += frames * FRAME
+        self._samples = self._samples[frames * FRAME:]
+        del self._energies[:frames]
+        self._partial_mark = max(0, self._partial_mark - frames)
@@ -0,0 +1,349 @@
+"""
+One scheduler for every Groq call the backend makes.
+
+    response = gateway.chat(self.client, model=EXTRACTION_MODEL, messages=[...])
+    text = gateway.transcribe(self.client, model="whisper-large-v3-turbo", file=(name, audio))
+
+Each model gets its own concurrency limit that adapts like TCP congestion
+control (AIMD): every success raises it by 1/limit, a 429 (or 503) halves it
+once per congestion event and pauses the model for the server's retry-after.
+Rate limits, overloads and connection errors are retried with jittered
+exponential backoff; when retries run out, or a call waits longer than
+AETHER_LLM_QUEUE_TIMEOUT for a slot, LLMUnavailable is raised (main.py turns it
+into a 503 with Retry-After) instead of the caller guessing an empty result.
+Identical chat requests already in flight are sent once and share the answer.
+MicroBatcher packs calls that arrive close together into one request.
+
+Queue depth, wait time, the current limits and retries are exported on
+/metrics and summarized by stats() (/api/llm-stats).
+"""
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+
+from services.providers import ServiceUnavailable
+from services.metrics import registry, stage, record_llm_usage
+
+logger = logging.getLogger("aether.llm")
+
+# Slots per model: the starting (and highest) limit and the floor AIMD can cut it to.
+# AETHER_LLM_LIMITS overrides the ceiling per model: "llama-3.1-8b-instant=64,whisper-large-v3-turbo=8"
+MAX_CONCURRENCY = int(os.getenv("AETHER_LLM_MAX_CONCURRENCY", "32"))
+MIN_CONCURRENCY = int(os.getenv("AETHER_LLM_MIN_CONCURRENCY", "1"))
+MODEL_LIMITS = {
+    model.strip(): int(limit)
+    for model, _, limit in (item.partition("=") for item in os.getenv("AETHER_LLM_LIMITS", "").split(",") if "=" in item)
+}
+DECREASE_FACTOR = 0.5
+RETRIES = int(os.getenv("AETHER_LLM_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = float(os.getenv("AETHER_LLM_BACKOFF_SECONDS", "0.5"))
+BACKOFF_CAP_SECONDS = 20.0
+# A call that can't get a slot within this long is shed rather than queued forever
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("AETHER_LLM_QUEUE_TIMEOUT", "30"))
+# Without a retry-after header a 429 pauses the model this long
+DEFAULT_PAUSE_SECONDS = 1.0
+
+QUEUE_DEPTH = registry.gauge("aether_llm_queue_depth", "LLM calls waiting for a concurrency slot.", ("model",))
+IN_FLIGHT = registry.gauge("aether_llm_in_flight", "LLM calls being sent.", ("model",))
+LIMIT = registry.gauge("aether_llm_concurrency_limit", "Current adaptive concurrency limit.", ("model",))
+QUEUE_WAIT = registry.histogram("aether_llm_queue_wait_seconds", "Time LLM calls waited for a slot.", ("model",))
+RETRIED = registry.counter("aether_llm_retries_total", "LLM calls retried, by reason.", ("model", "reason"))
+FAILED = registry.counter("aether_llm_failures_total", "LLM calls that failed for good, by reason.", ("model", "reason"))
+DEDUPLICATED = registry.counter("aether_llm_deduplicated_total", "Chat requests answered by an identical call in flight.", ("model",))
+BATCH_SIZE = registry.histogram(
+    "aether_llm_batch_size", "Items packed into one micro-batched request.", ("batch",), buckets=(1, 2, 4, 8, 16, 32)
+)
+
+
+class LLMUnavailable(ServiceUnavailable):
+    """The provider kept refusing (rate limit, overload, network) or the queue was full."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _header(headers, name):
+    try:
+        return headers.get(name)
+    except AttributeError:
+        return None
+
+
+def retry_after_seconds(exc):
+    """Seconds from retry-after-ms / retry-after (delta or HTTP date) on an SDK error, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    value = _header(headers, "retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = _header(headers, "retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def classify(exc):
+    """'throttled', 'server_error' or 'connection' for failures worth retrying, else None."""
+    status = getattr(exc, "status_code", None)
+    if status in (429, 503):
+        return "throttled"
+    if isinstance(status, int) and status >= 500:
+        return "server_error"
+    if status is None:
+        import groq
+        if isinstance(exc, (groq.APIConnectionError, ConnectionError, TimeoutError)):
+            return "connection"
+    return None
+
+
+class AdaptiveLimit:
+    """Concurrency slots for one model, sized by additive increase / multiplicative decrease."""
+
+    def __init__(self, model: str, ceiling: int, floor: int = MIN_CONCURRENCY):
+        self.model = model
+        self.ceiling = max(1, ceiling)
+        self.floor = max(1, min(floor, self.ceiling))
+        self.limit = float(self.ceiling)
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        LIMIT.set(self.ceiling, model=model)
+
+    def acquire(self, timeout: float) -> float:
+        """Blocks until a slot is free and the model isn't paused; returns the seconds waited."""
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            self.waiting += 1
+            QUEUE_DEPTH.inc(model=self.model)
+            try:
+                while True:
+                    now = time.monotonic()
+                    pause = self.paused_until - now
+                    if pause <= 0 and self.in_flight < int(self.limit):
+                        break
+                    if now >= deadline:
+                        raise LLMUnavailable(
+                            f"{self.model}: no capacity after waiting {timeout:.0f}s",
+                            retry_after=max(pause, 1.0),
+                        )
+                    self._cond.wait(min(deadline - now, pause) if pause > 0 else deadline - now)
+                self.in_flight += 1
+                self.requests += 1
+            finally:
+                self.waiting -= 1
+                QUEUE_DEPTH.dec(model=self.model)
+            waited = time.monotonic() - started
+            self.wait_seconds += waited
+        IN_FLIGHT.inc(model=self.model)
+        QUEUE_WAIT.observe(waited, model=self.model)
+        return waited
+
+    def release(self, started: float, throttled: bool = False, succeeded: bool = False, pause: float = None):
+        """started is when the call got its slot; only calls sent after the last cut can cut again."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                if started >= self._last_decrease:
+                    self.limit = max(float(self.floor), self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+                self.paused_until = max(self.paused_until, now + (pause if pause is not None else DEFAULT_PAUSE_SECONDS))
+            elif succeeded:
+                self.limit = min(float(self.ceiling), self.limit + 1 / self.limit)
+            LIMIT.set(int(self.limit), model=self.model)
+            self._cond.notify_all()
+        IN_FLIGHT.dec(model=self.model)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "ceiling": self.ceiling,
+                "in_flight": self.in_flight,
+                "queued": self.waiting,
+                "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 3),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "mean_wait_ms": round(1000 * self.wait_seconds / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+class LLMGateway:
+    def __init__(self, retries: int = RETRIES, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.retries = retries
+        self.queue_timeout = queue_timeout
+        self._limits = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def limit_for(self, model: str) -> AdaptiveLimit:
+        limit = self._limits.get(model)
+        if limit is None:
+            with self._lock:
+                limit = self._limits.get(model)
+                if limit is None:
+                    limit = self._limits[model] = AdaptiveLimit(model, MODEL_LIMITS.get(model, MAX_CONCURRENCY))
+        return limit
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full jitter; a server-given retry-after is the minimum, spread so retries don't arrive together."""
+        if retry_after is not None:
+            return retry_after + self._random.uniform(0, BACKOFF_BASE_SECONDS)
+        return self._random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def _send(self, model: str, stage_name: str, send, retries: int = None):
+        limit = self.limit_for(model)
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                with stage("llm.queue"):
+                    limit.acquire(self.queue_timeout)
+            except LLMUnavailable:
+                FAILED.inc(model=model, reason="queue_timeout")
+                raise
+            started = time.monotonic()
+            try:
+                with stage(stage_name):
+                    result = send()
+            except Exception as e:
+                reason = classify(e)
+                pause = retry_after_seconds(e) if reason == "throttled" else None
+                limit.release(started, throttled=reason == "throttled", pause=pause)
+                if reason is None:
+                    FAILED.inc(model=model, reason="rejected")
+                    raise
+                if attempt == retries:
+                    FAILED.inc(model=model, reason=reason)
+                    raise LLMUnavailable(f"{model}: {reason} after {attempt + 1} attempts ({e})", retry_after=pause) from e
+                RETRIED.inc(model=model, reason=reason)
+                delay = self.backoff(attempt, pause)
+                logger.warning("LLM call failed, retrying", extra={
+                    "model": model, "reason": reason, "attempt": attempt + 1, "retry_in_s": round(delay, 3),
+                })
+                time.sleep(delay)
+                continue
+            limit.release(started, succeeded=True)
+            return result
+
+    def chat(self, client, model: str, messages, **kwargs):
+        """client.chat.completions.create(...) under the model's limit; identical calls in flight are shared."""
+        key = hashlib.sha256(
+            json.dumps([id(client), model, messages, kwargs], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        with self._lock:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                future = self._in_flight[key] = Future()
+        if shared is not None:
+            DEDUPLICATED.inc(model=model)
+            return shared.result()
+
+        try:
+            response = self._send(
+                model, "groq.chat", lambda: client.chat.completions.create(model=model, messages=messages, **kwargs)
+            )
+            future.set_result(response)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        record_llm_usage(model, response)
+        return response
+
+    def transcribe(self, client, model: str, file, retries: int = None, **kwargs):
+        """client.audio.transcriptions.create(...) under the model's limit."""
+        return self._send(
+            model, "whisper", lambda: client.audio.transcriptions.create(file=file, model=model, **kwargs), retries
+        )
+
+    def stats(self) -> dict:
+        return {model: limit.stats() for model, limit in sorted(self._limits.items())}
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects submit() calls with the same key that arrive within `window`
+    seconds (or until max_items) and hands them to run_batch(key, items) as
+    one list; each caller gets back its own element of the returned list.
+    The first caller of a batch waits out the window and runs it on its own
+    thread, so no extra threads are needed and a full pool can't deadlock it.
+    """
+
+    def __init__(self, name: str, run_batch, window: float, max_items: int):
+        self.name = name
+        self.run_batch = run_batch
+        self.window = window
+        self.max_items = max_items
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, item):
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_items:
+                del self._open[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            BATCH_SIZE.observe(len(batch.items), batch=self.name)
+            try:
+                batch.results = self.run_batch(key, batch.items)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+
+gateway = LLMGateway()
@@ -0,0 +1,75 @@
+"""
+Structured logging for the backend.
+
+    logger = logging.getLogger("aether.audio")
+    logger.warning("Transcription failed", extra={"chunk": 3, "attempt": 2})
+
+With AETHER_LOG_FORMAT=json (the default) every record is one JSON object on
+stderr carrying the message, level, logger, the request id of the request
+being served and any `extra` fields; "text" gives plain single-line logs for
+local development. AETHER_LOG_LEVEL sets the level (INFO by default).
+"""
+import os
+import sys
+import json
+import logging
+import contextvars
+from datetime import datetime, timezone
+
+LOG_FORMAT = os.getenv("AETHER_LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("AETHER_LOG_LEVEL", "INFO").upper()
+
+# Set by the HTTP middleware; copied into worker threads by run_in_pool
+request_id = contextvars.ContextVar("aether_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        current = request_id.get()
+        if current:
+            entry["request_id"] = current
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRIBUTES and not k.startswith("_")}
+        current = request_id.get()
+        if current:
+            fields["request_id"] = current
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging(fmt: str = None, level: str = None):
+    """Installs the handler on the "aether" logger once; safe to call repeatedly."""
+    logger = logging.getLogger("aether")
+    logger.setLevel(level or LOG_LEVEL)
+    if not any(getattr(handler, "_aether", False) for handler in logger.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler._aether = True
+        logger.addHandler(handler)
+        logger.propagate = False
+    for handler in logger.handlers:
+        if getattr(handler, "_aether", False):
+            handler.setFormatter(JsonFormatter() if (fmt or LOG_FORMAT) == "json" else TextFormatter())
+    return logger
@@ -1,63 +1,769 @@
 from groq import Groq
 import os
+import json
+import re
+import time
+import threading
+import logging
+import base64
+import datetime
 import chromadb
+import numpy as np
+from services.theme_engine import ThemeEngine
+from services.chunking import chunk_text, chunk_id, memory_hash, assemble
+from services.keyword_index import KeywordIndex
+from services.cache_service import LRUCache, MISSING
+from services.partitioning import collection_name, shares_collection, LEGACY_COLLECTION, PARTITIONING, PARTITIONING_SETTING
+from services.metrics import stage, InstrumentedCollection
+from services.llm_gateway import gateway, LLMUnavailable
+from services.embeddings import make_embedding_function
+from services.context_packer import estimate_tokens, pack, split_to_budget, truncate
+from services.summary_store import (
+    SummaryStore, SummaryRefresher, SUMMARIES_ENABLED, ROLLUP_LEVELS, period_keys, period_range, source_hash
+)
+
+logger = logging.getLogger("aether.memory")
+
+# Where Chroma persists memories (relative to the backend folder by default)
+CHROMA_PATH = os.getenv("AETHER_CHROMA_PATH", "./chroma_db")
+# How long a cached analytics result is trusted before the id listing is
+# re-checked (covers writes made by other worker processes).
+ANALYTICS_REVALIDATE_SECONDS = float(os.getenv("AETHER_ANALYTICS_REVALIDATE_SECONDS", "30"))
+# Token budgets for the themes prompt: all the meeting notes together, and
+# each meeting on its own (longer ones are cut down to their start and end)
+ANALYTICS_CONTEXT_TOKENS = int(os.getenv("AETHER_ANALYTICS_CONTEXT_TOKENS", "6000"))
+ANALYTICS_MEMORY_TOKENS = int(os.getenv("AETHER_ANALYTICS_MEMORY_TOKENS", "800"))
+# Transcripts above this many tokens are summarized part by part, then the parts combined
+SUMMARY_CONTEXT_TOKENS = int(os.getenv("AETHER_SUMMARY_CONTEXT_TOKENS", "6000"))
+SUMMARY_INSTRUCTION = "Summarize this meeting transcript"
+DIGEST_INSTRUCTION = "Write a digest of the main topics, decisions and open items in these meeting summaries from {period}"
+# Memories this short are stored as their own summary, without an LLM call
+SUMMARY_VERBATIM_TOKENS = int(os.getenv("AETHER_SUMMARY_VERBATIM_TOKENS", "150"))
+# Input budget of one meeting/week/month rollup (newest memory summaries first) and per summary in it
+ROLLUP_CONTEXT_TOKENS = int(os.getenv("AETHER_SUMMARY_ROLLUP_TOKENS", "3000"))
+ROLLUP_ITEM_TOKENS = int(os.getenv("AETHER_SUMMARY_ROLLUP_ITEM_TOKENS", "400"))
+# "llm" asks Llama 3 for themes, "local" clusters the stored embeddings
+ANALYTICS_MODE = os.getenv("AETHER_ANALYTICS_MODE", "llm")
+# Page size when pulling embeddings out of Chroma
+EMBEDDING_FETCH_BATCH = 1000
+# Characters returned per memory when the Vault asks for snippets
+SNIPPET_CHARS = 280
+# Transcripts are stored as overlapping sentence windows of this size
+CHUNK_CHARS = int(os.getenv("AETHER_CHUNK_CHARS", "1200"))
+CHUNK_OVERLAP_CHARS = int(os.getenv("AETHER_CHUNK_OVERLAP_CHARS", "200"))
+CHUNK_ONLY_METADATA = ("chunk_index", "start")
+# Chunks fetched per requested result, so several hits on one transcript still leave n distinct memories
+SEARCH_OVERFETCH = 5
+MAX_SEARCH_CHUNKS = 100
+# Reciprocal rank fusion constant: higher flattens the advantage of the very top ranks
+RRF_K = 60
+# How often a user's keyword index is reconciled with Chroma (writes from other workers)
+KEYWORD_REVALIDATE_SECONDS = float(os.getenv("AETHER_KEYWORD_REVALIDATE_SECONDS", "30"))
+# Memory budgets for the query-embedding cache (shared by all users) and the per-user result cache
+QUERY_EMBEDDING_CACHE_BYTES = int(os.getenv("AETHER_QUERY_EMBEDDING_CACHE_BYTES", str(16 * 1024 * 1024)))
+SEARCH_CACHE_BYTES = int(os.getenv("AETHER_SEARCH_CACHE_BYTES", str(32 * 1024 * 1024)))
 
 class MemoryService:
-    def __init__(self):
+    def __init__(self, client=None):
         # Initialize ChromaDB
-        self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
-        self.collection = self.chroma_client.get_or_create_collection(name="meeting_memories")
-        
-        # Initialize Groq client
+        self.chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+        # Held explicitly so query texts can be embedded (and cached) outside collection.query;
+        # AETHER_EMBEDDINGS=hashing avoids the model download (see services/embeddings.py)
+        self.embedding_function = make_embedding_function()
+        # Memories are partitioned per user (or per hash bucket); see services/partitioning.py
+        self.partitioning = self._choose_partitioning()
+        self._collections = {}
+
+        # Initialize Groq client (main.py passes the shared one)
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.client = Groq(api_key=self.api_key)
-        
+        self.client = client if client is not None else Groq(api_key=self.api_key, max_retries=0)
+        # Set once the embedding model has been loaded by warm_up() or a first query
+        self.embeddings_ready = False
+
+        # Per-user analytics cache: {username: {"ids", "result", "version", "checked_at"}}
+        self._analytics_cache = {}
+        self._versions = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.theme_engine = ThemeEngine()
+        self.keyword_index = KeywordIndex()
+        # Per-memory summaries and meeting/weekly/monthly rollups, refreshed in the background after writes
+        self.summaries = SummaryStore(self.chroma_client, self.embedding_function, self.partitioning)
+        self.summary_refresher = SummaryRefresher(self.refresh_summaries) if SUMMARIES_ENABLED else None
+        # Bumped by delete_user so a refresh already running doesn't write the summaries back
+        self._deletions = {}
+        # Query text -> embedding; embeddings don't depend on the user, so this is shared
+        self.query_embeddings = LRUCache(
+            max_entries=100000, max_bytes=QUERY_EMBEDDING_CACHE_BYTES, sizeof=lambda vector: vector.nbytes
+        )
+        # (user, version, query, filters, n) -> JSON results. A write bumps the user's
+        # version; the TTL bounds staleness from writes made by other processes.
+        self.search_results = LRUCache(
+            max_entries=100000, ttl_seconds=KEYWORD_REVALIDATE_SECONDS, max_bytes=SEARCH_CACHE_BYTES
+        )
+
+    def _collection(self, username: str):
+        """The Chroma collection that holds a user's memories, opened once per name."""
+        name = collection_name(username, self.partitioning)
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = InstrumentedCollection(self.chroma_client.get_or_create_collection(
+                name=name, embedding_function=self.embedding_function
+            ))
+            self._collections[name] = collection
+        return collection
+
+    def _where(self, username: str, *clauses):
+        """
+        Combines filters for a user's query. The username clause is only needed
+        when the collection is shared with other users. Returns None for no filter.
+        """
+        clauses = list(clauses)
+        if shares_collection(self.partitioning):
+            clauses.insert(0, {"username": username})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _choose_partitioning(self) -> str:
+        """
+        AETHER_PARTITIONING when set. Otherwise per-user collections, unless the
+        shared collection still holds rows: then "shared", so existing memories
+        stay visible until migrate_partitions.py --drop-source has moved them.
+        """
+        if PARTITIONING_SETTING == "shared":
+            return PARTITIONING_SETTING
+        try:
+            legacy = self.chroma_client.get_collection(LEGACY_COLLECTION).count()
+        except Exception:
+            legacy = 0
+        if not legacy:
+            return PARTITIONING
+        if PARTITIONING_SETTING:
+            logger.warning(
+                f"{legacy} rows are still in the shared '{LEGACY_COLLECTION}' collection and are "
+                f"not visible with AETHER_PARTITIONING={PARTITIONING_SETTING}. Run migrate_partitions.py.",
+                extra={"legacy_rows": legacy},
+            )
+            return PARTITIONING_SETTING
+        logger.warning(
+            f"{legacy} rows are in the shared '{LEGACY_COLLECTION}' collection; using it until "
+            f"migrate_partitions.py --drop-source has moved them to per-user collections.",
+            extra={"legacy_rows": legacy},
+        )
+        return "shared"
+
+    def _user_lock(self, username: str):
+        with self._locks_guard:
+            return self._locks.setdefault(username, threading.Lock())
+
     def add_memory(self, text: str, meeting_id: str, username: str):
-        import datetime
-        timestamp = datetime.datetime.now().isoformat()
-        self.collection.add(
-            documents=[text],
-            metadatas=[{"meeting_id": meeting_id, "timestamp": timestamp, "username": username}],
-            ids=[f"msg_{os.urandom(4).hex()}"]
+        """
+        Stores a transcript as sentence-aware overlapping chunks in one batched add.
+        Chunk ids are derived from the content, so re-ingesting the same transcript
+        is a no-op. Returns the memory id shared by all of its chunks.
+        """
+        result = self.add_memories([{"text": text, "meeting_id": meeting_id}], username)
+        return result["memory_ids"][0] if result["memory_ids"] else None
+
+    def _prepare_memory(self, text: str, meeting_id: str, username: str, timestamp: str = None):
+        """Chunks one transcript into (memory_id, ids, documents, metadatas)."""
+        memory_id = memory_hash(text, meeting_id, username)
+        chunks = chunk_text(text, CHUNK_CHARS, CHUNK_OVERLAP_CHARS)
+        if not chunks:
+            return None
+        moment = datetime.datetime.fromisoformat(timestamp) if timestamp else datetime.datetime.now()
+        base = {
+            "meeting_id": meeting_id,
+            "memory_id": memory_id,
+            "chunk_count": len(chunks),
+            "timestamp": moment.isoformat(),
+            "ts": moment.timestamp(),
+            "username": username,
+        }
+        return (
+            memory_id,
+            [chunk_id(memory_id, index) for index in range(len(chunks))],
+            [chunk for _, chunk in chunks],
+            [dict(base, chunk_index=index, start=start) for index, (start, _) in enumerate(chunks)],
         )
-        
-    def search_memories(self, query: str, username: str, n_results: int = 3):
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results,
-            where={"username": username}
+
+    def add_memories(self, items, username: str, summarize: bool = True):
+        """
+        Ingests many transcripts at once: [{"text", "meeting_id", "timestamp"?}].
+        Transcripts already stored (or repeated within items) are skipped by content
+        hash; the rest are embedded and written in as few collection.add calls as
+        Chroma's batch limit allows. Returns counts and the memory ids, in input order.
+        With summarize, the new memories are queued for background summaries.
+        """
+        prepared = {}
+        memory_ids = []
+        invalid = 0
+        for item in items:
+            try:
+                entry = self._prepare_memory(
+                    item["text"], str(item.get("meeting_id") or "import"), username, item.get("timestamp")
+                )
+            except (KeyError, TypeError, ValueError):
+                entry = None
+            if entry is None:
+                invalid += 1
+                continue
+            memory_ids.append(entry[0])
+            prepared.setdefault(entry[0], entry)
+
+        collection = self._collection(username)
+        existing = set()
+        head_ids = [entry[1][0] for entry in prepared.values()]
+        for start in range(0, len(head_ids), EMBEDDING_FETCH_BATCH):
+            existing.update(collection.get(ids=head_ids[start:start + EMBEDDING_FETCH_BATCH], include=[])["ids"])
+
+        ids, documents, metadatas = [], [], []
+        inserted = []
+        for entry in prepared.values():
+            if entry[1][0] in existing:
+                continue
+            inserted.append(entry[0])
+            ids.extend(entry[1])
+            documents.extend(entry[2])
+            metadatas.extend(entry[3])
+
+        batch_size = self.chroma_client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            collection.add(
+                documents=documents[start:start + batch_size],
+                metadatas=metadatas[start:start + batch_size],
+                ids=ids[start:start + batch_size]
+            )
+        if ids and self.keyword_index.is_loaded(username):
+            self.keyword_index.add(username, ids, documents, [self._index_entry(i, m) for i, m in zip(ids, metadatas)])
+        if inserted:
+            # Invalidate the analytics cache for this user
+            self._versions[username] = self._versions.get(username, 0) + 1
+            if summarize and self.summary_refresher is not None:
+                self.summary_refresher.request(username, inserted)
+        return {
+            "memory_ids": memory_ids,
+            "inserted": len(inserted),
+            "duplicates": len(memory_ids) - len(inserted),
+            "invalid": invalid,
+            "chunks": len(ids),
+        }
+
+    @staticmethod
+    def _memory_key(row_id: str, metadata: dict) -> str:
+        """Chunks share their memory_id; memories stored before chunking are keyed by their own id."""
+        return metadata.get("memory_id") or row_id
+
+    @staticmethod
+    def _public_metadata(metadata: dict) -> dict:
+        return {k: v for k, v in metadata.items() if k not in CHUNK_ONLY_METADATA}
+
+    def _head_rows(self, username: str):
+        """
+        [(sort_key, memory_key, chunk_id, metadata)] for the first chunk of every
+        memory of a user, newest first. Reads metadata only, never documents.
+        """
+        results = self._collection(username).get(where=self._where(username), include=["metadatas"])
+        rows = []
+        for row_id, metadata in zip(results["ids"], results["metadatas"]):
+            metadata = metadata or {}
+            if metadata.get("chunk_index", 0) != 0:
+                continue
+            key = self._memory_key(row_id, metadata)
+            rows.append((self._sort_key(key, metadata), key, row_id, metadata))
+        rows.sort(reverse=True)
+        return rows
+
+    def _memory_ids(self, username: str):
+        """Lists a user's memory ids (one per transcript) without loading any documents."""
+        return [key for _, key, _, _ in self._head_rows(username)]
+
+    def count_memories(self, username: str) -> int:
+        """Counts a user's memories from a metadata-only query."""
+        return len(self._head_rows(username))
+
+    def _fetch_memories(self, username: str, keys, with_embeddings: bool = False):
+        """
+        Reassembles whole memories from their chunks.
+        Returns {memory_id: {"id", "text", "metadata"[, "embedding"]}}; the embedding
+        of a chunked memory is the mean of its chunk embeddings.
+        """
+        include = ["documents", "metadatas"] + (["embeddings"] if with_embeddings else [])
+        collection = self._collection(username)
+        legacy = [k for k in keys if k.startswith("msg_")]
+        chunked = [k for k in keys if not k.startswith("msg_")]
+        pages = []
+        for start in range(0, len(chunked), EMBEDDING_FETCH_BATCH):
+            batch = chunked[start:start + EMBEDDING_FETCH_BATCH]
+            pages.append(collection.get(where=self._where(username, {"memory_id": {"$in": batch}}), include=include))
+        for start in range(0, len(legacy), EMBEDDING_FETCH_BATCH):
+            pages.append(collection.get(ids=legacy[start:start + EMBEDDING_FETCH_BATCH], include=include))
+
+        parts = {}
+        for page in pages:
+            embeddings = page["embeddings"] if with_embeddings else None
+            for n, (row_id, document, metadata) in enumerate(zip(page["ids"], page["documents"], page["metadatas"])):
+                metadata = metadata or {}
+                entry = parts.setdefault(
+                    self._memory_key(row_id, metadata), {"chunks": [], "metadata": metadata, "vectors": []}
+                )
+                entry["chunks"].append((metadata.get("start", 0), document or ""))
+                if metadata.get("chunk_index", 0) == 0:
+                    entry["metadata"] = metadata
+                if embeddings is not None:
+                    entry["vectors"].append(embeddings[n])
+
+        memories = {}
+        for key, entry in parts.items():
+            memory = {
+                "id": key,
+                "text": assemble(entry["chunks"]),
+                "metadata": self._public_metadata(entry["metadata"]),
+            }
+            if with_embeddings:
+                memory["embedding"] = np.mean(np.asarray(entry["vectors"], dtype=np.float32), axis=0)
+            memories[key] = memory
+        return memories
+
+    def _search_where(self, username: str, since: float = None, until: float = None, meeting_id: str = None):
+        """Chroma where clause for a user's chunks, with optional time and meeting filters."""
+        clauses = []
+        if since is not None:
+            clauses.append({"ts": {"$gte": since}})
+        if until is not None:
+            clauses.append({"ts": {"$lte": until}})
+        if meeting_id is not None:
+            clauses.append({"meeting_id": meeting_id})
+        return self._where(username, *clauses)
+
+    def _index_entry(self, row_id: str, metadata: dict):
+        return (self._memory_key(row_id, metadata), metadata.get("ts"), metadata.get("meeting_id"))
+
+    def _sync_keyword_index(self, username: str):
+        """
+        Loads a user's chunks into the keyword index on first use, then every
+        KEYWORD_REVALIDATE_SECONDS picks up chunks written by other processes
+        (an ids-only listing; documents are read for the new chunks only).
+        """
+        if time.time() - self.keyword_index.synced_at(username) < KEYWORD_REVALIDATE_SECONDS:
+            return
+        collection = self._collection(username)
+        stored = collection.get(where=self._where(username), include=[])["ids"]
+        known = self.keyword_index.known_ids(username)
+        missing = [row_id for row_id in stored if row_id not in known]
+        for start in range(0, len(missing), EMBEDDING_FETCH_BATCH):
+            page = collection.get(ids=missing[start:start + EMBEDDING_FETCH_BATCH], include=["documents", "metadatas"])
+            self.keyword_index.add(
+                username, page["ids"], page["documents"],
+                [self._index_entry(i, m or {}) for i, m in zip(page["ids"], page["metadatas"])],
+            )
+        self.keyword_index.add(username, [], [], [], synced=True)
+
+    def search_memories(self, query: str, username: str, n_results: int = 3,
+                        since: float = None, until: float = None, meeting_id: str = None):
+        """
+        Cached front of _hybrid_search: a repeated search skips the query
+        embedding, the ANN lookup and BM25 until the user adds a memory.
+        """
+        key = (username, self._versions.get(username, 0), query, n_results, since, until, meeting_id)
+        cached = self.search_results.get(key)
+        if cached is not MISSING:
+            return json.loads(cached)
+        results = self._hybrid_search(query, username, n_results, since, until, meeting_id)
+        self.search_results.set(key, json.dumps(results))
+        return results
+
+    def _embed_query(self, query: str):
+        embedding = self.query_embeddings.get(query)
+        if embedding is MISSING:
+            with stage("embedding.query"):
+                embedding = np.asarray(self.embedding_function([query])[0], dtype=np.float32)
+            self.query_embeddings.set(query, embedding)
+            self.embeddings_ready = True
+        return embedding
+
+    def warm_up(self):
+        """Loads the embedding model (its first call reads the ONNX weights from disk)."""
+        self.embedding_function(["warm up"])
+        self.embeddings_ready = True
+
+    def cache_stats(self) -> dict:
+        return {
+            "query_embeddings": self.query_embeddings.stats(),
+            "search_results": self.search_results.stats(),
+        }
+
+    def _hybrid_search(self, query: str, username: str, n_results: int,
+                       since: float = None, until: float = None, meeting_id: str = None):
+        """
+        Hybrid search: vector similarity from Chroma and BM25 over the keyword
+        index, fused by reciprocal rank. Exact names, ticket numbers and acronyms
+        rank well even when the embedding misses them. Filters are part of the
+        Chroma where clause (memories stored without a ts never match a date filter).
+        Returns one result per transcript with its best-matching passage and scores.
+        """
+        fetch = min(n_results * SEARCH_OVERFETCH, MAX_SEARCH_CHUNKS)
+        vector = self._collection(username).query(
+            query_embeddings=[self._embed_query(query)],
+            n_results=fetch,
+            where=self._search_where(username, since, until, meeting_id),
+            include=["documents", "metadatas", "distances"],
         )
-        return results["documents"]
+        self._sync_keyword_index(username)
+        keyword = self.keyword_index.search(username, query, fetch, since, until, meeting_id)
+
+        fused = {}
+
+        def entry(key, text, metadata):
+            return fused.setdefault(key, {
+                "id": key,
+                "text": text,
+                "metadata": self._public_metadata(metadata),
+                "score": 0.0,
+                "scores": {},
+            })
+
+        # Ranks count distinct memories, so one long transcript can't crowd the list
+        rank = 0
+        for row_id, document, metadata, distance in zip(
+            vector["ids"][0], vector["documents"][0], vector["metadatas"][0], vector["distances"][0]
+        ):
+            metadata = metadata or {}
+            key = self._memory_key(row_id, metadata)
+            if key in fused:
+                continue
+            rank += 1
+            hit = entry(key, document, metadata)
+            hit["distance"] = distance
+            hit["score"] += 1.0 / (RRF_K + rank)
+            hit["scores"].update(vector_rank=rank, vector_distance=distance)
+
+        keyword_best = {}
+        for chunk_id, key, bm25 in keyword:
+            keyword_best.setdefault(key, (chunk_id, bm25))
+        missing = [chunk_id for key, (chunk_id, _) in keyword_best.items() if key not in fused]
+        documents, metadatas = {}, {}
+        if missing:
+            page = self._collection(username).get(ids=missing, include=["documents", "metadatas"])
+            documents = dict(zip(page["ids"], page["documents"]))
+            metadatas = dict(zip(page["ids"], page["metadatas"]))
+        for rank, (key, (chunk_id, bm25)) in enumerate(keyword_best.items(), start=1):
+            if key not in fused and chunk_id not in documents:
+                # Deleted from Chroma since it was indexed
+                continue
+            hit = entry(key, documents.get(chunk_id), metadatas.get(chunk_id) or {})
+            hit["score"] += 1.0 / (RRF_K + rank)
+            hit["scores"].update(keyword_rank=rank, bm25=round(bm25, 4))
+
+        results = sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)[:n_results]
+        for hit in results:
+            hit["score"] = round(hit["score"], 6)
+        return results
 
     def get_all_memories(self, username: str):
-        """Retrieves all stored documents and their metadata from the collection for a specific user."""
-        results = self.collection.get(where={"username": username})
-        memories = []
-        if results["documents"]:
-            for i in range(len(results["documents"])):
-                memories.append({
-                    "text": results["documents"][i],
-                    "metadata": results["metadatas"][i] if results["metadatas"] else {}
-                })
-        return memories
+        """Retrieves all stored memories and their metadata for a specific user, newest first."""
+        return list(self.iter_memories(username))
+
+    @staticmethod
+    def _sort_key(memory_id: str, metadata: dict):
+        """Newest first; memories written before the numeric ts field fall back to the ISO timestamp."""
+        ts = metadata.get("ts")
+        if ts is None:
+            try:
+                ts = datetime.datetime.fromisoformat(metadata.get("timestamp", "")).timestamp()
+            except ValueError:
+                ts = 0.0
+        return (float(ts), memory_id)
+
+    @staticmethod
+    def encode_cursor(key) -> str:
+        return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        ts, memory_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (float(ts), memory_id)
+
+    def _page_items(self, username: str, rows, fields: str):
+        """Materializes one page of head rows; only the requested fields are read."""
+        if fields == "ids":
+            return [{"id": key, "metadata": self._public_metadata(m)} for _, key, _, m in rows]
+
+        if fields == "snippet":
+            # The first chunk already holds the opening of the transcript
+            head_ids = [row_id for _, _, row_id, _ in rows]
+            fetched = (
+                self._collection(username).get(ids=head_ids, include=["documents"])
+                if head_ids else {"ids": [], "documents": []}
+            )
+            documents = dict(zip(fetched["ids"], fetched["documents"]))
+            items = []
+            for _, key, row_id, metadata in rows:
+                text = documents.get(row_id) or ""
+                if len(text) > SNIPPET_CHARS:
+                    text = text[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+                items.append({"id": key, "text": text, "metadata": self._public_metadata(metadata)})
+            return items
 
-    def get_analytics(self, username: str):
+        memories = self._fetch_memories(username, [key for _, key, _, _ in rows])
+        return [
+            memories.get(key) or {"id": key, "text": "", "metadata": self._public_metadata(m)}
+            for _, key, _, m in rows
+        ]
+
+    def list_memories(self, username: str, limit: int = 50, cursor: str = None, fields: str = "full"):
         """
-        Fetches all memories and uses Llama 3 to extract the top 5 recurring themes.
-        Returns a JSON-compatible list of themes with counts.
+        Returns one page of a user's memories, newest first, plus the cursor for the next page.
+        Ordering only needs the metadata; documents are fetched for the page alone.
+        fields: "full" (text + metadata), "snippet" (shortened text) or "ids".
         """
-        memories = self.get_all_memories(username)
-        if not memories:
-            return {"themes": []}
+        rows = self._head_rows(username)
+        if cursor:
+            after = self.decode_cursor(cursor)
+            rows = [row for row in rows if row[0] < after]
 
-        # Extract just the text for analysis
-        memory_texts = [m["text"] for m in memories]
-        context = "\n---\n".join(memory_texts[:20]) # Limit to last 20 meetings for stability
-        
+        page = rows[:limit]
+        next_cursor = self.encode_cursor(page[-1][0]) if len(rows) > limit else None
+        return {"items": self._page_items(username, page, fields), "next_cursor": next_cursor}
+
+    def iter_memories(self, username: str, fields: str = "full", page_size: int = 100):
+        """Yields a user's memories page by page so callers never hold the whole history."""
+        rows = self._head_rows(username)
+        for start in range(0, len(rows), page_size):
+            yield from self._page_items(username, rows[start:start + page_size], fields)
+
+    def export_memories(self, username: str):
+        """
+        Yields a user's memories as import records ({"text", "meeting_id", "timestamp"}),
+        newest first, so import_memories.py or /api/memories/bulk can restore them.
+        Only the user's own partition is read.
+        """
+        for memory in self.iter_memories(username):
+            metadata = memory["metadata"]
+            yield {
+                "text": memory["text"],
+                "meeting_id": metadata.get("meeting_id"),
+                "timestamp": metadata.get("timestamp"),
+            }
+
+    def delete_user(self, username: str) -> int:
+        """
+        Removes every memory of a user and the derived caches. With per-user
+        partitioning this drops one collection; otherwise only the user's rows
+        in their own bucket are deleted. Returns the number of memories removed.
+        """
+        with self._user_lock(username):
+            removed = self.count_memories(username)
+            name = collection_name(username, self.partitioning)
+            if shares_collection(self.partitioning):
+                self._collection(username).delete(where={"username": username})
+            else:
+                self._collections.pop(name, None)
+                try:
+                    with stage("chroma.delete_collection"):
+                        self.chroma_client.delete_collection(name)
+                except Exception:
+                    # Never written to, so there is nothing to drop
+                    pass
+            self.keyword_index.drop(username)
+            self.theme_engine.drop(username)
+            self._analytics_cache.pop(username, None)
+            self._versions[username] = self._versions.get(username, 0) + 1
+            self._deletions[username] = self._deletions.get(username, 0) + 1
+            if self.summary_refresher is not None:
+                self.summary_refresher.discard(username)
+            self.summaries.drop(username)
+            return removed
+
+    def get_analytics(self, username: str, mode: str = None, name_with_llm: bool = False):
+        """
+        Returns the top 5 recurring themes and the meeting count for a user.
+        Results are cached per user; when new meetings arrive only those are sent
+        to Llama 3, together with the previous themes, instead of starting over.
+        With mode="local" the themes come from the embedding clusters instead.
+        """
+        if (mode or ANALYTICS_MODE) == "local":
+            return self.get_local_analytics(username, name_with_llm)
+
+        cached = self._analytics_cache.get(username)
+        version = self._versions.get(username, 0)
+        if (
+            cached
+            and cached["version"] == version
+            and time.monotonic() - cached["checked_at"] < ANALYTICS_REVALIDATE_SECONDS
+        ):
+            return dict(cached["result"])
+
+        with self._user_lock(username):
+            # Another request may have refreshed the entry while we waited
+            cached = self._analytics_cache.get(username)
+            version = self._versions.get(username, 0)
+            ids = self._memory_ids(username)
+            if not ids:
+                return {"themes": [], "totalMeetings": 0}
+
+            seen = cached["ids"] if cached else set()
+            new_ids = [i for i in ids if i not in seen]
+            if cached and not new_ids:
+                cached["version"] = version
+                cached["checked_at"] = time.monotonic()
+                return dict(cached["result"])
+
+            items, digests = self._analytics_items(username, self._get_by_ids(username, new_ids))
+            previous_themes = cached["result"]["themes"] if cached else None
+            try:
+                themes = self._compute_themes(items, previous_themes, len(seen), digests)
+            except LLMUnavailable as e:
+                # Rate limited: a slightly stale answer beats none; without one the caller gets a 503
+                if cached:
+                    logger.warning("Serving stale analytics", extra={"username": username, "error": str(e)})
+                    return dict(cached["result"])
+                raise
+            if themes is None:
+                # Keep serving the last good result rather than caching an error
+                if cached:
+                    return dict(cached["result"])
+                return {"themes": [{"name": "Error processing themes", "value": 0}], "totalMeetings": len(ids)}
+
+            result = {"themes": themes, "totalMeetings": len(ids)}
+            self._analytics_cache[username] = {
+                "ids": set(ids),
+                "result": result,
+                "version": version,
+                "checked_at": time.monotonic(),
+            }
+            return dict(result)
+
+    def get_local_analytics(self, username: str, name_with_llm: bool = False):
+        """
+        Clusters the user's stored embeddings into themes with real per-theme
+        counts. No LLM is involved unless name_with_llm is set, in which case a
+        single short call names the clusters from their top terms.
+        """
+        with self._user_lock(username):
+            ids = self._memory_ids(username)
+            if not ids:
+                return {"themes": [], "totalMeetings": 0}
+
+            if self.theme_engine.needs_refit(username, len(ids)):
+                self.theme_engine.fit(username, *self._get_embeddings(username, ids))
+            else:
+                known = self.theme_engine.known_ids(username)
+                new_ids = [i for i in ids if i not in known]
+                if new_ids:
+                    self.theme_engine.update(username, *self._get_embeddings(username, new_ids))
+
+            if name_with_llm and not self.theme_engine.has_names(username):
+                self._name_clusters(username)
+
+            themes = self.theme_engine.themes(username)
+            return {"themes": themes[:self.theme_engine.n_themes], "totalMeetings": len(ids)}
+
+    def _get_embeddings(self, username: str, ids):
+        """(ids, embeddings, documents) for whole memories, pulled from Chroma in bounded pages."""
+        memories = self._fetch_memories(username, ids, with_embeddings=True)
+        keys = [key for key in ids if key in memories]
+        return (
+            keys,
+            [memories[key]["embedding"] for key in keys],
+            [memories[key]["text"] for key in keys],
+        )
+
+    def _name_clusters(self, username: str):
+        """One cheap LLM call that turns each cluster's top terms into a short name."""
+        term_lists = self.theme_engine.top_terms(username, n_terms=8)
+        if not term_lists:
+            return
+        listing = "\n".join(f"{i}: {', '.join(terms)}" for i, terms in enumerate(term_lists))
         prompt = f"""
+        Each numbered line lists the most distinctive keywords of a group of meetings.
+        Give every group a concise theme name of at most 4 words.
+
+        Return ONLY a JSON object: {{"names": ["name for 0", "name for 1", ...]}}
+
+        {listing}
+        """
+        try:
+            response = gateway.chat(
+                self.client,
+                model="llama-3.1-8b-instant",
+                messages=[
+                    {"role": "system", "content": "You are a data analyst assistant. Return ONLY JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            names = json.loads(response.choices[0].message.content).get("names", [])
+            if len(names) == len(term_lists):
+                self.theme_engine.set_names(username, [str(n) for n in names])
+        except Exception as e:
+            logger.warning("Theme naming failed", extra={"username": username, "error": str(e)})
+
+    def _get_by_ids(self, username: str, ids):
+        """Fetches whole memories for the given ids, most recent first."""
+        memories = list(self._fetch_memories(username, ids).values())
+        memories.sort(key=lambda m: m["metadata"].get("timestamp", ""), reverse=True)
+        return memories
+
+    def _analytics_items(self, username: str, memories):
+        """
+        What the themes prompt is built from: each memory's stored summary where
+        there is one (raw text otherwise), plus the monthly rollups.
+        """
+        summaries = {
+            summary["metadata"].get("key"): summary
+            for summary in self.summaries.get_keys(username, "memory", [m["id"] for m in memories])
+        }
+        items = [
+            dict(memory, text=summaries[memory["id"]]["text"]) if memory["id"] in summaries else memory
+            for memory in memories
+        ]
+        return items, self.summaries.get(username, "month")
+
+    def _compute_themes(self, memories, previous_themes=None, previous_count: int = 0, digests=()):
+        """
+        Asks Llama 3 for the top themes. With previous_themes, the model merges the
+        new meetings into the earlier result. Returns None if the call fails.
+        """
+        # Newest meetings first, as many as the token budget allows
+        packed = pack(memories, ANALYTICS_CONTEXT_TOKENS, ANALYTICS_MEMORY_TOKENS)
+        if packed.truncated or packed.omitted:
+            logger.info("Themes prompt packed", extra={
+                "included": len(packed.ids), "truncated": packed.truncated,
+                "omitted": packed.omitted, "tokens": packed.tokens,
+            })
+        context = packed.text
+        if packed.omitted and digests:
+            # Older meetings that didn't fit still count, through their month's digest
+            included = set(packed.ids)
+            months = {
+                period_keys(m["metadata"]["ts"])[1]
+                for m in memories if m["id"] not in included and m["metadata"].get("ts") is not None
+            }
+            older = pack(
+                [d for d in digests if d["metadata"].get("key") in months],
+                ANALYTICS_CONTEXT_TOKENS - packed.tokens, ANALYTICS_MEMORY_TOKENS,
+            )
+            if older.text:
+                context += "\n---\n" + older.text
+
+        if previous_themes:
+            task = f"""
+        These themes were previously identified from {previous_count} earlier meetings:
+        {json.dumps(previous_themes)}
+
+        Update them with the new meeting notes below. Keep the top 5 recurring themes overall,
+        adjusting each frequency/importance score (1-10) to reflect both the earlier meetings
+        and the new ones.
+        """
+        else:
+            task = """
         Analyze the following meeting notes and identify the top 5 recurring themes.
         For each theme, provide a concise name and an estimated frequency/importance score (1-10).
-        
+        """
+
+        prompt = f"""{task}
         Return ONLY a JSON object with this exact structure:
         {{
             "themes": [
@@ -71,7 +777,8 @@ class MemoryService:
         """
 
         try:
-            response = self.client.chat.completions.create(
+            response = gateway.chat(
+                self.client,
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {"role": "system", "content": "You are a data analyst assistant. Return ONLY JSON."},
@@ -79,25 +786,134 @@ class MemoryService:
                 ],
                 response_format={"type": "json_object"}
             )
-            
-            import json
-            import re
-            
+
             content = response.choices[0].message.content
             # Cleanup common LLM markdown artifacts if any
             content = re.sub(r'```json\s*|\s*```', '', content)
-            
-            return json.loads(content)
+
+            return json.loads(content).get("themes", [])
+        except LLMUnavailable:
+            raise
         except Exception as e:
-            print(f"Analytics Error: {e}")
-            return {"themes": [{"name": "Error processing themes", "value": 0}]}
+            logger.warning("Theme analysis failed", extra={"error": str(e)})
+            return None
 
-    def get_summary(self, text: str):
-        response = self.client.chat.completions.create(
+    def get_summary(self, text: str, instruction: str = SUMMARY_INSTRUCTION, _depth: int = 0):
+        """
+        Summary of one transcript. One over SUMMARY_CONTEXT_TOKENS is summarized in
+        sentence-aligned parts and the part summaries are summarized together, so
+        no single call grows with the length of the meeting.
+        """
+        if estimate_tokens(text) > SUMMARY_CONTEXT_TOKENS:
+            if _depth >= 2:
+                # Summaries that refuse to shrink: cut rather than recurse again
+                text = truncate(text, SUMMARY_CONTEXT_TOKENS)
+            else:
+                partials = [self._summarize(part, instruction) for part in split_to_budget(text, SUMMARY_CONTEXT_TOKENS)]
+                return self.get_summary("\n\n".join(partials), instruction, _depth + 1)
+        return self._summarize(text, instruction)
+
+    def _summarize(self, text: str, instruction: str = SUMMARY_INSTRUCTION):
+        response = gateway.chat(
+            self.client,
             model="llama-3.3-70b-versatile",
             messages=[
                 {"role": "system", "content": "You are a highly efficient meeting summarizer."},
-                {"role": "user", "content": f"Summarize this meeting transcript: {text}"}
+                {"role": "user", "content": f"{instruction}: {text}"}
             ]
         )
         return response.choices[0].message.content
+
+    def _put_summary(self, username: str, generation: int, *args) -> bool:
+        """Writes one summary unless the user's memories were deleted since the refresh began."""
+        with self._user_lock(username):
+            if self._deletions.get(username, 0) != generation:
+                return False
+            self.summaries.put(username, *args)
+            return True
+
+    def _summarize_memory(self, text: str):
+        """(summary, verbatim): short memories are their own summary; the rest cost one (map-reduced) call."""
+        if estimate_tokens(text) <= SUMMARY_VERBATIM_TOKENS:
+            return text, True
+        return self.get_summary(text), False
+
+    def _rollup(self, username: str, generation: int, level: str, key: str, members, stored) -> bool:
+        """
+        Rebuilds one meeting/week/month rollup from its newest memory summaries,
+        capped at ROLLUP_CONTEXT_TOKENS, unless that selection hasn't changed.
+        Returns True if it was written.
+        """
+        packed = pack(members, ROLLUP_CONTEXT_TOKENS, ROLLUP_ITEM_TOKENS)
+        if not packed.ids:
+            return False
+        source = source_hash(packed.ids)
+        if stored is not None and stored["metadata"].get("source") == source:
+            return False
+        text = self._summarize(packed.text, DIGEST_INSTRUCTION.format(period=f"{level} {key}"))
+        return self._put_summary(username, generation, level, key, text, {
+            "source": source, "ts": max(m["metadata"]["ts"] for m in members),
+            "memory_count": len(members), "included": len(packed.ids),
+        })
+
+    def refresh_summaries(self, username: str, memory_ids=None):
+        """
+        Summarizes the given memories (None: every memory without a summary yet)
+        and rebuilds the meeting, week and month rollups they fall in. A memory
+        id is a content hash, so each memory is summarized exactly once; a
+        rollup costs one call over a capped input, however long the meeting or
+        archive has grown. Summaries are written as they are made, so an
+        interrupted refresh keeps its progress.
+        """
+        generation = self._deletions.get(username, 0)
+        rows = {key: (ts, metadata) for (ts, _), key, _, metadata in self._head_rows(username)}
+        targets = [key for key in (rows if memory_ids is None else memory_ids) if key in rows]
+        done = {summary["metadata"].get("key") for summary in self.summaries.get_keys(username, "memory", targets)}
+        pending = [key for key in targets if key not in done]
+
+        summarized = 0
+        for start in range(0, len(pending), EMBEDDING_FETCH_BATCH):
+            page = pending[start:start + EMBEDDING_FETCH_BATCH]
+            memories = self._fetch_memories(username, page)
+            for key in page:
+                if key not in memories:
+                    continue
+                ts, metadata = rows[key]
+                text, verbatim = self._summarize_memory(memories[key]["text"])
+                if not self._put_summary(username, generation, "memory", key, text, {
+                    "memory_id": key, "meeting_id": metadata.get("meeting_id", ""), "ts": ts, "verbatim": verbatim,
+                }):
+                    return {"memories": len(targets), "summarized": summarized, "rollups": 0}
+                summarized += 1
+
+        # The rollups the targets belong to
+        affected = set()
+        for key in targets:
+            ts, metadata = rows[key]
+            week, month = period_keys(ts)
+            affected.update({("meeting", metadata.get("meeting_id", "")), ("week", week), ("month", month)})
+        stored = {
+            (summary["metadata"].get("level"), summary["metadata"].get("key")): summary
+            for level in ROLLUP_LEVELS
+            for summary in self.summaries.get_keys(username, level, [key for lvl, key in affected if lvl == level])
+        }
+
+        rollups = 0
+        for level, key in sorted(affected):
+            if level == "meeting":
+                clause = {"meeting_id": key}
+            else:
+                since, until = period_range(level, key)
+                clause = {"$and": [{"ts": {"$gte": since}}, {"ts": {"$lt": until}}]}
+            members = self.summaries.get(username, "memory", clause)
+            if self._rollup(username, generation, level, key, members, stored.get((level, key))):
+                rollups += 1
+        return {"memories": len(targets), "summarized": summarized, "rollups": rollups}
+
+    def list_summaries(self, username: str, level: str = "meeting"):
+        """A user's stored summaries of one level, newest first."""
+        return self.summaries.get(username, level)
+
+    def search_summaries(self, query: str, username: str, level: str = "meeting", n_results: int = 3):
+        """Semantic search over a user's summaries of one level."""
+        return self.summaries.search(username, self._embed_query(query), level, n_results)
@@ -0,0 +1,254 @@
+"""
+In-process metrics in the Prometheus text format, plus per-request stage
+profiles.
+
+    with stage("chroma.query"):
+        collection.query(...)
+
+records the call in aether_stage_duration_seconds{stage="chroma.query"} and,
+while it runs, in aether_stage_in_flight. If the current request asked for a
+profile (see main.py), the duration is also added to that request's breakdown.
+run_in_pool copies the request context into the worker thread, so stages
+timed inside services are attributed to the request that caused them.
+"""
+import math
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Seconds; covers a microsecond cache hit up to a chunked hour-long transcription
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [per-bucket counts..., sum, count]
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Owns the metrics and the collectors that sample values at scrape time."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """collect() runs on every scrape, typically to copy cache stats into gauges."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "aether_stage_duration_seconds", "Time spent in a dependency call (Chroma, Groq, Whisper, bcrypt, DB, Calendar).", ("stage",)
+)
+STAGE_IN_FLIGHT = registry.gauge("aether_stage_in_flight", "Dependency calls currently running.", ("stage",))
+STAGE_ERRORS = registry.counter("aether_stage_errors_total", "Dependency calls that raised.", ("stage",))
+LLM_TOKENS = registry.counter("aether_llm_tokens_total", "Tokens reported by the LLM API.", ("model", "kind"))
+
+# The current request's [(stage, seconds)], or None when it didn't ask for a profile
+_profile = contextvars.ContextVar("aether_profile", default=None)
+
+
+def start_profile():
+    """Starts collecting stage timings for the current request; returns the list they go into."""
+    profile = []
+    _profile.set(profile)
+    return profile
+
+
+@contextmanager
+def stage(name: str):
+    STAGE_IN_FLIGHT.inc(stage=name)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_IN_FLIGHT.dec(stage=name)
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        profile = _profile.get()
+        if profile is not None:
+            profile.append((name, elapsed))
+
+
+def record_llm_usage(model: str, response):
+    """Counts prompt/completion tokens from a chat completion (fakes without usage are ignored)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+    LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+
+
+def server_timing(profile, total_seconds: float) -> str:
+    """Server-Timing header value: one entry per stage (summed, with call count) plus the total."""
+    totals = {}
+    for name, seconds in profile:
+        spent, calls = totals.get(name, (0.0, 0))
+        totals[name] = (spent + seconds, calls + 1)
+    entries = [
+        f'{name};dur={spent * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+        for name, (spent, calls) in sorted(totals.items(), key=lambda item: -item[1][0])
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class InstrumentedCollection:
+    """Wraps a Chroma collection so every read and write is timed as chroma.<method>."""
+
+    TIMED = ("add", "upsert", "update", "delete", "get", "query", "count", "peek")
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in self.TIMED:
+            return attribute
+
+        def timed(*args, **kwargs):
+            with stage(f"chroma.{name}"):
+                return attribute(*args, **kwargs)
+        return timed
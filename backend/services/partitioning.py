@@ -0,0 +1,42 @@
+import os
+import hashlib
+
+# "user": one collection per user (searches never touch other tenants' vectors)
+# "bucket": users hashed into PARTITION_BUCKETS collections (bounded collection count)
+# "shared": the original single collection, filtered by username
+# Unset: "user", or "shared" while the shared collection still holds rows
+# that migrate_partitions.py hasn't moved (see MemoryService)
+PARTITIONING_SETTING = os.getenv("AETHER_PARTITIONING")
+PARTITIONING = PARTITIONING_SETTING or "user"
+PARTITION_BUCKETS = int(os.getenv("AETHER_PARTITION_BUCKETS", "64"))
+LEGACY_COLLECTION = "meeting_memories"
+LEGACY_SUMMARY_COLLECTION = "meeting_summaries"
+STRATEGIES = ("user", "bucket", "shared")
+
+
+def _digest(username: str) -> str:
+    return hashlib.sha256(username.encode("utf-8")).hexdigest()
+
+
+def collection_name(username: str, strategy: str = None, buckets: int = None) -> str:
+    """
+    Chroma collection holding a user's memories. Names are derived from a hash,
+    so any username maps to a valid collection name and the name leaks nothing.
+    """
+    strategy = strategy or PARTITIONING
+    if strategy == "user":
+        return f"mem_u_{_digest(username)[:24]}"
+    if strategy == "bucket":
+        return f"mem_b_{int(_digest(username), 16) % (buckets or PARTITION_BUCKETS):04d}"
+    return LEGACY_COLLECTION
+
+
+def summary_collection_name(username: str, strategy: str = None, buckets: int = None) -> str:
+    """Collection holding the summaries of the memories in collection_name() (see services/summary_store.py)."""
+    name = collection_name(username, strategy, buckets)
+    return LEGACY_SUMMARY_COLLECTION if name == LEGACY_COLLECTION else "sum" + name[len("mem"):]
+
+
+def shares_collection(strategy: str = None) -> bool:
+    """True when a collection can hold several users, so queries must filter by username."""
+    return (strategy or PARTITIONING) != "user"
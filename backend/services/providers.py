@@ -0,0 +1,120 @@
+"""
+Lazily built, process-wide service instances.
+
+Nothing here is constructed at import time: the Chroma client, the embedding
+model and the Groq client are created on first use (or by the warm-up task
+main.py starts), so the server starts listening at once and a dependency that
+fails, such as a missing GROQ_API_KEY, only takes down the endpoints that need it.
+The service modules themselves are imported inside the factories because
+importing chromadb or googleapiclient is a large part of the startup cost.
+"""
+import os
+import time
+import threading
+
+
+class ServiceUnavailable(Exception):
+    """A service could not be built (missing key, unreadable store, ...)."""
+
+
+class Provider:
+    """Builds one instance on first get(); a failed build is retried on the next call."""
+
+    def __init__(self, name: str, factory, required: bool = True):
+        self.name = name
+        self.factory = factory
+        # Required services must be up for /readyz to report ready
+        self.required = required
+        self.error = None
+        self.build_ms = None
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                try:
+                    self._instance = self.factory()
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    raise ServiceUnavailable(f"{self.name} is unavailable ({self.error})") from e
+                self.error = None
+                self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+            return self._instance
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def override(self, instance):
+        """Swaps in another instance (tests, benchmarks); None goes back to lazy building. Returns the old one."""
+        with self._lock:
+            previous, self._instance = self._instance, instance
+            self.error = None
+        return previous
+
+    def status(self) -> dict:
+        return {"ready": self.ready, "required": self.required, "build_ms": self.build_ms, "error": self.error}
+
+
+def _groq_client():
+    from groq import Groq
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY missing. Check your .env file.")
+    # Retries (with backoff that respects retry-after) are done by services/llm_gateway.py
+    return Groq(api_key=api_key, max_retries=0)
+
+
+def _memory_service():
+    from services.memory_service import MemoryService
+    return MemoryService(client=groq_client.get())
+
+
+def _calendar_service():
+    from services.calendar_service import CalendarService
+    return CalendarService(client=groq_client.get())
+
+
+def _audio_service():
+    from services.audio_service import AudioService
+    return AudioService(client=groq_client.get())
+
+
+def _google_calendar_service():
+    from services.google_calendar_service import GoogleCalendarService
+    return GoogleCalendarService()
+
+
+# One Groq client (one HTTP connection pool) shared by every service
+groq_client = Provider("groq", _groq_client)
+memory = Provider("memory", _memory_service)
+calendar = Provider("calendar", _calendar_service)
+audio = Provider("audio", _audio_service)
+# Optional: without token.json the app works, only calendar sync is refused
+google_calendar = Provider("google_calendar", _google_calendar_service, required=False)
+
+ALL = (groq_client, memory, calendar, audio, google_calendar)
+
+
+def warm_up():
+    """
+    Builds every service and loads the embedding model, so the first real
+    request doesn't pay for it. Returns {name: error} for whatever failed.
+    """
+    errors = {}
+    for provider in ALL:
+        try:
+            provider.get()
+        except ServiceUnavailable as e:
+            errors[provider.name] = str(e)
+    if memory.ready:
+        try:
+            memory.get().warm_up()
+        except Exception as e:
+            errors["embeddings"] = f"{type(e).__name__}: {e}"
+    return errors
@@ -0,0 +1,236 @@
+"""
+Summaries derived from a user's memories, kept in Chroma next to them.
+
+Four levels, each one Chroma document with {"level", "key", "ts", ...} metadata:
+
+    memory   key = memory_id    one stored transcript, summarized once
+    meeting  key = meeting_id   rollup of the meeting's memory summaries
+    week     key = "2026-W09"   rollup of the memory summaries of one ISO week
+    month    key = "2026-02"    rollup of the memory summaries of one month
+
+Memory ids are content hashes, so a memory's summary never goes stale and is
+made exactly once. Rollups read at most a token budget of the newest memory
+summaries below them; their "source" metadata hashes which ones, so a rollup
+is only rebuilt when that selection changes.
+"""
+import os
+import time
+import hashlib
+import logging
+import datetime
+import threading
+
+from services.partitioning import summary_collection_name, shares_collection
+from services.metrics import registry, stage, InstrumentedCollection
+
+logger = logging.getLogger("aether.summaries")
+
+LEVELS = ("memory", "meeting", "week", "month")
+ROLLUP_LEVELS = ("meeting", "week", "month")
+# Set to 0 to stop summarizing in the background (summaries are then never refreshed)
+SUMMARIES_ENABLED = os.getenv("AETHER_SUMMARIES", "1") != "0"
+# A refresh starts this long after a user's last write, so a live session is
+# summarized once at the end rather than after every segment
+SUMMARY_DELAY_SECONDS = float(os.getenv("AETHER_SUMMARY_DELAY_SECONDS", "30"))
+# A failed refresh is retried (after another delay) this many times before its memories are dropped
+SUMMARY_ATTEMPTS = 3
+
+REFRESHES = registry.counter("aether_summary_refreshes_total", "Background summary refreshes, by outcome.", ("outcome",))
+WRITTEN = registry.counter("aether_summaries_written_total", "Summaries (re)computed, by level.", ("level",))
+
+
+def period_keys(ts: float):
+    """(week, month) keys of the period an epoch timestamp falls in, in local time."""
+    moment = datetime.datetime.fromtimestamp(ts)
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}", f"{moment.year}-{moment.month:02d}"
+
+
+def period_range(level: str, key: str):
+    """(start, end) epoch seconds of a week or month key, in local time."""
+    if level == "week":
+        year, week = key.split("-W")
+        start = datetime.datetime.combine(datetime.date.fromisocalendar(int(year), int(week), 1), datetime.time())
+        end = start + datetime.timedelta(days=7)
+    else:
+        year, month = (int(part) for part in key.split("-"))
+        start = datetime.datetime(year, month, 1)
+        end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+    return start.timestamp(), end.timestamp()
+
+
+def source_hash(parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+def summary_id(username: str, level: str, key: str) -> str:
+    return f"sum_{level}_{source_hash((username, level, key))[:24]}"
+
+
+class SummaryStore:
+    """Reads and writes summary documents; one collection per memory collection."""
+
+    def __init__(self, chroma_client, embedding_function, partitioning: str):
+        self.chroma_client = chroma_client
+        self.embedding_function = embedding_function
+        self.partitioning = partitioning
+        self._collections = {}
+
+    def _collection(self, username: str):
+        name = summary_collection_name(username, self.partitioning)
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = InstrumentedCollection(self.chroma_client.get_or_create_collection(
+                name=name, embedding_function=self.embedding_function
+            ))
+            self._collections[name] = collection
+        return collection
+
+    def _where(self, username: str, level: str = None, *clauses):
+        clauses = list(clauses)
+        if level is not None:
+            clauses.insert(0, {"level": level})
+        if shares_collection(self.partitioning):
+            clauses.insert(0, {"username": username})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    @staticmethod
+    def _rows(results):
+        summaries = [
+            {"id": row_id, "text": document or "", "metadata": metadata or {}}
+            for row_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        ]
+        summaries.sort(key=lambda s: (s["metadata"].get("ts", 0), s["id"]), reverse=True)
+        return summaries
+
+    def get(self, username: str, level: str = None, *clauses):
+        """
+        A user's summaries ({"id", "text", "metadata"}), newest first; all levels
+        unless one is given, narrowed by any extra Chroma where clauses.
+        """
+        return self._rows(self._collection(username).get(
+            where=self._where(username, level, *clauses), include=["documents", "metadatas"]
+        ))
+
+    def get_keys(self, username: str, level: str, keys):
+        """The stored summaries of one level for the given keys (missing ones are left out), newest first."""
+        ids = [summary_id(username, level, key) for key in keys]
+        if not ids:
+            return []
+        return self._rows(self._collection(username).get(ids=ids, include=["documents", "metadatas"]))
+
+    def put(self, username: str, level: str, key: str, text: str, metadata: dict):
+        """Writes (or replaces) the summary of one memory, meeting or period."""
+        metadata = dict(metadata, level=level, key=key, username=username)
+        metadata["timestamp"] = datetime.datetime.fromtimestamp(metadata["ts"]).isoformat()
+        self._collection(username).upsert(
+            ids=[summary_id(username, level, key)], documents=[text], metadatas=[metadata]
+        )
+        WRITTEN.inc(level=level)
+
+    def delete(self, username: str, ids):
+        if ids:
+            self._collection(username).delete(ids=list(ids))
+
+    def search(self, username: str, query_embedding, level: str = None, n_results: int = 3):
+        """Summaries closest to the query embedding, best first."""
+        results = self._collection(username).query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            where=self._where(username, level),
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            {"id": row_id, "text": document or "", "metadata": metadata or {}, "distance": distance}
+            for row_id, document, metadata, distance in zip(
+                results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+            )
+        ]
+
+    def drop(self, username: str):
+        """Removes every summary of a user."""
+        name = summary_collection_name(username, self.partitioning)
+        if shares_collection(self.partitioning):
+            self._collection(username).delete(where={"username": username})
+            return
+        self._collections.pop(name, None)
+        try:
+            with stage("chroma.delete_collection"):
+                self.chroma_client.delete_collection(name)
+        except Exception:
+            # Never written to, so there is nothing to drop
+            pass
+
+
+class SummaryRefresher:
+    """
+    Runs refresh(username, memory_ids) on one background thread, at most once
+    per user per burst of writes: request() collects the new memory ids and
+    (re)arms a per-user timer of delay seconds; the refresh runs when it
+    expires. One refresh at a time, so summarizing never takes more than a
+    single slot from interactive LLM traffic.
+    """
+
+    def __init__(self, refresh, delay: float = SUMMARY_DELAY_SECONDS):
+        self.refresh = refresh
+        self.delay = delay
+        self._due = {}
+        self._ids = {}
+        self._failures = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def request(self, username: str, memory_ids=()):
+        with self._condition:
+            self._due[username] = time.monotonic() + self.delay
+            self._ids.setdefault(username, set()).update(memory_ids)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="aether-summaries", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def discard(self, username: str):
+        with self._condition:
+            self._due.pop(username, None)
+            self._ids.pop(username, None)
+            self._failures.pop(username, None)
+
+    @property
+    def pending(self) -> int:
+        return len(self._due)
+
+    def _next(self):
+        """Blocks until some user's refresh is due and returns (user, memory ids)."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                due = min(self._due.items(), key=lambda item: item[1], default=None)
+                if due is not None and due[1] <= now:
+                    del self._due[due[0]]
+                    return due[0], sorted(self._ids.pop(due[0], ()))
+                self._condition.wait(None if due is None else due[1] - now)
+
+    def _run(self):
+        while True:
+            username, memory_ids = self._next()
+            try:
+                result = self.refresh(username, memory_ids)
+                self._failures.pop(username, None)
+                REFRESHES.inc(outcome="done")
+                logger.info("Summaries refreshed", extra={"username": username, **result})
+            except Exception as e:
+                # Whatever was written stays; memory summaries already made are skipped next time
+                REFRESHES.inc(outcome="failed")
+                logger.warning("Summary refresh failed", extra={"username": username, "error": str(e)})
+                failures = self._failures.get(username, 0) + 1
+                if failures < SUMMARY_ATTEMPTS:
+                    self._failures[username] = failures
+                    self.request(username, memory_ids)
+                else:
+                    self._failures.pop(username, None)
@@ -0,0 +1,196 @@
+import re
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9'\-]{2,}")
+
+STOPWORDS = frozenset("""
+about above after again against all also and any are because been before being below between both
+but can cannot could did does doing down during each few for from further had has have having her
+here hers herself him himself his how into its itself just let lets like more most must myself nor
+not now off once only other our ours ourselves out over own really same she should some such than
+that the their theirs them themselves then there these they this those through too under until very
+was way we'll were what when where which while who whom why will with would yeah yes you your yours
+yourself yourselves okay going gonna get got think know want need one two right well thing things
+meeting today tomorrow said say team guys everyone
+""".split())
+
+
+def tokenize(text: str):
+    """Lowercased content words used for TF-IDF labels."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def kmeans(vectors: np.ndarray, k: int, max_iter: int = 25, seed: int = 0):
+    """
+    Spherical k-means with k-means++ seeding, fully vectorized in NumPy.
+    Returns (centroids, labels).
+    """
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    k = min(k, n)
+
+    # k-means++ seeding on cosine distance
+    centroids = np.empty((k, vectors.shape[1]), dtype=vectors.dtype)
+    centroids[0] = vectors[rng.integers(n)]
+    closest = 1.0 - vectors @ centroids[0]
+    for i in range(1, k):
+        weights = np.clip(closest, 0, None) ** 2
+        total = weights.sum()
+        index = rng.choice(n, p=weights / total) if total > 0 else rng.integers(n)
+        centroids[i] = vectors[index]
+        closest = np.minimum(closest, 1.0 - vectors @ centroids[i])
+
+    labels = np.full(n, -1)
+    for _ in range(max_iter):
+        new_labels = np.argmax(vectors @ centroids.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=k)
+        empty = counts == 0
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return centroids, labels
+
+
+class _UserThemes:
+    """Clustering state for one user."""
+
+    def __init__(self):
+        self.ids = set()
+        self.centroids = None
+        self.counts = None
+        self.term_counts = []       # per-cluster Counter of terms
+        self.doc_freq = Counter()   # number of memories containing each term
+        self.fitted_size = 0
+        self.names = {}
+
+
+class ThemeEngine:
+    """
+    LLM-free theme analytics over the embeddings Chroma already stores.
+    Memories are grouped with k-means, each group is labelled by its top TF-IDF
+    terms and its value is the real number of memories in it. New memories are
+    folded in incrementally; a full refit happens when a user's history has
+    doubled since the last one.
+    """
+
+    def __init__(self, n_themes: int = 5, refit_growth: float = 2.0, seed: int = 0):
+        self.n_themes = n_themes
+        self.refit_growth = refit_growth
+        self.seed = seed
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def known_ids(self, username: str):
+        state = self._users.get(username)
+        return state.ids if state else set()
+
+    def needs_refit(self, username: str, total: int) -> bool:
+        state = self._users.get(username)
+        if state is None or state.centroids is None:
+            return True
+        # Few points: cheap to refit and the clusters are still forming
+        if state.fitted_size < self.n_themes * 4:
+            return total != state.fitted_size
+        return total >= state.fitted_size * self.refit_growth
+
+    def fit(self, username: str, ids, embeddings, documents):
+        """Clusters a user's full history from scratch."""
+        state = _UserThemes()
+        if len(ids):
+            vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+            centroids, labels = kmeans(vectors, self.n_themes, seed=self.seed)
+            state.centroids = centroids
+            state.counts = np.bincount(labels, minlength=len(centroids)).astype(np.float64)
+            state.term_counts = [Counter() for _ in range(len(centroids))]
+            for label, text in zip(labels, documents):
+                terms = tokenize(text or "")
+                state.term_counts[label].update(terms)
+                state.doc_freq.update(set(terms))
+            state.ids = set(ids)
+            state.fitted_size = len(ids)
+        with self._lock:
+            self._users[username] = state
+
+    def drop(self, username: str):
+        with self._lock:
+            self._users.pop(username, None)
+
+    def update(self, username: str, ids, embeddings, documents):
+        """Folds new memories into the existing clusters (online k-means step)."""
+        state = self._users.get(username)
+        if state is None or state.centroids is None:
+            return self.fit(username, ids, embeddings, documents)
+        fresh = [i for i, memory_id in enumerate(ids) if memory_id not in state.ids]
+        if not fresh:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32)[fresh])
+        labels = np.argmax(vectors @ state.centroids.T, axis=1)
+
+        # Running-mean update of the centroids the new points landed in
+        sums = np.zeros_like(state.centroids)
+        np.add.at(sums, labels, vectors)
+        added = np.bincount(labels, minlength=len(state.centroids)).astype(np.float64)
+        touched = added > 0
+        weighted = state.centroids[touched] * state.counts[touched, None] + sums[touched]
+        state.centroids[touched] = _normalize(weighted)
+        state.counts += added
+
+        for label, index in zip(labels, fresh):
+            terms = tokenize(documents[index] or "")
+            state.term_counts[label].update(terms)
+            state.doc_freq.update(set(terms))
+            state.ids.add(ids[index])
+
+    def top_terms(self, username: str, n_terms: int = 3):
+        """Top TF-IDF terms for each cluster, ordered as the clusters are."""
+        state = self._users.get(username)
+        if state is None or state.centroids is None:
+            return []
+        total_docs = max(len(state.ids), 1)
+        labels = []
+        for counts in state.term_counts:
+            scored = sorted(
+                counts.items(),
+                key=lambda item: item[1] * math.log(1 + total_docs / state.doc_freq[item[0]]),
+                reverse=True,
+            )
+            labels.append([term for term, _ in scored[:n_terms]])
+        return labels
+
+    def has_names(self, username: str) -> bool:
+        state = self._users.get(username)
+        return bool(state and state.names)
+
+    def set_names(self, username: str, names):
+        state = self._users.get(username)
+        if state is not None:
+            state.names = dict(enumerate(names))
+
+    def themes(self, username: str):
+        """Returns [{"name", "value", "terms"}] sorted by cluster size."""
+        state = self._users.get(username)
+        if state is None or state.centroids is None:
+            return []
+        result = []
+        for index, terms in enumerate(self.top_terms(username)):
+            count = int(state.counts[index])
+            if count == 0:
+                continue
+            name = state.names.get(index) or (" / ".join(t.title() for t in terms) if terms else f"Theme {index + 1}")
+            result.append({"name": name, "value": count, "terms": terms})
+        result.sort(key=lambda theme: theme["value"], reverse=True)
+        return result
@@ -0,0 +1,154 @@
+"""
+In-process benchmark for the auth path: login throughput under a login storm
+and the per-request cost of resolving a bearer token.
+
+    python benchmarks/auth_bench.py                     # before vs after, production bcrypt cost
+    python benchmarks/auth_bench.py --rounds 10 --logins 64 --concurrency 32
+
+"before" replays the old behaviour: bcrypt runs inline on the event loop and
+every authenticated request decodes the JWT and queries the users table.
+"after" is the current code: bcrypt on its capped pool and the token cache in
+front of the lookup. While the logins run, a timer measures how late the
+event loop wakes up, i.e. how long every other request would stall. Login
+throughput only improves with more than one core (up to AETHER_BCRYPT_WORKERS).
+Runs against a throwaway SQLite/Chroma directory and prints the report as JSON.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(HERE, "..", "backend")
+PASSWORD = "correct horse battery staple"
+
+
+def load_main(rounds):
+    os.environ["AETHER_BCRYPT_ROUNDS"] = str(rounds)
+    os.environ.setdefault("GROQ_API_KEY", "bench-key")
+    sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+    os.chdir(tempfile.mkdtemp(prefix="aether_auth_bench_"))
+    import main
+    return main
+
+
+def latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def use_mode(main, mode, original_run_in_pool):
+    """Switches the app between the old and the current auth path."""
+    if mode == "before":
+        async def inline_bcrypt(name, func, *args, **kwargs):
+            if name == "bcrypt":
+                return func(*args, **kwargs)
+            return await original_run_in_pool(name, func, *args, **kwargs)
+        main.run_in_pool = inline_bcrypt
+        main.auth_service.token_cache.ttl_seconds = 0
+    else:
+        main.run_in_pool = original_run_in_pool
+        from services.auth_service import TOKEN_CACHE_TTL
+        main.auth_service.token_cache.ttl_seconds = TOKEN_CACHE_TTL
+    main.auth_service.token_cache.entries.clear()
+
+
+async def login_storm(client, users, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    probes = []
+    done = asyncio.Event()
+
+    async def login(username):
+        async with semaphore:
+            response = await client.post("/api/login", data={"username": username, "password": PASSWORD})
+            assert response.status_code == 200, response.text
+
+    async def probe():
+        # Wakes every 10 ms; how late each wake-up is shows how long the loop was held
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            probes.append(max(0.0, (time.perf_counter() - started) * 1000 - 10))
+
+    prober = asyncio.ensure_future(probe())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(login(u) for u in users))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return {
+        "logins": len(users),
+        "seconds": round(elapsed, 3),
+        "logins_per_second": round(len(users) / elapsed, 2),
+        "event_loop_lag": latency_summary(probes or [0.0]),
+    }
+
+
+async def authenticated_requests(client, token, requests):
+    headers = {"Authorization": f"Bearer {token}"}
+    me, root = [], []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get("/api/me", headers=headers)
+        me.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+        started = time.perf_counter()
+        await client.get("/")
+        root.append((time.perf_counter() - started) * 1000)
+    me_summary, root_summary = latency_summary(me), latency_summary(root)
+    return {
+        "requests": requests,
+        "api_me": me_summary,
+        "unauthenticated_root": root_summary,
+        # What token verification adds on top of an otherwise identical request
+        "auth_overhead_ms": round(me_summary["p50_ms"] - root_summary["p50_ms"], 3),
+    }
+
+
+async def run(main, args):
+    import httpx
+    original_run_in_pool = main.run_in_pool
+    users = [f"bench-user-{i}" for i in range(args.logins)]
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for username in users:
+            response = await client.post("/api/signup", json={"username": username, "password": PASSWORD})
+            assert response.status_code == 200, response.text
+        token = main.auth_service.create_access_token(data={"sub": users[0]})
+
+        report = {"bcrypt_rounds": args.rounds, "concurrency": args.concurrency}
+        for mode in ("before", "after"):
+            use_mode(main, mode, original_run_in_pool)
+            report[mode] = {
+                "login_storm": await login_storm(client, users, args.concurrency),
+                "authenticated": await authenticated_requests(client, token, args.requests),
+            }
+        use_mode(main, "after", original_run_in_pool)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor (12 is what production uses)")
+    parser.add_argument("--logins", type=int, default=32, help="users logging in during the storm")
+    parser.add_argument("--concurrency", type=int, default=16, help="logins in flight at once")
+    parser.add_argument("--requests", type=int, default=500, help="sequential authenticated requests to time")
+    args = parser.parse_args()
+
+    app_module = load_main(args.rounds)
+    report = asyncio.run(run(app_module, args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares two load_test.py reports and flags performance regressions.
+
+    python benchmarks/compare.py runs/before.json runs/after.json
+    python benchmarks/compare.py runs/before.json runs/after.json --threshold 0.2 --json
+
+A level regresses when, against the baseline, p50/p95/p99 latency or peak RSS
+grew by more than --threshold (relative) and by more than the absolute floor
+(--min-ms, --min-rss-mb, so sub-millisecond jitter on fast routes isn't
+reported), throughput fell by more than --threshold, or the error rate rose
+by more than --max-error-increase. Exits with status 1 if anything regressed,
+so it can gate CI.
+"""
+import sys
+import json
+import argparse
+
+LATENCY_FIELDS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.10, min_ms: float = 2.0,
+            min_rss_mb: float = 10.0, max_error_increase: float = 0.01) -> dict:
+    """Returns {"rows": [...], "regressions": [...], "missing": [...]}; rows cover every shared level."""
+    rows, regressions, missing = [], [], []
+    for scenario, levels in baseline.get("results", {}).items():
+        for level, before in levels.items():
+            after = candidate.get("results", {}).get(scenario, {}).get(level)
+            if after is None:
+                missing.append(f"{scenario}/{level}")
+                continue
+            problems = []
+            for field in LATENCY_FIELDS:
+                change = _change(before[field], after[field])
+                if change is not None and change > threshold and after[field] - before[field] > min_ms:
+                    problems.append(f"{field} +{change:.0%}")
+            change = _change(before["throughput_rps"], after["throughput_rps"])
+            if change is not None and change < -threshold:
+                problems.append(f"throughput {change:.0%}")
+            if after["error_rate"] - before["error_rate"] > max_error_increase:
+                problems.append(f"errors {before['error_rate']:.1%} -> {after['error_rate']:.1%}")
+            rss_before, rss_after = before.get("peak_rss_mb"), after.get("peak_rss_mb")
+            change = _change(rss_before, rss_after)
+            if change is not None and change > threshold and rss_after - rss_before > min_rss_mb:
+                problems.append(f"peak RSS +{change:.0%}")
+
+            row = {
+                "scenario": scenario,
+                "level": level,
+                "p95_ms": (before["p95_ms"], after["p95_ms"]),
+                "p99_ms": (before["p99_ms"], after["p99_ms"]),
+                "throughput_rps": (before["throughput_rps"], after["throughput_rps"]),
+                "peak_rss_mb": (rss_before, rss_after),
+                "problems": problems,
+            }
+            rows.append(row)
+            if problems:
+                regressions.append(row)
+    return {"rows": rows, "regressions": regressions, "missing": missing}
+
+
+def _pair(values, unit=""):
+    before, after = values
+    if before is None or after is None:
+        return "-"
+    change = _change(before, after)
+    suffix = f" ({change:+.0%})" if change is not None else ""
+    return f"{before:g}{unit} -> {after:g}{unit}{suffix}"
+
+
+def render(result: dict) -> str:
+    lines = [f"{'scenario':<20} {'level':<6} {'p95':<28} {'p99':<28} {'req/s':<26} {'peak RSS MB':<24} status"]
+    for row in result["rows"]:
+        lines.append(
+            f"{row['scenario']:<20} {row['level']:<6} {_pair(row['p95_ms'], 'ms'):<28} {_pair(row['p99_ms'], 'ms'):<28} "
+            f"{_pair(row['throughput_rps']):<26} {_pair(row['peak_rss_mb']):<24} "
+            f"{'REGRESSED: ' + ', '.join(row['problems']) if row['problems'] else 'ok'}"
+        )
+    for name in result["missing"]:
+        lines.append(f"{name}: not in the candidate run")
+    lines.append(f"{len(result['regressions'])} regression(s) in {len(result['rows'])} level(s)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="ignore latency changes smaller than this")
+    parser.add_argument("--min-rss-mb", type=float, default=10.0, help="ignore RSS changes smaller than this")
+    parser.add_argument("--max-error-increase", type=float, default=0.01, help="allowed rise in error rate")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get("config") != candidate.get("config"):
+        print("warning: the runs used different settings; see the \"config\" sections", file=sys.stderr)
+    result = compare(baseline, candidate, args.threshold, args.min_ms, args.min_rss_mb, args.max_error_increase)
+    print(json.dumps(result, indent=2) if args.json else render(result))
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
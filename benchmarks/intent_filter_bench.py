@@ -0,0 +1,111 @@
+"""
+Offline benchmark for the scheduling-intent pre-filter in CalendarService.
+
+    python benchmarks/intent_filter_bench.py            # filter only, no network
+    python benchmarks/intent_filter_bench.py --llm      # also time the LLM-only path (needs GROQ_API_KEY)
+
+Every line of intent_corpus.jsonl is {"text", "has_event"}. The report compares
+the filter's decisions (and optionally the LLM's) with those labels and prints
+precision, recall and per-call latency as JSON.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "backend"))
+
+from services.intent_filter import has_scheduling_intent  # noqa: E402
+
+CURRENT_DATE = "Friday, February 27, 2026"
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score(labels, predictions):
+    tp = sum(1 for y, p in zip(labels, predictions) if y and p)
+    fp = sum(1 for y, p in zip(labels, predictions) if not y and p)
+    fn = sum(1 for y, p in zip(labels, predictions) if y and not p)
+    return {
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 1.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 1.0,
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+    }
+
+
+def latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+    }
+
+
+def bench_filter(corpus, repeat):
+    predictions, samples = [], []
+    for record in corpus:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            decision = has_scheduling_intent(record["text"])
+        samples.append((time.perf_counter() - started) * 1000 / repeat)
+        predictions.append(decision)
+    return predictions, samples
+
+
+def bench_llm(corpus):
+    # The LLM-only path: no pre-filter and no cache, exactly one call per transcript
+    import services.calendar_service as calendar_module
+    calendar_module.PREFILTER_ENABLED = False
+    service = calendar_module.CalendarService()
+    service.cache.get = lambda key: calendar_module.MISSING
+    service.cache.set = lambda key, value: None
+
+    predictions, samples = [], []
+    for record in corpus:
+        started = time.perf_counter()
+        events = service.extract_calendar_intent(record["text"], CURRENT_DATE)
+        samples.append((time.perf_counter() - started) * 1000)
+        predictions.append(bool(events))
+    return predictions, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(HERE, "intent_corpus.jsonl"))
+    parser.add_argument("--repeat", type=int, default=200, help="filter calls per transcript when timing")
+    parser.add_argument("--llm", action="store_true", help="also run the LLM-only path for comparison")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    labels = [bool(record["has_event"]) for record in corpus]
+
+    predictions, samples = bench_filter(corpus, args.repeat)
+    report = {
+        "corpus_size": len(corpus),
+        "filter": {**score(labels, predictions), **latency_summary(samples)},
+        # Share of traffic that would never reach the LLM
+        "skipped_fraction": round(predictions.count(False) / len(predictions), 4),
+    }
+
+    if args.llm:
+        llm_predictions, llm_samples = bench_llm(corpus)
+        report["llm_only"] = {**score(labels, llm_predictions), **latency_summary(llm_samples)}
+        # Transcripts the LLM found events in but the filter would have dropped
+        report["filter_misses_vs_llm"] = sum(
+            1 for p, q in zip(predictions, llm_predictions) if q and not p
+        )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Offline load test for the API. Boots the real app under uvicorn against local
+stand-ins for Groq (chat + Whisper) and Google Calendar, with a throwaway
+SQLite database and Chroma directory, then drives each scenario at every
+concurrency level and prints a JSON report.
+
+    python benchmarks/load_test.py --output runs/before.json
+    python benchmarks/load_test.py --scenarios flashbacks,analytics --concurrency 1,16 --requests 300
+    python benchmarks/load_test.py --groq-latency 0.4 --groq-error-rate 0.05 --calendar-latency 0.1
+    python benchmarks/load_test.py --groq-max-in-flight 8      # provider rate limit: 429s with retry-after
+    python benchmarks/compare.py runs/before.json runs/after.json
+
+For every scenario and concurrency level the report has p50/p95/p99/mean/max
+latency, throughput, the error rate and the server's peak RSS while that level
+ran (Linux only; elsewhere only the peak over the whole run is reported). The
+stage breakdown from /metrics (Groq, Chroma, bcrypt, ...) and the LLM
+gateway's per-model limits and queue wait are included at the end. Embeddings use AETHER_EMBEDDINGS=hashing, so nothing is downloaded and
+numbers don't depend on the network; they do depend on the machine, so only
+compare runs taken on the same one.
+"""
+import os
+import io
+import re
+import sys
+import json
+import math
+import time
+import wave
+import socket
+import random
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, ".."))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+sys.path.insert(0, ROOT)
+
+from fake_servers import FakeGroqServer, FakeCalendarServer  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+# Seeded memories are owned by READER; /process-transcript writes go to WRITER
+# so they don't invalidate the reader's search and analytics caches mid-run
+READER = "bench-reader"
+WRITER = "bench-writer"
+
+TOPICS = [
+    "quarterly budget", "NumPy migration", "hiring plan", "launch checklist", "customer churn",
+    "API latency", "design review", "onboarding flow", "security audit", "data retention",
+    "mobile release", "pricing experiment", "incident postmortem", "roadmap planning", "vendor contract",
+]
+PEOPLE = ["Priya", "Marco", "Aiko", "Dmitri", "Fatima", "Lucas", "Grace", "Omar"]
+WHEN = ["tomorrow at 10", "next Tuesday at 2 PM", "on Friday at 4", "Monday morning at 9"]
+
+
+def transcript(rng: random.Random, schedule: bool) -> str:
+    """A few sentences of meeting talk; schedule=True adds a follow-up the extractor should find."""
+    topic, other = rng.sample(TOPICS, 2)
+    person = rng.choice(PEOPLE)
+    sentences = [
+        f"{person} walked us through the {topic} and where it stands.",
+        f"We agreed the {topic} depends on the {other}, so both need an owner.",
+        f"{rng.choice(PEOPLE)} raised concerns about timelines and asked for numbers by end of week.",
+        f"Nobody objected to parking the {other} until the {topic} is settled.",
+    ]
+    rng.shuffle(sentences)
+    if schedule:
+        sentences.append(f"Let's meet with {person} {rng.choice(WHEN)} to finalize the {topic}.")
+    return " ".join(sentences)
+
+
+def fake_chat(request: dict) -> str:
+    """Plausible replies for every prompt the backend sends, so each code path parses real output."""
+    prompt = " ".join(m.get("content") or "" for m in request.get("messages", []))
+    if '"themes"' in prompt:
+        return json.dumps({"themes": [{"name": topic.title(), "value": 9 - i} for i, topic in enumerate(TOPICS[:5])]})
+    if '"names"' in prompt:
+        return json.dumps({"names": [topic.title() for topic in TOPICS[:5]]})
+    if "Summarize" in prompt:
+        return "The team reviewed open items and agreed on owners and next steps."
+    match = re.search(r"Let's meet with (\w+) ([^.]+?) to finalize the ([^.]+)\.", prompt)
+    if not match:
+        return json.dumps({"events": []})
+    person, _, topic = match.groups()
+    event = {"title": f"{topic.title()} with {person}", "date": "2026-03-03", "time": "10:00", "description": topic}
+    return json.dumps({"events": [event]})
+
+
+def speech_like_wav(seconds: float, rate: int = 16000) -> bytes:
+    """Tone bursts separated by pauses, so silence trimming and chunking have something to do."""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > -0.3)
+    samples = (signal * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def percentile(ordered, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def latency_summary(samples_ms) -> dict:
+    ordered = sorted(samples_ms)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+# --- server process -----------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_env(args, workdir: str, groq: FakeGroqServer, calendar: FakeCalendarServer) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "GROQ_API_KEY": "bench-key",
+        "GROQ_BASE_URL": groq.url,
+        "GOOGLE_CALENDAR_API_ENDPOINT": calendar.url,
+        "AETHER_CHROMA_PATH": os.path.join(workdir, "chroma"),
+        "AETHER_EMBEDDINGS": "hashing",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'aether.db')}",
+        "AETHER_LOG_LEVEL": "ERROR",
+        "AETHER_WARMUP": "1",
+        "ANONYMIZED_TELEMETRY": "False",
+    })
+    if args.bcrypt_rounds:
+        env["AETHER_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    return env
+
+
+def start_server(args, workdir: str, env: dict, port: int) -> subprocess.Popen:
+    # GoogleCalendarService reads token.json from the working directory
+    with open(os.path.join(workdir, "token.json"), "w") as f:
+        json.dump({
+            "token": "bench", "refresh_token": "bench", "client_id": "bench", "client_secret": "bench",
+            "expiry": "2999-01-01T00:00:00Z",
+        }, f)
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log",
+    ]
+    with open(os.path.join(workdir, "server.log"), "wb") as log:
+        return subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=log)
+
+
+async def wait_until_ready(client, server: subprocess.Popen, workdir: str, timeout: float = 120.0) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}; see {workdir}/server.log")
+        try:
+            if (await client.get("/readyz")).status_code == 200:
+                return time.perf_counter() - started
+        except Exception:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become ready")
+
+
+def reset_peak_rss(pid: int):
+    """Restarts the kernel's high-water mark so the next reading covers one level only (Linux)."""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def parse_stage_metrics(text: str) -> dict:
+    """{stage: {"calls", "mean_ms"}} from the aether_stage_duration_seconds histogram."""
+    totals = {}
+    for kind, stage_name, value in re.findall(
+        r'^aether_stage_duration_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$', text, re.MULTILINE
+    ):
+        totals.setdefault(stage_name, {})[kind] = float(value)
+    return {
+        name: {"calls": int(t.get("count", 0)), "mean_ms": round(1000 * t.get("sum", 0) / t["count"], 3) if t.get("count") else None}
+        for name, t in sorted(totals.items())
+    }
+
+
+# --- scenarios ------------------------------------------------------------------
+
+class Context:
+    """What the scenarios share: seeded users, a token, the audio blob and a seeded RNG."""
+
+    def __init__(self, seed: int, audio_seconds: float):
+        self.rng = random.Random(seed)
+        self.users = []
+        self.token = None
+        self.audio = speech_like_wav(audio_seconds)
+        self.counter = 0
+
+    def next_id(self) -> int:
+        self.counter += 1
+        return self.counter
+
+
+async def process_transcript(client, ctx):
+    # Unique text per request: the extraction cache must not turn this into a cache benchmark
+    text = transcript(ctx.rng, schedule=ctx.rng.random() < 0.5) + f" Ref {ctx.next_id()}."
+    payload = {"text": text, "meeting_id": f"bench-{ctx.counter}", "ghost_mode": False}
+    return await client.post("/process-transcript", params={"user_id": WRITER}, json=payload)
+
+
+async def transcribe(client, ctx):
+    files = {"file": ("clip.wav", ctx.audio, "audio/wav")}
+    return await client.post("/api/transcribe", params={"user_id": READER}, files=files)
+
+
+async def flashbacks(client, ctx):
+    query = f"{ctx.rng.choice(TOPICS)} {ctx.rng.choice(PEOPLE)}"
+    return await client.get("/flashbacks", params={"query": query, "user_id": READER})
+
+
+async def analytics(client, ctx):
+    return await client.get("/api/analytics", params={"user_id": READER})
+
+
+async def sync_calendar(client, ctx):
+    event = {"title": f"Follow-up {ctx.next_id()}", "date": "2026-03-03", "time": "10:00", "description": "bench"}
+    return await client.post("/api/sync-calendar", json=event)
+
+
+async def auth_login(client, ctx):
+    username = ctx.users[ctx.next_id() % len(ctx.users)]
+    return await client.post("/api/login", data={"username": username, "password": PASSWORD})
+
+
+async def auth_signup(client, ctx):
+    return await client.post("/api/signup", json={"username": f"signup-{ctx.next_id()}-{os.getpid()}", "password": PASSWORD})
+
+
+async def auth_me(client, ctx):
+    return await client.get("/api/me", headers={"Authorization": f"Bearer {ctx.token}"})
+
+
+SCENARIOS = {
+    "process_transcript": process_transcript,
+    "transcribe": transcribe,
+    "flashbacks": flashbacks,
+    "analytics": analytics,
+    "sync_calendar": sync_calendar,
+    "auth_login": auth_login,
+    "auth_signup": auth_signup,
+    "auth_me": auth_me,
+}
+
+
+async def seed(client, ctx, args):
+    """Memories for the reader, accounts for the login storm and one bearer token."""
+    lines = [
+        json.dumps({"text": transcript(ctx.rng, schedule=i % 3 == 0), "meeting_id": f"seed-{i}"})
+        for i in range(args.memories)
+    ]
+    response = await client.post(
+        "/api/memories/bulk", params={"user_id": READER}, content="\n".join(lines).encode(), timeout=600
+    )
+    response.raise_for_status()
+    ctx.users = [f"bench-user-{i}" for i in range(max(args.concurrency))]
+    for username in ctx.users:
+        response = await client.post("/api/signup", json={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+    response = await client.post("/api/login", data={"username": ctx.users[0], "password": PASSWORD})
+    response.raise_for_status()
+    ctx.token = response.json()["access_token"]
+    # The first analytics call computes the themes; later ones are what users normally see
+    (await client.get("/api/analytics", params={"user_id": READER}, timeout=600)).raise_for_status()
+
+
+async def run_level(client, scenario, ctx, concurrency: int, total: int) -> dict:
+    """`concurrency` workers issue `total` requests between them, back to back."""
+    latencies, errors = [], 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "error_rate": round(errors / total, 4),
+        **latency_summary(latencies),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    workdir = tempfile.mkdtemp(prefix="aether_load_")
+    groq = FakeGroqServer(
+        latency=args.groq_latency, error_rate=args.groq_error_rate, seed=args.seed, max_in_flight=args.groq_max_in_flight,
+        chat=fake_chat, transcribe=lambda audio: "so the plan for next week is mostly settled",
+    ).start()
+    calendar = FakeCalendarServer(latency=args.calendar_latency, error_rate=args.calendar_error_rate, seed=args.seed).start()
+    port = free_port()
+    server = start_server(args, workdir, server_env(args, workdir, groq, calendar), port)
+    ctx = Context(args.seed, args.audio_seconds)
+    results = {}
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 4, max_keepalive_connections=max(args.concurrency) + 4)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits) as client:
+            startup_seconds = await wait_until_ready(client, server, workdir)
+            await seed(client, ctx, args)
+            for name in args.scenarios:
+                results[name] = {}
+                for concurrency in args.concurrency:
+                    reset_peak_rss(server.pid)
+                    level = await run_level(client, SCENARIOS[name], ctx, concurrency, args.requests)
+                    level["peak_rss_mb"] = peak_rss_mb(server.pid)
+                    results[name][f"c{concurrency}"] = level
+                    print(f"{name:<20} c={concurrency:<4} p50={level['p50_ms']:>9.1f}ms p99={level['p99_ms']:>9.1f}ms "
+                          f"{level['throughput_rps']:>8.1f} req/s errors={level['error_rate']:.2%}", file=sys.stderr)
+            stages = parse_stage_metrics((await client.get("/metrics")).text)
+            llm = (await client.get("/api/llm-stats")).json()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        groq.stop()
+        calendar.stop()
+
+    # ru_maxrss of waited-for children: KiB on Linux, bytes on macOS
+    children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    children_peak_mb = children_peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "scenarios": args.scenarios,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "memories": args.memories,
+            "audio_seconds": args.audio_seconds,
+            "groq_latency": args.groq_latency,
+            "groq_error_rate": args.groq_error_rate,
+            "groq_max_in_flight": args.groq_max_in_flight,
+            "calendar_latency": args.calendar_latency,
+            "calendar_error_rate": args.calendar_error_rate,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "seed": args.seed,
+        },
+        "server": {"startup_seconds": round(startup_seconds, 3), "peak_rss_mb": round(children_peak_mb, 1)},
+        "results": results,
+        "stages": stages,
+        "llm": llm,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        type=lambda v: [s for s in v.split(",") if s], help="comma-separated, in run order")
+    parser.add_argument("--concurrency", default="1,8,32", type=_int_list, help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario and level")
+    parser.add_argument("--memories", type=int, default=200, help="transcripts seeded before the run")
+    parser.add_argument("--audio-seconds", type=float, default=20.0, help="length of the /api/transcribe clip")
+    parser.add_argument("--groq-latency", type=float, default=0.2, help="seconds per Groq request")
+    parser.add_argument("--groq-error-rate", type=float, default=0.0, help="share of Groq requests that answer 500")
+    parser.add_argument("--groq-max-in-flight", type=int, default=None,
+                        help="Groq answers 429 + retry-after beyond this many concurrent requests")
+    parser.add_argument("--calendar-latency", type=float, default=0.1, help="seconds per Calendar request")
+    parser.add_argument("--calendar-error-rate", type=float, default=0.0, help="share of Calendar requests that answer 503")
+    parser.add_argument("--bcrypt-rounds", type=int, default=None, help="defaults to the app's AETHER_BCRYPT_ROUNDS")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request client timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios {unknown}; choose from {list(SCENARIOS)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+# The backend is run from its own folder (relative imports and ./chroma_db)
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+# Services are built on first use; no background model loading during tests
+os.environ.setdefault("AETHER_WARMUP", "0")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """
+    Runs the whole session in a throwaway folder, so ./aether.db and ./chroma_db
+    stay out of the source tree. Session-wide because main creates its tables
+    at import, once per process, relative to the folder it was imported in.
+    """
+    path = tmp_path_factory.mktemp("aether")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(path)
+        yield path
+
+
+@pytest.fixture
+def main(workdir):
+    """The backend's main module, imported inside workdir."""
+    import main
+    return main
+
+
+@pytest.fixture
+def memory_service_factory(tmp_path, monkeypatch):
+    """
+    Builds MemoryServices on a throwaway Chroma store with the hashing embeddings
+    (no model download). Background summaries are off; pass a client to reach a fake Groq.
+    """
+    import services.embeddings as embeddings_module
+    import services.memory_service as memory_module
+
+    monkeypatch.setattr(memory_module, "CHROMA_PATH", str(tmp_path / "chroma"))
+    monkeypatch.setattr(embeddings_module, "EMBEDDINGS", "hashing")
+
+    def build(client=None):
+        service = memory_module.MemoryService(client=client)
+        service.summary_refresher = None
+        return service
+    return build
@@ -0,0 +1,240 @@
+"""
+Local HTTP stand-ins for the services the backend talks to, for tests and
+benchmarks that should exercise the real SDK clients without the network.
+
+    server = FakeGroqServer(latency=0.2).start()
+    client = Groq(api_key="test", base_url=server.url)
+    ...
+    server.stop()
+
+FakeCalendarServer plays the same role for the Google Calendar API
+(GoogleCalendarService(api_endpoint=server.url)).
+"""
+import json
+import time
+import uuid
+import random
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _multipart_files(content_type: str, body: bytes) -> dict:
+    """Returns {field name: bytes} for a multipart/form-data body."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()
+    }
+
+
+class _LocalServer:
+    """A threaded HTTP server on a free localhost port; subclasses provide _handler()."""
+
+    def __init__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeGroqServer(_LocalServer):
+    """
+    Speaks just enough of Groq's OpenAI-compatible API for the backend:
+    chat completions and audio transcriptions. Every request sleeps `latency`
+    seconds; the first `failures` requests answer 500 so retry paths can be tested,
+    and after that each request fails with probability `error_rate` (seeded, so
+    runs are repeatable). With max_in_flight, requests beyond that many at once
+    are refused with a 429 and a retry-after-ms header, like a provider's rate
+    limit. transcribe(audio_bytes) -> str and chat(request_json) -> str decide
+    the replies.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: int = 0, transcribe=None, chat=None, error_rate: float = 0.0,
+                 seed: int = 0, max_in_flight: int = None, retry_after_ms: int = 50):
+        self.latency = latency
+        self.failures = failures
+        self.error_rate = error_rate
+        self.max_in_flight = max_in_flight
+        self.retry_after_ms = retry_after_ms
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self.transcribe = transcribe or (lambda audio: f"{len(audio)} bytes")
+        self.chat = chat or (lambda request: '{"events": []}')
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def _enter(self):
+        """Counts the request; returns "ok", "fail" or "throttle"."""
+        with self._lock:
+            self.requests += 1
+            if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+                self.throttled += 1
+                return "throttle"
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.failures > 0:
+                self.failures -= 1
+                return "fail"
+            return "fail" if self.error_rate and self._random.random() < self.error_rate else "ok"
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                outcome = fake._enter()
+                if outcome == "throttle":
+                    self._reply(
+                        429, b'{"error": {"message": "rate limit reached"}}', "application/json",
+                        {"retry-after-ms": str(fake.retry_after_ms)},
+                    )
+                    return
+                try:
+                    time.sleep(fake.latency)
+                    if outcome == "fail":
+                        self._reply(500, b'{"error": {"message": "injected failure"}}', "application/json")
+                    elif self.path.endswith("/audio/transcriptions"):
+                        audio = _multipart_files(self.headers["Content-Type"], body)["file"]
+                        self._reply(200, fake.transcribe(audio).encode(), "text/plain")
+                    elif self.path.endswith("/chat/completions"):
+                        request = json.loads(body)
+                        self._reply(200, json.dumps(_completion(request, fake.chat(request))).encode(), "application/json")
+                    else:
+                        self._reply(404, b'{"error": {"message": "not found"}}', "application/json")
+                finally:
+                    fake._exit()
+
+        return Handler
+
+
+def _completion(request: dict, content: str) -> dict:
+    # Roughly four characters per token, like the real tokenizer on English text
+    prompt_tokens = sum(len(m.get("content") or "") for m in request.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "fake"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+
+class FakeCalendarServer(_LocalServer):
+    """
+    Enough of the Google Calendar v3 API for GoogleCalendarService: single
+    events.insert calls and multipart/mixed batch requests. Each HTTP request
+    (a whole batch counts once) sleeps `latency` seconds and fails with a 503
+    with probability `error_rate`. Events whose title contains "FAIL" are
+    rejected with a 400 inside the batch response.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.http_requests = 0
+        self.batch_requests = 0
+        self.events = []
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def _insert(self, body: dict):
+        """Returns (status, response json) for one events.insert."""
+        if "FAIL" in body.get("summary", ""):
+            return 400, {"error": {"code": 400, "message": "Invalid event", "errors": [{"reason": "invalid"}]}}
+        event = dict(body, id=uuid.uuid4().hex, status="confirmed")
+        event["htmlLink"] = f"https://calendar.example/event?eid={event['id']}"
+        with self._lock:
+            self.events.append(event)
+        return 200, event
+
+    def _batch(self, content_type: str, body: bytes):
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            raw = part.get_payload()
+            head, _, payload = raw.replace("\r\n", "\n").partition("\n\n")
+            status, reply = self._insert(json.loads(payload))
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Bad Request'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(reply)}\r\n"
+            )
+        return f"multipart/mixed; boundary={boundary}", ("".join(parts) + f"--{boundary}--\r\n").encode()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.http_requests += 1
+                    healthy = not (fake.error_rate and fake._random.random() < fake.error_rate)
+                time.sleep(fake.latency)
+                path = self.path.split("?")[0]
+                if not healthy:
+                    self._reply(503, b'{"error": {"code": 503, "message": "injected failure"}}', "application/json")
+                elif path.endswith("/batch/calendar/v3"):
+                    with fake._lock:
+                        fake.batch_requests += 1
+                    content_type, reply = fake._batch(self.headers["Content-Type"], body)
+                    self._reply(200, reply, content_type)
+                elif path.endswith("/events"):
+                    status, reply = fake._insert(json.loads(body))
+                    self._reply(status, json.dumps(reply).encode(), "application/json")
+                else:
+                    self._reply(404, b'{"error": {"code": 404, "message": "not found"}}', "application/json")
+
+        return Handler
@@ -3,16 +3,88 @@ import { useState, useEffect, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import axios from 'axios';
 
+// Use environment variable or default to the Render URL
+const API_URL = import.meta.env.VITE_API_URL || 'https://your-backend.onrender.com';
+// Set VITE_LIVE_TRANSCRIPTION=true to stream PCM over /ws/transcribe instead of uploading whole blobs.
+// Opt-in: every live segment is sent to /process-transcript on its own, one extraction call each
+const LIVE_TRANSCRIPTION = import.meta.env.VITE_LIVE_TRANSCRIPTION === 'true';
+
 export default function TranscriptPanel({ transcript, isListening, onToggleListen, onTranscriptionResult, ghostMode, onToggleGhost, token }) {
     const scrollRef = useRef(null);
     const mediaRecorderRef = useRef(null);
     const chunksRef = useRef([]); // Use a Ref for chunks to avoid state delay issues
+    const liveRef = useRef(null); // { socket, stream, context, processor } while streaming
+    const [partial, setPartial] = useState('');
 
     useEffect(() => {
         if (scrollRef.current) {
             scrollRef.current.scrollTop = scrollRef.current.scrollHeight;
         }
-    }, [transcript]);
+    }, [transcript, partial]);
+
+    const startLiveRecording = async () => {
+        try {
+            const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+            // Ask for 16 kHz; browsers that ignore it report their real rate to the backend
+            const context = new AudioContext({ sampleRate: 16000 });
+            const source = context.createMediaStreamSource(stream);
+            const processor = context.createScriptProcessor(4096, 1, 1);
+
+            const wsUrl = API_URL.replace(/^http/, 'ws');
+            const socket = new WebSocket(`${wsUrl}/ws/transcribe?sample_rate=${context.sampleRate}`);
+            socket.binaryType = 'arraybuffer';
+
+            socket.onmessage = (message) => {
+                const event = JSON.parse(message.data);
+                if (event.type === 'partial') {
+                    // Each partial covers only the audio since the previous one
+                    setPartial(previous => previous ? `${previous} ${event.text}` : event.text);
+                } else if (event.type === 'final') {
+                    setPartial('');
+                    if (event.text) {
+                        onTranscriptionResult(event.text);
+                    }
+                } else if (event.type === 'error') {
+                    console.error("Live transcription failed:", event.message);
+                }
+            };
+            socket.onclose = () => setPartial('');
+
+            processor.onaudioprocess = (e) => {
+                if (socket.readyState !== WebSocket.OPEN) return;
+                // Float32 [-1, 1] -> 16-bit PCM, the format the endpoint expects
+                const input = e.inputBuffer.getChannelData(0);
+                const pcm = new Int16Array(input.length);
+                for (let i = 0; i < input.length; i++) {
+                    const s = Math.max(-1, Math.min(1, input[i]));
+                    pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+                }
+                socket.send(pcm.buffer);
+            };
+            source.connect(processor);
+            processor.connect(context.destination);
+
+            liveRef.current = { socket, stream, context, processor };
+            onToggleListen();
+        } catch (err) {
+            console.error("Error accessing microphone:", err);
+            alert("Could not access microphone. Please check browser permissions.");
+        }
+    };
+
+    const stopLiveRecording = () => {
+        const live = liveRef.current;
+        if (!live) return;
+        live.processor.disconnect();
+        live.stream.getTracks().forEach(track => track.stop());
+        live.context.close();
+        // The server flushes the last segment, sends its final and then closes
+        if (live.socket.readyState === WebSocket.OPEN) {
+            live.socket.send(JSON.stringify({ type: 'stop' }));
+        }
+        liveRef.current = null;
+        onToggleListen();
+    };
 
     const startRecording = async () => {
         try {
@@ -48,9 +120,7 @@ export default function TranscriptPanel({ transcript, isListening, onToggleListe
                 formData.append('file', audioBlob, 'meeting_recording.webm');
 
                 try {
-                    // Use environment variable or default to the Render URL
-                    const apiUrl = import.meta.env.VITE_API_URL || 'https://your-backend.onrender.com';
-                    const response = await axios.post(`${apiUrl}/api/transcribe`, formData, {
+                    const response = await axios.post(`${API_URL}/api/transcribe`, formData, {
                         headers: {
                             'Content-Type': 'multipart/form-data'
                         }
@@ -81,7 +151,9 @@ export default function TranscriptPanel({ transcript, isListening, onToggleListe
     };
 
     const handleToggle = () => {
-        if (isListening) {
+        if (LIVE_TRANSCRIPTION) {
+            isListening ? stopLiveRecording() : startLiveRecording();
+        } else if (isListening) {
             stopRecording();
         } else {
             startRecording();
@@ -156,6 +228,14 @@ export default function TranscriptPanel({ transcript, isListening, onToggleListe
                             </motion.div>
                         ))
                     )}
+                    {partial && (
+                        <motion.div key="partial" initial={{ opacity: 0 }} animate={{ opacity: 1 }} className="flex gap-4">
+                            <div className="mt-1.5 w-1 h-6 rounded-full bg-indigo-500/10 animate-pulse"></div>
+                            <p className="text-lg font-light italic leading-relaxed text-slate-500">
+                                {partial}
+                            </p>
+                        </motion.div>
+                    )}
                 </AnimatePresence>
             </div>
 
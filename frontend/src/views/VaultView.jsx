@@ -7,6 +7,8 @@ export default function VaultView() {
     const [memories, setMemories] = useState([]);
     const [loading, setLoading] = useState(true);
     const [searchQuery, setSearchQuery] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const scrollRef = useRef(null);
 
     useEffect(() => {
@@ -16,13 +18,18 @@ export default function VaultView() {
         return () => clearTimeout(timer);
     }, [searchQuery]);
 
+    const PAGE_SIZE = 24;
+
     const fetchMemories = async (query = '') => {
         setLoading(true);
-        const q = query.trim() || 'all';
+        const q = (typeof query === 'string' ? query : '').trim() || 'all';
+        // The full archive is paged lazily; searches return a short ranked list
+        const params = q === 'all' ? `&limit=${PAGE_SIZE}&fields=snippet` : '';
         try {
-            const response = await api.get(`/flashbacks?query=${encodeURIComponent(q)}`);
+            const response = await api.get(`/flashbacks?query=${encodeURIComponent(q)}${params}`);
             if (response.data && response.data.flashbacks) {
                 setMemories(response.data.flashbacks);
+                setNextCursor(response.data.next_cursor || null);
             }
         } catch (error) {
             console.error('Error fetching memories:', error);
@@ -31,6 +38,24 @@ export default function VaultView() {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const response = await api.get(
+                `/flashbacks?query=all&limit=${PAGE_SIZE}&fields=snippet&cursor=${encodeURIComponent(nextCursor)}`
+            );
+            if (response.data && response.data.flashbacks) {
+                setMemories(prev => [...prev, ...response.data.flashbacks]);
+                setNextCursor(response.data.next_cursor || null);
+            }
+        } catch (error) {
+            console.error('Error fetching more memories:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const formatDate = (dateString) => {
         if (!dateString) return 'Recent Meeting';
         try {
@@ -61,7 +86,7 @@ export default function VaultView() {
                     />
                 </div>
                 <button
-                    onClick={fetchMemories}
+                    onClick={() => fetchMemories(searchQuery)}
                     className="px-6 py-4 bg-indigo-600 hover:bg-indigo-500 rounded-2xl text-[10px] font-bold uppercase tracking-widest transition-all shadow-lg shadow-indigo-500/20 active:scale-95 whitespace-nowrap"
                 >
                     Refresh Vault
@@ -88,10 +113,10 @@ export default function VaultView() {
                     ) : (
                         memories.map((memory, i) => (
                             <motion.div
-                                key={i}
+                                key={memory.id || i}
                                 initial={{ opacity: 0, y: 20 }}
                                 animate={{ opacity: 1, y: 0 }}
-                                transition={{ delay: i * 0.05 }}
+                                transition={{ delay: (i % PAGE_SIZE) * 0.05 }}
                                 className="glass-morphism p-6 flex flex-col h-full group hover:border-indigo-500/30 transition-all cursor-pointer relative overflow-hidden rounded-3xl"
                             >
                                 <div className="flex justify-between items-start mb-4">
@@ -126,6 +151,15 @@ export default function VaultView() {
                         ))
                     )}
                 </AnimatePresence>
+                {!loading && nextCursor && (
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="col-span-full mx-auto px-6 py-3 bg-white/[0.03] hover:bg-white/[0.06] border border-white/10 rounded-2xl text-[10px] font-bold uppercase tracking-widest transition-all disabled:opacity-40"
+                    >
+                        {loadingMore ? 'Loading...' : 'Load Older Memories'}
+                    </button>
+                )}
             </div>
         </div>
     );
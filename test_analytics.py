@@ -0,0 +1,72 @@
+import json
+
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+
+def theme_server(prompts):
+    """Fake Groq chat that records each themes prompt and names its theme after the call number."""
+    def chat(request):
+        prompts.append(request["messages"][1]["content"])
+        return json.dumps({"themes": [{"name": f"Theme from call {len(prompts)}", "value": 6}]})
+    return FakeGroqServer(chat=chat).start()
+
+
+def test_themes_are_cached_and_merged_incrementally(memory_service_factory, monkeypatch):
+    import services.memory_service as memory_module
+    # Every call revalidates against the stored ids instead of trusting the cache for 30 s
+    monkeypatch.setattr(memory_module, "ANALYTICS_REVALIDATE_SECONDS", 0)
+
+    prompts = []
+    server = theme_server(prompts)
+    try:
+        service = memory_service_factory(Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        service.add_memory("Kickoff: we agreed on the pricing roadmap.", "kickoff", "dana")
+        service.add_memory("Pricing review with the sales team.", "pricing", "dana")
+
+        first = service.get_analytics("dana")
+        assert first == {"themes": [{"name": "Theme from call 1", "value": 6}], "totalMeetings": 2}
+        assert server.requests == 1
+        assert "pricing roadmap" in prompts[0] and "Pricing review" in prompts[0]
+
+        assert service.get_analytics("dana") == first
+        assert server.requests == 1
+
+        service.add_memory("Hiring plan for the support desk.", "hiring", "dana")
+        merged = service.get_analytics("dana")
+        assert server.requests == 2
+        assert merged == {"themes": [{"name": "Theme from call 2", "value": 6}], "totalMeetings": 3}
+        # Only the new meeting is sent, with the earlier themes to merge into
+        assert "previously identified from 2 earlier meetings" in prompts[1]
+        assert "Theme from call 1" in prompts[1]
+        assert "Hiring plan" in prompts[1] and "pricing roadmap" not in prompts[1]
+
+        assert service.get_analytics("dana") == merged
+        assert server.requests == 2
+    finally:
+        server.stop()
+
+
+def test_users_never_see_each_others_cached_themes(memory_service_factory):
+    prompts = []
+    server = theme_server(prompts)
+    try:
+        service = memory_service_factory(Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        service.add_memory("Quarterly board prep.", "board", "dana")
+        dana = service.get_analytics("dana")
+
+        assert service.get_analytics("eli") == {"themes": [], "totalMeetings": 0}
+        assert server.requests == 1
+
+        service.add_memory("Onboarding checklist for new hires.", "onboarding", "eli")
+        eli = service.get_analytics("eli")
+        assert server.requests == 2
+        # A fresh analysis of eli's meeting alone, not a merge into dana's themes
+        assert "previously identified" not in prompts[1] and "Theme from call 1" not in prompts[1]
+        assert "board prep" not in prompts[1] and "Onboarding checklist" in prompts[1]
+        assert eli["themes"] != dana["themes"] and eli["totalMeetings"] == 1
+        assert service.get_analytics("dana") == dana
+        assert server.requests == 2
+    finally:
+        server.stop()
@@ -1,9 +1,21 @@
+"""
+Manual end-to-end check against a running backend with real Groq keys:
+
+    cd backend && python main.py        # serves on port 8005
+    python test_assistant.py            # or AETHER_URL=http://host:port python test_assistant.py
+
+It only prints what came back; for numbers use benchmarks/load_test.py, which
+runs offline against local stand-ins for Groq and Google Calendar.
+"""
+import os
 import requests
 import json
 import time
 
+BASE_URL = os.getenv("AETHER_URL", "http://localhost:8005")
+
 def test_integration():
-    url = "http://localhost:8000/process-transcript"
+    url = f"{BASE_URL}/process-transcript"
     transcript = "Hey team, great meeting today. Let's sync again next Tuesday, March 4th at 2 PM to finalize the code. Also, remind me to check the microphone settings."
     
     payload = {
@@ -35,7 +47,7 @@ def test_integration():
         return
 
     print("\n--- Verifying Memory in ChromaDB ---")
-    flashback_url = "http://localhost:8000/flashbacks"
+    flashback_url = f"{BASE_URL}/flashbacks"
     params = {"query": "NumPy"}
     
     try:
@@ -45,9 +57,9 @@ def test_integration():
         fb_data = fb_response.json()
         flashbacks = fb_data.get("flashbacks", [])
         
-        if flashbacks and len(flashbacks[0]) > 0:
+        if flashbacks and flashbacks[0].get("text"):
             print(f"[SUCCESS] Memory recalled for 'NumPy':")
-            print(f"Content: {flashbacks[0][0][:100]}...")
+            print(f"Content: {flashbacks[0]['text'][:100]}...")
         else:
             print("[WARNING] No memory found for 'NumPy'.")
             
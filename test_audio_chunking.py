@@ -0,0 +1,107 @@
+import io
+import time
+
+import numpy as np
+import soundfile as sf
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+from services import audio_service as audio_module
+from services.audio_preprocess import TARGET_RATE, FRAME_MS, frame_energies_db, decode, to_mono_16k
+
+CHUNK_LATENCY = 0.5
+TONES = [300 + 100 * i for i in range(8)]
+
+
+def long_recording(tone_seconds=4.0, gap_seconds=1.0) -> bytes:
+    """One 'word' per tone (a distinct pitch), separated by pauses."""
+    t = np.arange(int(tone_seconds * TARGET_RATE)) / TARGET_RATE
+    gap = np.zeros(int(gap_seconds * TARGET_RATE))
+    pieces = []
+    for frequency in TONES:
+        pieces += [0.3 * np.sin(2 * np.pi * frequency * t), gap]
+    buffer = io.BytesIO()
+    sf.write(buffer, np.concatenate(pieces).astype(np.float32), TARGET_RATE, format="WAV")
+    return buffer.getvalue()
+
+
+def hear_tones(audio: bytes) -> str:
+    """The fake 'speech model': names the pitch of every voiced stretch, in order."""
+    samples, rate = sf.read(io.BytesIO(audio), dtype="float32")
+    frame = rate * FRAME_MS // 1000
+    # Fixed threshold: the tones are loud and the gaps digital silence
+    voiced = frame_energies_db(samples, rate) > -40
+    padded = np.concatenate(([0], voiced.astype(np.int8), [0]))
+    words = []
+    for start, end in np.flatnonzero(np.diff(padded)).reshape(-1, 2):
+        segment = samples[start * frame: end * frame]
+        if segment.size < rate // 2:
+            continue
+        spectrum = np.abs(np.fft.rfft(segment))
+        frequency = np.fft.rfftfreq(segment.size, 1 / rate)[np.argmax(spectrum)]
+        words.append(f"tone{int(round(frequency, -2))}")
+    return " ".join(words)
+
+
+def transcribe_with(server):
+    settings = audio_module.CHUNK_THRESHOLD_SECONDS, audio_module.CHUNK_SECONDS
+    audio_module.CHUNK_THRESHOLD_SECONDS, audio_module.CHUNK_SECONDS = 10, 6
+    service = audio_module.AudioService()
+    service.client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+    try:
+        started = time.perf_counter()
+        transcript, report = service.transcribe_audio_with_report(long_recording(), "meeting.wav")
+        return transcript, report, time.perf_counter() - started
+    finally:
+        audio_module.CHUNK_THRESHOLD_SECONDS, audio_module.CHUNK_SECONDS = settings
+
+
+def test_long_audio_is_transcribed_in_parallel_chunks():
+    server = FakeGroqServer(latency=CHUNK_LATENCY, transcribe=hear_tones).start()
+    try:
+        transcript, report, elapsed = transcribe_with(server)
+    finally:
+        server.stop()
+
+    assert transcript == " ".join(f"tone{f}" for f in TONES)
+    assert report["chunks"] == len(TONES)
+    assert report["failed_chunks"] == []
+    # Only the chunks were encoded, never the whole recording first
+    assert report["deferred"] and "encode" not in report["timings_ms"]
+    assert 0 < report["processed_bytes"] < report["original_bytes"]
+    assert server.peak_in_flight > 1
+    # Serially this would take chunks * latency; in parallel about one latency
+    assert elapsed < len(TONES) * CHUNK_LATENCY / 2
+
+
+def test_failed_chunks_are_retried_individually():
+    server = FakeGroqServer(latency=0.05, failures=2, transcribe=hear_tones).start()
+    try:
+        transcript, report, _ = transcribe_with(server)
+    finally:
+        server.stop()
+
+    assert transcript == " ".join(f"tone{f}" for f in TONES)
+    assert report["failed_chunks"] == []
+    # Only the two failed requests were repeated, not the whole recording
+    assert server.requests == len(TONES) + 2
+
+
+def test_block_decoding_matches_decoding_the_whole_file():
+    for rate in (48000, 44100):
+        t = np.arange(int(rate * 25.3)) / rate
+        stereo = np.stack([np.sin(2 * np.pi * 440 * t), 0.5 * np.sin(2 * np.pi * 300 * t)], axis=1)
+        buffer = io.BytesIO()
+        sf.write(buffer, stereo.astype(np.float32), rate, format="WAV")
+        whole = to_mono_16k(sf.read(io.BytesIO(buffer.getvalue()), dtype="float32", always_2d=True)[0], rate)
+
+        # A file object is decoded in blocks, never read whole
+        samples, decoded_rate = decode(buffer)
+        assert decoded_rate == TARGET_RATE
+        assert samples.size == whole.size
+        assert np.allclose(samples, whole, atol=1e-6)
+
+
+def test_stitching_drops_words_repeated_across_the_overlap():
+    parts = ["we should ship the beta on", "Ship the beta on Friday, and then", "and then review it."]
+    assert audio_module.stitch_transcripts(parts) == "we should ship the beta on Friday, and then review it."
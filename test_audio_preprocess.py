@@ -0,0 +1,103 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from services.audio_preprocess import (
+    FRAME_MS, PAD_MS, TARGET_RATE, decode, preprocess, split_at_silences, voice_activity,
+)
+
+# Samples per VAD frame
+FRAME = TARGET_RATE * FRAME_MS // 1000
+
+
+def recording(*parts, rate=TARGET_RATE):
+    """(seconds, speaking) parts -> float32 samples: a tone for speech, faint noise for pauses."""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, speaking in parts:
+        t = np.arange(int(seconds * rate)) / rate
+        pieces.append(0.3 * np.sin(2 * np.pi * 220 * t) if speaking else 1e-4 * rng.standard_normal(t.size))
+    return np.concatenate(pieces).astype(np.float32)
+
+
+def wav(samples, rate=TARGET_RATE, channels=1):
+    buffer = io.BytesIO()
+    sf.write(buffer, np.repeat(samples[:, None], channels, axis=1), rate, format="WAV")
+    return buffer.getvalue()
+
+
+def frames(seconds):
+    return int(seconds * 1000 / FRAME_MS)
+
+
+def test_voice_activity_marks_speech_and_pads_its_edges():
+    voiced = voice_activity(recording((2, False), (3, True), (2, False)))
+    assert voiced.size == frames(7)
+
+    pad = PAD_MS // FRAME_MS
+    assert voiced[frames(2):frames(5)].all()
+    # Padded by the hangover on both sides, silent beyond it
+    assert voiced[frames(2) - pad + 1:frames(2)].all() and voiced[frames(5):frames(5) + pad - 1].all()
+    assert not voiced[:frames(2) - pad - 1].any() and not voiced[frames(5) + pad + 1:].any()
+
+
+def test_silence_is_dropped_before_upload():
+    data = wav(recording((4, False)))
+    report = preprocess(data)
+    assert report["silent"] is True and report["audio"] is None
+    assert report["bytes_saved"] == len(data)
+
+
+def test_speech_is_trimmed_resampled_and_reencoded():
+    data = wav(recording((3, False), (2, True), (3, False), rate=44100), rate=44100, channels=2)
+    report = preprocess(data, "meeting.wav")
+
+    assert report["passthrough"] is False and report["silent"] is False
+    assert report["duration_seconds"] == 8.0
+    # Two seconds of speech plus the padding either side, nothing of the long pauses
+    assert 2 <= report["speech_seconds"] <= 2 + 2 * PAD_MS / 1000 + 0.1
+    assert report["processed_bytes"] < len(data) / 4
+    samples, rate = decode(report["audio"])
+    assert rate == TARGET_RATE
+    assert samples.size == report["samples"].size
+    assert abs(samples.size / TARGET_RATE - report["speech_seconds"]) < 0.1
+
+
+def test_speech_too_long_for_one_upload_is_left_for_the_caller_to_encode():
+    data = wav(recording((1, False), (6, True), (1, False)))
+    report = preprocess(data, encode_up_to_seconds=5)
+    assert report["deferred"] is True and report["audio"] is None
+    assert "encode" not in report["timings_ms"]
+    assert report["samples"].size >= 6 * TARGET_RATE and report["voiced"].all()
+
+    assert preprocess(data, encode_up_to_seconds=10)["deferred"] is False
+
+
+def test_undecodable_uploads_pass_through_unchanged():
+    report = preprocess(b"not audio at all", "clip.webm")
+    assert report["passthrough"] is True
+    assert report["audio"] == b"not audio at all" and report["filename"] == "clip.webm"
+
+
+def test_long_audio_is_cut_in_the_pauses():
+    # Eight seconds of speech, then a one-second pause, five times over
+    samples = recording(*[(8, True), (1, False)] * 5)
+    voiced = voice_activity(samples)
+    spans = split_at_silences(voiced, samples.size, chunk_seconds=12, overlap_seconds=0.5)
+
+    assert spans[0][0] == 0 and spans[-1][1] == samples.size
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        # Each chunk ends inside a pause and the next starts half a second before it
+        assert end - start == TARGET_RATE // 2
+        second = end / TARGET_RATE
+        assert 8 < second % 9 < 9
+    assert all(end - start <= 12.5 * TARGET_RATE for start, end in spans)
+
+
+def test_audio_without_pauses_is_cut_at_the_window():
+    voiced = np.ones(frames(25), dtype=bool)
+    total = voiced.size * FRAME
+    spans = split_at_silences(voiced, total, chunk_seconds=10, overlap_seconds=0)
+    window = frames(10) * FRAME
+    assert [end - start for start, end in spans] == [window, window, total - 2 * window]
@@ -0,0 +1,144 @@
+import asyncio
+
+import httpx
+
+
+def request(main, method, path, **kwargs):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, path, **kwargs)
+        finally:
+            # Pooled aiosqlite connections belong to this event loop; the lifespan does the same on shutdown
+            await main.async_engine.dispose()
+    return asyncio.run(scenario())
+
+
+def test_token_lookups_are_cached_until_the_user_changes(main):
+    import services.auth_service as auth_module
+    auth_module.BCRYPT_ROUNDS = 4
+    # Passwords over bcrypt's 72-byte limit still hash (bcrypt>=5 would raise)
+    credentials = {"username": "cache-user", "password": "pw-" * 40}
+    assert request(main, "POST", "/api/signup", json=credentials).status_code == 200
+    login = request(main, "POST", "/api/login", data=credentials)
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    lookups = []
+    original = main._lookup_user
+
+    async def counting_lookup(username):
+        lookups.append(username)
+        return await original(username)
+
+    main._lookup_user = counting_lookup
+    try:
+        for _ in range(5):
+            assert request(main, "GET", "/api/me", headers=headers).json()["username"] == "cache-user"
+        assert lookups == ["cache-user"]
+
+        main.auth_service.invalidate_user("cache-user")
+        assert request(main, "GET", "/api/me", headers=headers).status_code == 200
+        assert request(main, "GET", "/api/me", headers=headers).status_code == 200
+        assert lookups == ["cache-user", "cache-user"]
+        assert request(main, "GET", "/api/me", headers={"Authorization": "Bearer junk"}).status_code == 401
+    finally:
+        main._lookup_user = original
+
+
+def test_concurrent_signups_and_logins_on_sqlite(main):
+    import services.auth_service as auth_module
+    from sqlalchemy import text
+    auth_module.BCRYPT_ROUNDS = 4
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def account(i):
+                credentials = {"username": f"storm-{i}", "password": "hunter2"}
+                signup = await client.post("/api/signup", json=credentials)
+                login = await client.post("/api/login", data=credentials)
+                me = await client.get("/api/me", headers={"Authorization": f"Bearer {login.json()['access_token']}"})
+                return signup.status_code, login.status_code, me.status_code
+
+            # Everyone racing for one name: exactly one wins, nobody gets a 500
+            duplicates = [client.post("/api/signup", json={"username": "taken", "password": "x"}) for _ in range(10)]
+            results = await asyncio.gather(*(account(i) for i in range(60)), *duplicates)
+        await main.async_engine.dispose()
+        return results[:60], [r.status_code for r in results[60:]]
+
+    accounts, duplicates = asyncio.run(scenario())
+    assert accounts == [(200, 200, 200)] * 60
+    assert sorted(duplicates) == [200] + [400] * 9
+    with main.engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_memories_can_only_be_deleted_by_their_owner(main):
+    import services.auth_service as auth_module
+    auth_module.BCRYPT_ROUNDS = 4
+
+    class RecordingMemory:
+        deleted = []
+
+        def delete_user(self, username):
+            self.deleted.append(username)
+            return 3
+
+    previous = main.providers.memory.override(RecordingMemory())
+    try:
+        credentials = {"username": "owner", "password": "hunter2"}
+        request(main, "POST", "/api/signup", json=credentials)
+        token = request(main, "POST", "/api/login", data=credentials).json()["access_token"]
+
+        assert request(main, "DELETE", "/api/memories", params={"user_id": "victim"}).status_code == 401
+        response = request(main, "DELETE", "/api/memories", params={"user_id": "victim"},
+                           headers={"Authorization": f"Bearer {token}"})
+    finally:
+        main.providers.memory.override(previous)
+    assert response.json() == {"status": "deleted", "memories_removed": 3}
+    # The query parameter is ignored; only the signed-in user's partition goes
+    assert RecordingMemory.deleted == ["owner"]
+
+
+def test_memories_can_only_be_exported_by_their_owner(main):
+    import services.auth_service as auth_module
+    auth_module.BCRYPT_ROUNDS = 4
+
+    class RecordingMemory:
+        exported = []
+
+        def export_memories(self, username):
+            self.exported.append(username)
+            yield {"text": f"{username}'s note", "meeting_id": "m"}
+
+    previous = main.providers.memory.override(RecordingMemory())
+    try:
+        credentials = {"username": "exporter", "password": "hunter2"}
+        request(main, "POST", "/api/signup", json=credentials)
+        token = request(main, "POST", "/api/login", data=credentials).json()["access_token"]
+
+        assert request(main, "GET", "/api/memories/export", params={"user_id": "victim"}).status_code == 401
+        response = request(main, "GET", "/api/memories/export", params={"user_id": "victim"},
+                           headers={"Authorization": f"Bearer {token}"})
+    finally:
+        main.providers.memory.override(previous)
+    assert response.status_code == 200
+    assert response.text == '{"text": "exporter\'s note", "meeting_id": "m"}\n'
+    assert RecordingMemory.exported == ["exporter"]
+
+
+def test_cache_never_outlives_the_token():
+    import services.auth_service as auth_module
+    cache = auth_module.TokenCache(ttl_seconds=300)
+    user = auth_module.AuthenticatedUser(id=1, username="alice")
+    cache.set("expired", user, cache.generation("alice"), expires_at=auth_module.time.time() - 1)
+    assert cache.get("expired") is None
+    # A lookup that raced with an invalidation is not cached
+    stale = cache.generation("alice")
+    cache.invalidate("alice")
+    cache.set("raced", user, stale)
+    assert cache.get("raced") is None
+    cache.set("fresh", user, cache.generation("alice"))
+    assert cache.get("fresh") == user
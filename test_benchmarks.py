@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import compare  # noqa: E402
+import load_test  # noqa: E402
+
+
+def test_load_test_runs_offline_and_reports_every_level():
+    output = os.path.join(tempfile.mkdtemp(prefix="aether_test_"), "run.json")
+    report = load_test.main([
+        "--scenarios", "process_transcript,flashbacks,auth_login,sync_calendar",
+        "--concurrency", "1,4", "--requests", "8", "--memories", "10",
+        "--groq-latency", "0.02", "--calendar-latency", "0", "--bcrypt-rounds", "4",
+        "--output", output,
+    ])
+    with open(output) as f:
+        assert json.load(f) == report
+    for scenario, levels in report["results"].items():
+        assert set(levels) == {"c1", "c4"}, scenario
+        for level in levels.values():
+            assert level["error_rate"] == 0, (scenario, level)
+            assert level["p50_ms"] <= level["p95_ms"] <= level["p99_ms"] <= level["max_ms"]
+    assert report["stages"]["groq.chat"]["calls"] > 0
+    assert report["server"]["peak_rss_mb"] > 0
+
+
+def test_compare_flags_regressions_but_not_noise():
+    def level(p95, rps=100.0, errors=0.0, rss=200.0):
+        return {"p50_ms": 1.0, "p95_ms": p95, "p99_ms": p95, "throughput_rps": rps, "error_rate": errors, "peak_rss_mb": rss}
+
+    baseline = {"results": {"flashbacks": {"c1": level(1.0), "c8": level(40.0)}, "analytics": {"c1": level(10.0)}}}
+    candidate = {"results": {
+        # +50% but only half a millisecond: jitter, not a regression
+        "flashbacks": {"c1": level(1.5), "c8": level(60.0, rps=70.0)},
+        "analytics": {"c1": level(10.0, errors=0.05, rss=400.0)},
+    }}
+    result = compare.compare(baseline, candidate)
+    flagged = {(row["scenario"], row["level"]): row["problems"] for row in result["regressions"]}
+    assert set(flagged) == {("flashbacks", "c8"), ("analytics", "c1")}
+    assert flagged[("flashbacks", "c8")] == ["p95_ms +50%", "p99_ms +50%", "throughput -30%"]
+    assert flagged[("analytics", "c1")] == ["errors 0.0% -> 5.0%", "peak RSS +100%"]
@@ -0,0 +1,80 @@
+import json
+import asyncio
+
+import httpx
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+ARCHIVE = [
+    {"text": "Let's schedule the design review for tomorrow at 10.", "meeting_id": "design", "timestamp": "2026-02-02T10:00:00"},
+    {"transcript": "Budget sync next Tuesday at 3pm with finance.", "meeting_id": "budget"},
+    "Hiring panel on Friday at noon.",
+    {"text": "Let's schedule the design review for tomorrow at 10.", "meeting_id": "design"},
+]
+JUNK = ["not json", json.dumps({"text": "   "}), json.dumps([1, 2])]
+EVENT = '{"events": [{"title": "Review", "date": "2026-03-03", "time": "10:00", "description": ""}]}'
+
+
+def build_services(server, tmp_path, monkeypatch):
+    import services.embeddings as embeddings_module
+    import services.memory_service as memory_module
+    import services.calendar_service as calendar_module
+
+    monkeypatch.setattr(memory_module, "CHROMA_PATH", str(tmp_path / "chroma"))
+    # No model download in tests
+    monkeypatch.setattr(embeddings_module, "EMBEDDINGS", "hashing")
+    client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+    return memory_module.MemoryService(client=client), calendar_module.CalendarService(client=client)
+
+
+def post_archive(main, lines, **params):
+    body = ("\n".join(lines) + "\n").encode()
+
+    async def chunks():
+        # Small chunks, so records arrive split across reads
+        for offset in range(0, len(body), 37):
+            yield body[offset:offset + 37]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/memories/bulk", params={"user_id": "importer", **params}, content=chunks())
+    return asyncio.run(scenario())
+
+
+def test_parse_line_accepts_records_and_bare_strings():
+    from services.bulk_import import parse_line
+
+    assert parse_line(json.dumps(ARCHIVE[0]).encode()) == ARCHIVE[0]
+    assert parse_line(json.dumps(ARCHIVE[1])) == {"text": ARCHIVE[1]["transcript"], "meeting_id": "budget"}
+    assert parse_line(json.dumps(ARCHIVE[2])) == {"text": ARCHIVE[2], "meeting_id": "import"}
+    assert parse_line("  \n") is None
+    assert all(parse_line(line) is None for line in JUNK)
+
+
+def test_bulk_import_skips_the_llm_unless_asked(main, tmp_path, monkeypatch):
+    server = FakeGroqServer(chat=lambda request: EVENT).start()
+    memory_service, calendar_service = build_services(server, tmp_path, monkeypatch)
+    previous_memory = main.providers.memory.override(memory_service)
+    previous_calendar = main.providers.calendar.override(calendar_service)
+    try:
+        lines = [json.dumps(record) for record in ARCHIVE] + JUNK
+        imported = post_archive(main, lines, batch_size=2)
+        assert imported.status_code == 200
+        stats = imported.json()
+        assert (stats["received"], stats["inserted"], stats["duplicates"], stats["invalid"]) == (4, 3, 1, 3)
+        assert "calendar_events" not in stats
+        # Scheduling language everywhere, yet neither extraction nor summaries ran
+        assert server.requests == 0
+        assert memory_service.summary_refresher.pending == 0
+        assert memory_service.count_memories("importer") == 3
+
+        again = post_archive(main, lines[:3], extract_calendar="true")
+        assert again.json()["inserted"] == 0 and again.json()["duplicates"] == 3
+        assert server.requests > 0
+        assert [found["meeting_id"] for found in again.json()["calendar_events"]] == ["design", "budget", "import"]
+    finally:
+        main.providers.memory.override(previous_memory)
+        main.providers.calendar.override(previous_calendar)
+        server.stop()
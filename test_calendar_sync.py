@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+from google.oauth2.credentials import Credentials
+
+from fake_servers import FakeCalendarServer
+
+
+def calendar_against(server):
+    from services.google_calendar_service import GoogleCalendarService
+    service = GoogleCalendarService(api_endpoint=server.url)
+    service.creds = Credentials(token="test-token")
+    return service
+
+
+def post(app, path, payload):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=payload)
+    return asyncio.run(scenario())
+
+
+def test_batch_sync_inserts_every_event_in_one_request(main):
+    server = FakeCalendarServer(latency=0.2).start()
+    original = main.providers.google_calendar.override(calendar_against(server))
+    events = [
+        {"title": f"Follow-up {i}", "date": "2026-03-02", "time": f"{9 + i % 8:02d}:00", "description": ""}
+        for i in range(12)
+    ]
+    events[4]["title"] = "FAIL on purpose"
+    events[7]["time"] = "after lunch"
+    try:
+        response = post(main.app, "/api/sync-calendar/batch", {"calendar_events": events})
+    finally:
+        main.providers.google_calendar.override(original)
+        server.stop()
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "partial"
+    assert (body["created"], body["failed"]) == (10, 2)
+    assert [r["index"] for r in body["results"]] == list(range(12))
+    assert body["results"][4]["status"] == "error"
+    assert body["results"][7]["message"].startswith("Invalid event")
+    assert all(r["link"] for i, r in enumerate(body["results"]) if i not in (4, 7))
+    # Eleven valid inserts, one HTTP round-trip; the discovery client was built once
+    assert server.http_requests == server.batch_requests == 1
+
+
+def test_client_is_built_once_and_reused():
+    server = FakeCalendarServer().start()
+    try:
+        service = calendar_against(server)
+        event = {"title": "Sync", "date": "2026-03-02", "time": "10:00", "description": ""}
+        assert service.create_event(event)["status"] == "success"
+        first = service._service
+        assert service.create_event(event)["status"] == "success"
+        assert service._service is first
+    finally:
+        server.stop()
@@ -0,0 +1,85 @@
+from services.chunking import assemble, chunk_text
+
+SENTENCES = [
+    f"Item {i}: we discussed the roadmap for release {i % 7} and who owns the follow-up{'!' if i % 5 == 0 else '.'}"
+    for i in range(120)
+]
+LONG = " ".join(SENTENCES)
+
+
+def test_long_text_is_chunked_with_overlap_and_reassembled_exactly():
+    chunks = chunk_text(LONG, max_chars=500, overlap_chars=120)
+
+    assert len(chunks) > len(LONG) // 500
+    assert all(len(chunk) <= 500 for _, chunk in chunks)
+    assert all(LONG[start:start + len(chunk)] == chunk for start, chunk in chunks)
+    # Every chunk after the first starts inside the previous one, on a sentence boundary
+    for (start, chunk), (next_start, _) in zip(chunks, chunks[1:]):
+        assert start < next_start < start + len(chunk)
+        assert LONG[next_start - 2:next_start] in (". ", "! ")
+    assert assemble(chunks) == LONG
+    assert assemble(list(reversed(chunks))) == LONG
+
+
+def test_a_sentence_longer_than_a_chunk_is_split_between_words():
+    rambling = " ".join(f"word{i}" for i in range(400))
+    chunks = chunk_text(rambling, max_chars=300, overlap_chars=50)
+    assert len(chunks) > 1 and all(len(chunk) <= 300 for _, chunk in chunks)
+    assert all(not chunk.startswith(" ") and not chunk.endswith(" ") for _, chunk in chunks)
+    assert assemble(chunks) == rambling
+    assert chunk_text("") == []
+
+
+def test_reingesting_a_transcript_is_a_no_op(memory_service_factory):
+    service = memory_service_factory()
+    first = service.add_memory(LONG, "planning", "ana")
+    rows = service._collection("ana").count()
+    assert rows > 1
+
+    assert service.add_memory(LONG, "planning", "ana") == first
+    again = service.add_memories([{"text": LONG, "meeting_id": "planning"}] * 2, "ana")
+    assert (again["inserted"], again["duplicates"]) == (0, 2)
+    assert service.count_memories("ana") == 1
+    assert service._collection("ana").count() == rows
+    # Same words, different meeting: a memory of its own
+    assert service.add_memory(LONG, "retro", "ana") != first
+    assert service.count_memories("ana") == 2
+    assert [m["text"] for m in service.get_all_memories("ana")] == [LONG, LONG]
+
+
+def test_search_returns_one_hit_per_meeting(memory_service_factory):
+    service = memory_service_factory()
+    long_id = service.add_memory(LONG, "planning", "ben")
+    short_id = service.add_memory("Quick roadmap check-in before the release.", "standup", "ben")
+    assert service._collection("ben").count() > 3
+
+    hits = service.search_memories("roadmap release follow-up", "ben", n_results=5)
+    ids = [hit["id"] for hit in hits]
+    assert sorted(ids) == sorted([long_id, short_id])
+    # The hit carries its best passage, not the whole transcript
+    long_hit = hits[ids.index(long_id)]
+    assert long_hit["text"] in LONG and len(long_hit["text"]) < len(LONG)
+    assert "chunk_index" not in long_hit["metadata"]
+
+
+def test_rows_written_before_chunking_are_still_listed_and_searched(memory_service_factory, monkeypatch):
+    import services.memory_service as memory_module
+    monkeypatch.setattr(memory_module, "PARTITIONING_SETTING", "shared")
+
+    service = memory_service_factory()
+    # As the original add_memory stored them: one row per transcript, random id, no ts
+    service._collection("cleo").add(
+        ids=["msg_0badc0de"],
+        documents=["Legacy notes: ticket JIRA-77 blocks the launch."],
+        metadatas=[{"meeting_id": "legacy", "timestamp": "2025-01-01T09:00:00", "username": "cleo"}],
+    )
+    new_id = service.add_memory("Fresh notes about the launch checklist.", "fresh", "cleo")
+
+    listed = service.list_memories("cleo")["items"]
+    assert [m["id"] for m in listed] == [new_id, "msg_0badc0de"]
+    assert listed[1]["text"] == "Legacy notes: ticket JIRA-77 blocks the launch."
+    assert service.count_memories("cleo") == 2
+
+    hits = service.search_memories("JIRA-77", "cleo", n_results=2)
+    assert hits[0]["id"] == "msg_0badc0de"
+    assert hits[0]["metadata"]["meeting_id"] == "legacy"
@@ -0,0 +1,135 @@
+import os
+import time
+import asyncio
+
+import httpx
+
+LLM_LATENCY = 0.2
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+
+
+class _Response:
+    def __init__(self, content):
+        self.choices = [_Choice(content)]
+
+
+class SlowFakeGroq:
+    """Stands in for the Groq SDK: every chat completion sleeps like a real Llama call."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return _Response('{"events": []}')
+
+
+class FakeWhisper:
+    """Stands in for Groq Whisper: 'transcribes' by echoing the uploaded bytes."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.audio = self
+        self.transcriptions = self
+
+    def create(self, file, **kwargs):
+        name, handle = file
+        data = handle if isinstance(handle, bytes) else handle.read()
+        time.sleep(self.latency)
+        return data.decode()
+
+
+async def _fire(app, concurrency: int, total: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                # Distinct scheduling texts so neither the pre-filter nor the cache answers for the LLM
+                response = await client.post(
+                    "/process-transcript",
+                    json={"text": f"Let's sync about the roadmap tomorrow #{i} {time.time()}", "meeting_id": "load", "ghost_mode": True},
+                )
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return total / (time.perf_counter() - started)
+
+
+def test_throughput_scales_with_concurrency(main):
+    main.get_calendar_service().client = SlowFakeGroq(LLM_LATENCY)
+
+    serial = asyncio.run(_fire(main.app, concurrency=1, total=4))
+    parallel = asyncio.run(_fire(main.app, concurrency=32, total=64))
+
+    # A blocked event loop would pin both runs to ~1 / LLM_LATENCY req/s
+    assert serial < 1.5 / LLM_LATENCY
+    assert parallel > 10 * serial
+
+
+def test_root_stays_responsive_during_llm_calls(main):
+    main.get_calendar_service().client = SlowFakeGroq(1.0)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = asyncio.ensure_future(asyncio.gather(*(
+                client.post("/process-transcript", json={"text": f"Meet at 5 #{i} {time.time()}", "meeting_id": "load", "ghost_mode": True})
+                for i in range(8)
+            )))
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            response = await client.get("/")
+            elapsed = time.perf_counter() - started
+            await slow
+            return response.status_code, elapsed
+
+    status_code, elapsed = asyncio.run(scenario())
+    assert status_code == 200
+    assert elapsed < 0.5
+
+
+def test_concurrent_uploads_are_isolated(main):
+    main.get_audio_service().client = FakeWhisper(0.05)
+    before = set(os.listdir("."))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def upload(i):
+                # Same client filename for every upload; small and >1 MB (disk-spooled) bodies
+                body = (f"speaker-{i} " * (1 if i % 2 else 120000)).encode()
+                response = await client.post("/api/transcribe", files={"file": ("blob.webm", body, "audio/webm")})
+                return body.decode(), response.json()["transcript"]
+            return await asyncio.gather(*(upload(i) for i in range(40)))
+
+    for sent, transcript in asyncio.run(scenario()):
+        assert transcript == sent
+    assert set(os.listdir(".")) == before
+
+
+def test_oversized_upload_is_rejected(main):
+    main.get_audio_service().client = FakeWhisper(0)
+    limit = main.MAX_AUDIO_BYTES
+    main.MAX_AUDIO_BYTES = 1024
+    try:
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/transcribe", files={"file": ("a.wav", b"x" * 4096, "audio/wav")})
+        assert asyncio.run(scenario()).status_code == 413
+    finally:
+        main.MAX_AUDIO_BYTES = limit
@@ -0,0 +1,60 @@
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+FILLER = "We went through the quarterly numbers line by line and compared them with the forecast. "
+
+
+def test_pack_keeps_the_newest_memories_within_budget():
+    from services.context_packer import estimate_tokens, pack
+
+    memories = [
+        {"id": f"m{i}", "text": f"Meeting {i}. " + FILLER * (40 if i == 7 else 3), "metadata": {"ts": i}}
+        for i in range(10)
+    ]
+    packed = pack(memories, budget=300, item_budget=100)
+
+    assert packed.ids[0] == "m9"
+    assert packed.ids == sorted(packed.ids, reverse=True)
+    assert packed.tokens <= 300 and estimate_tokens(packed.text) <= 300
+    # The one long meeting is cut down instead of filling the whole budget
+    assert "m7" in packed.ids and packed.truncated == 1
+    assert packed.omitted == 10 - len(packed.ids) > 0
+
+
+def test_long_transcripts_keep_their_scheduling_sentences():
+    from services.context_packer import estimate_tokens, select_sentences, split_to_budget
+    from services.intent_filter import has_scheduling_intent
+
+    transcript = FILLER * 200 + "Let's schedule the design review for next Tuesday at 3pm. " + FILLER * 200
+    fitted = select_sentences(transcript, 200, has_scheduling_intent)
+    assert "next Tuesday at 3pm" in fitted
+    assert estimate_tokens(fitted) <= 200
+
+    parts = split_to_budget(transcript, 500)
+    assert len(parts) > 1
+    assert all(estimate_tokens(part) <= 500 for part in parts)
+
+
+def test_prompt_size_does_not_grow_with_the_transcript():
+    import services.calendar_service as calendar_module
+    from services.context_packer import estimate_tokens
+
+    prompts = []
+
+    def chat(request):
+        prompts.append(request["messages"][1]["content"])
+        return '{"events": []}'
+
+    server = FakeGroqServer(chat=chat).start()
+    budget = calendar_module.EXTRACTION_CONTEXT_TOKENS
+    calendar_module.EXTRACTION_CONTEXT_TOKENS = 300
+    try:
+        service = calendar_module.CalendarService(client=Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        service.extract_calendar_intent(FILLER * 500 + "Budget sync tomorrow at 10.", "Friday, February 27, 2026")
+    finally:
+        calendar_module.EXTRACTION_CONTEXT_TOKENS = budget
+        server.stop()
+
+    assert "Budget sync tomorrow at 10." in prompts[0]
+    assert estimate_tokens(prompts[0]) < 500
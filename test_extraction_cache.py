@@ -0,0 +1,62 @@
+import time
+
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+from services.cache_service import ExtractionCache, MISSING
+
+EVENTS = [{"title": "Design review", "date": "2026-03-03", "time": "10:00", "description": ""}]
+
+
+def test_entries_fall_through_from_memory_to_sqlite(tmp_path):
+    path = str(tmp_path / "extraction.db")
+    writer = ExtractionCache(path=path)
+    writer.set("k", EVENTS)
+    assert writer.get("k") == EVENTS
+    assert writer.stats()["memory_hits"] == 1
+
+    # A restarted (or second) worker starts with an empty LRU and reads the table
+    reader = ExtractionCache(path=path)
+    assert reader.get("k") == EVENTS
+    assert reader.get("k") == EVENTS
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    assert reader.get("other") is MISSING and reader.stats()["misses"] == 1
+
+
+def test_entries_expire_in_both_tiers(tmp_path):
+    path = str(tmp_path / "extraction.db")
+    cache = ExtractionCache(path=path, ttl_seconds=0.1)
+    cache.set("k", EVENTS)
+    time.sleep(0.15)
+    assert cache.get("k") is MISSING
+    assert ExtractionCache(path=path, ttl_seconds=0.1).get("k") is MISSING
+    # Expired rows are pruned when a cache is opened
+    assert cache._conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0] == 0
+
+
+def test_keys_ignore_whitespace_case_and_unicode_form_but_not_wording():
+    key = ExtractionCache.make_key("Let's meet  at\n10 in the Café", "Friday", "model", "3")
+    assert key == ExtractionCache.make_key("let's MEET at 10 in the café ", "friday", "model", "3")
+    assert key != ExtractionCache.make_key("Let's meet at 11 in the Café", "Friday", "model", "3")
+    # Parts are delimited, so shifting text between them changes the key
+    assert ExtractionCache.make_key("ab", "c") != ExtractionCache.make_key("a", "bc")
+
+
+def test_a_new_prompt_version_misses_the_cache(tmp_path, monkeypatch):
+    import services.calendar_service as calendar_module
+
+    monkeypatch.setenv("AETHER_EXTRACTION_CACHE_PATH", str(tmp_path / "extraction.db"))
+    server = FakeGroqServer().start()
+    try:
+        service = calendar_module.CalendarService(client=Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        transcript = "Let's schedule the design review for tomorrow at 10."
+        service.extract_calendar_intent(transcript, "Friday, February 27, 2026")
+        service.extract_calendar_intent("  let's schedule the DESIGN review for tomorrow at 10. ", "Friday, February 27, 2026")
+        assert server.requests == 1
+
+        monkeypatch.setattr(calendar_module, "PROMPT_VERSION", calendar_module.PROMPT_VERSION + "-next")
+        service.extract_calendar_intent(transcript, "Friday, February 27, 2026")
+        assert server.requests == 2
+    finally:
+        server.stop()
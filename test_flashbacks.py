@@ -0,0 +1,89 @@
+import json
+import base64
+import asyncio
+
+import httpx
+import pytest
+
+
+def get(main, path, **params):
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, params=params)
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def archive(main, memory_service_factory):
+    """A service with 23 memories of user "pat", in three groups sharing a timestamp each."""
+    service = memory_service_factory()
+    service.add_memories([
+        {"text": f"Meeting {i}. " + "We walked through every open item on the board in order. " * (8 if i == 0 else 1),
+         "meeting_id": f"m{i}", "timestamp": f"2026-03-0{1 + i % 3}T09:00:00"}
+        for i in range(23)
+    ], "pat")
+    previous = main.providers.memory.override(service)
+    yield service
+    main.providers.memory.override(previous)
+
+
+def test_pages_cover_every_memory_once_in_order(main, archive):
+    expected = [m["id"] for m in archive.get_all_memories("pat")]
+    assert len(expected) == 23
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"query": "all", "user_id": "pat", "limit": 5, "fields": "ids"}
+        if cursor:
+            params["cursor"] = cursor
+        body = get(main, "/flashbacks", **params).json()
+        assert len(body["flashbacks"]) <= 5
+        seen.extend(item["id"] for item in body["flashbacks"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    # Eight memories share each timestamp; the id breaks the tie, so none is skipped or repeated at a page edge
+    assert pages == 5
+    assert seen == expected
+
+
+def test_ties_on_the_timestamp_are_ordered_by_id(archive):
+    rows = archive.list_memories("pat", limit=30, fields="ids")["items"]
+    keys = [(row["metadata"]["ts"], row["id"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert len({ts for ts, _ in keys}) == 3
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"42").decode(),
+    base64.urlsafe_b64encode(b'["soon", "m1"]').decode(),
+    base64.urlsafe_b64encode(b"[1]").decode(),
+])
+def test_malformed_cursors_are_rejected(main, archive, cursor):
+    response = get(main, "/flashbacks", query="all", user_id="pat", limit=5, cursor=cursor)
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid cursor"}
+
+
+def test_snippets_are_trimmed_at_a_word(main, archive):
+    import services.memory_service as memory_module
+
+    full = {m["id"]: m["text"] for m in archive.get_all_memories("pat")}
+    items = get(main, "/flashbacks", query="all", user_id="pat", limit=30, fields="snippet").json()["flashbacks"]
+    assert len(items) == 23
+    long = [item for item in items if len(full[item["id"]]) > memory_module.SNIPPET_CHARS]
+    assert len(long) == 1
+    snippet = long[0]["text"]
+    assert snippet.endswith("…") and len(snippet) <= memory_module.SNIPPET_CHARS + 1
+    assert full[long[0]["id"]].startswith(snippet[:-1]) and full[long[0]["id"]][len(snippet) - 1] == " "
+    assert all(item["text"] == full[item["id"]] for item in items if item not in long)
+
+
+def test_ndjson_streams_one_memory_per_line(main, archive):
+    response = get(main, "/flashbacks", query="all", user_id="pat", format="ndjson")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == archive.get_all_memories("pat")
@@ -0,0 +1,83 @@
+import os
+import json
+
+import pytest
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+from services.intent_filter import has_scheduling_intent, resolve_dates
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "intent_corpus.jsonl")
+# Friday
+TODAY = "Friday, February 27, 2026"
+
+
+def corpus():
+    with open(CORPUS, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def test_every_scheduling_line_in_the_corpus_reaches_the_llm():
+    missed = [r["text"] for r in corpus() if r["has_event"] and not has_scheduling_intent(r["text"])]
+    assert missed == []
+
+
+def test_only_known_false_positives_get_through():
+    passed = [r["text"] for r in corpus() if not r["has_event"] and has_scheduling_intent(r["text"])]
+    # Numbers and past weekdays look like times; the filter errs towards recall
+    assert passed == [
+        "Conversion sits at 3 percent after the redesign.",
+        "Last Monday's outage was caused by a DNS misconfiguration.",
+    ]
+    assert sum(not r["has_event"] for r in corpus()) > 10 * len(passed)
+
+
+def test_the_prefilter_can_be_turned_off(tmp_path, monkeypatch):
+    import services.calendar_service as calendar_module
+
+    monkeypatch.setenv("AETHER_EXTRACTION_CACHE_PATH", str(tmp_path / "extraction.db"))
+    server = FakeGroqServer().start()
+    try:
+        service = calendar_module.CalendarService(client=Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        chatter = "The redesign improved the onboarding flow a lot."
+        assert service.extract_calendar_intent(chatter, TODAY) == []
+        assert server.requests == 0 and service.prefilter_skips == 1
+
+        monkeypatch.setattr(calendar_module, "PREFILTER_ENABLED", False)
+        assert service.extract_calendar_intent(chatter, TODAY) == []
+        assert server.requests == 1
+    finally:
+        server.stop()
+
+
+@pytest.mark.parametrize("text, dates", [
+    ("Can we do it today?", {"today": "2026-02-27"}),
+    ("Ship it tomorrow", {"tomorrow": "2026-02-28"}),
+    ("Demo the day after tomorrow", {"day after tomorrow": "2026-03-01"}),
+    ("Sync on Tuesday", {"on Tuesday": "2026-03-03"}),
+    ("Review this Wednesday", {"this Wednesday": "2026-03-04"}),
+    ("Standup Monday", {"Monday": "2026-03-02"}),
+    ("Launch on March 4th", {"March 4th": "2026-03-04"}),
+    ("Offsite on the 10th of April", {"10th of April": "2026-04-10"}),
+    # A past month/day means next year's
+    ("Kickoff January 5", {"January 5": "2027-01-05"}),
+    ("Freeze on 2026-04-01", {"2026-04-01": "2026-04-01"}),
+])
+def test_unambiguous_dates_are_resolved(text, dates):
+    assert {r["phrase"]: r["date"] for r in resolve_dates(text, TODAY)} == dates
+
+
+@pytest.mark.parametrize("text", [
+    "Let's meet next Tuesday",
+    "The coming Thursday works",
+    # Said on a Friday: today or a week out
+    "Friday works for me",
+    "Feb 30 or 2026-13-01",
+])
+def test_ambiguous_or_invalid_dates_are_left_to_the_llm(text):
+    assert resolve_dates(text, TODAY) == []
+
+
+def test_dates_are_not_resolved_without_a_known_current_date():
+    assert resolve_dates("tomorrow", "sometime soon") == []
+    assert resolve_dates("tomorrow", "2026-02-27") == [{"phrase": "tomorrow", "date": "2026-02-28"}]
@@ -0,0 +1,143 @@
+import json
+import time
+import asyncio
+
+import httpx
+
+from services.job_service import JobQueue
+
+TRANSCRIPT = {"text": "Design review tomorrow at 10", "meeting_id": "jobs", "ghost_mode": True}
+
+
+class FakeCalendar:
+    """Extraction stand-in: echoes the transcript as one event, fails on request."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def extract_calendar_intent(self, transcript, current_date=None):
+        time.sleep(self.latency)
+        if "fail" in transcript:
+            raise ValueError("extraction exploded")
+        return [{"title": transcript}]
+
+
+def with_jobs(main, monkeypatch, scenario, calendar=None, **queue_options):
+    """Runs scenario(client) against the app with a fresh job queue on the same event loop."""
+    queue = JobQueue(handlers={"process_transcript": main._transcript_job}, **queue_options)
+    monkeypatch.setattr(main, "job_queue", queue)
+    previous_memory = main.providers.memory.override(object())
+    previous_calendar = main.providers.calendar.override(calendar or FakeCalendar())
+
+    async def run():
+        await queue.start()
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+        finally:
+            await queue.stop()
+    try:
+        return asyncio.run(run())
+    finally:
+        main.providers.memory.override(previous_memory)
+        main.providers.calendar.override(previous_calendar)
+
+
+async def poll(client, url, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = (await client.get(url)).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"{url} did not finish")
+
+
+def test_async_transcripts_are_accepted_and_polled_to_completion(main, monkeypatch):
+    async def scenario(client):
+        accepted = await client.post("/process-transcript", params={"mode": "async"}, json=TRANSCRIPT)
+        preferred = await client.post("/process-transcript", json=dict(TRANSCRIPT, text="Please fail this one"),
+                                      headers={"Prefer": "respond-async"})
+        return accepted, await poll(client, accepted.headers["Location"]), preferred, await poll(client, preferred.headers["Location"])
+
+    accepted, done, preferred, failed = with_jobs(main, monkeypatch, scenario)
+
+    assert accepted.status_code == 202 and preferred.status_code == 202
+    body = accepted.json()
+    assert accepted.headers["Location"] == body["status_url"] == f"/api/jobs/{body['job_id']}"
+    assert body["events_url"] == f"/api/jobs/{body['job_id']}/events"
+
+    assert done["status"] == "succeeded" and done["error"] is None
+    assert done["result"]["calendar_events"] == [{"title": TRANSCRIPT["text"]}]
+    assert {name: stage["status"] for name, stage in done["stages"].items()} == {
+        "memory_sync": "done", "calendar_extraction": "done",
+    }
+    assert done["total_seconds"] >= done["queued_seconds"] >= 0
+
+    assert failed["status"] == "failed" and failed["result"] is None
+    assert failed["error"] == "extraction exploded"
+    assert failed["stages"]["calendar_extraction"]["status"] == "failed"
+
+
+def test_job_events_stream_until_done(main, monkeypatch):
+    async def scenario(client):
+        job_id = (await client.post("/process-transcript", params={"mode": "async"}, json=TRANSCRIPT)).json()["job_id"]
+        async with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+            return response.headers["content-type"], await response.aread()
+
+    content_type, body = with_jobs(main, monkeypatch, scenario, calendar=FakeCalendar(latency=0.1))
+
+    assert content_type.startswith("text/event-stream")
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and set(names[:-1]) == {"update"}
+    assert events[-1][1]["status"] == "succeeded"
+    # Stage progress is streamed as it happens, not only the final state
+    assert any(data["stages"].get("calendar_extraction", {}).get("status") == "running" for _, data in events)
+
+
+def test_a_full_queue_turns_clients_away(main, monkeypatch):
+    async def scenario(client):
+        responses = []
+        for i in range(3):
+            responses.append(await client.post("/process-transcript", params={"mode": "async"},
+                                               json=dict(TRANSCRIPT, text=f"Sync #{i}")))
+        return responses
+
+    responses = with_jobs(main, monkeypatch, scenario, calendar=FakeCalendar(latency=0.5), workers=1, max_pending=1)
+    # One job running, one waiting, no room for a third
+    assert [r.status_code for r in responses] == [202, 202, 503]
+    assert responses[2].headers["Retry-After"] == "2"
+
+
+def test_jobs_that_run_too_long_fail_with_a_timeout():
+    async def slow(job):
+        await asyncio.sleep(5)
+
+    async def run():
+        queue = JobQueue(handlers={"slow": slow}, workers=1, timeout_seconds=0.1)
+        await queue.start()
+        try:
+            job = queue.submit("slow", None)
+            while job.status not in ("succeeded", "failed"):
+                await queue.wait_for_change(job, job.version, timeout=1)
+            return job
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(run())
+    assert job.status == "failed"
+    assert job.error == "Timed out after 0.1s"
+    assert job.finished_at - job.started_at < 1
+
+
+def test_unknown_jobs_are_not_found(main, monkeypatch):
+    async def scenario(client):
+        return await client.get("/api/jobs/missing"), await client.get("/api/jobs/missing/events")
+
+    status, events = with_jobs(main, monkeypatch, scenario)
+    assert status.status_code == 404 and events.status_code == 404
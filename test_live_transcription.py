@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+from groq import Groq
+from starlette.testclient import TestClient
+
+from fake_servers import FakeGroqServer
+from test_audio_chunking import hear_tones
+
+RATE = 16000
+
+
+def pcm(frequency: float, seconds: float) -> bytes:
+    t = np.arange(int(seconds * RATE)) / RATE
+    wave = 0.3 * np.sin(2 * np.pi * frequency * t) if frequency else np.zeros_like(t)
+    return (wave * 32767).astype("<i2").tobytes()
+
+
+def stream(websocket, audio: bytes, frame_ms: int = 100):
+    step = RATE * 2 * frame_ms // 1000
+    for offset in range(0, len(audio), step):
+        websocket.send_bytes(audio[offset: offset + step])
+
+
+def test_segments_are_finalized_at_each_pause(main):
+    server = FakeGroqServer(latency=0.1, transcribe=hear_tones).start()
+    main.get_audio_service().client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+    events = []
+    try:
+        with TestClient(main.app) as client, client.websocket_connect("/ws/transcribe") as websocket:
+            for frequency in (300, 400, 500):
+                stream(websocket, pcm(frequency, 1.2) + pcm(0, 1.0))
+            # A long stretch of speech gets a partial before its pause arrives; the gap lets
+            # the previous segment's partial finish so this one's can be scheduled
+            for _ in range(2):
+                stream(websocket, pcm(600, 2.0))
+                time.sleep(0.5)
+            stream(websocket, pcm(0, 1.0))
+            websocket.send_json({"type": "stop"})
+            while not events or events[-1]["type"] != "end":
+                events.append(websocket.receive_json())
+    finally:
+        server.stop()
+
+    finals = [event for event in events if event["type"] == "final"]
+    assert [event["text"] for event in finals] == ["tone300", "tone400", "tone500", "tone600"]
+    assert [event["segment"] for event in finals] == [0, 1, 2, 3]
+    assert all(event["start"] < event["end"] for event in finals)
+    assert any(event["type"] == "partial" and event["segment"] == 3 for event in events)
+    # Each final arrives one transcription round-trip after its pause, not at the end of the stream
+    assert max(event["latency_ms"] for event in finals) < 1000
+    assert events[-1] == {"type": "end", "segments": 4}
+
+
+def test_partials_cover_only_the_audio_since_the_last_one():
+    from services.live_transcription import LiveSegmenter, pcm16_to_float
+
+    segmenter = LiveSegmenter(partial_interval_ms=1000, max_segment_seconds=30)
+    sizes = []
+    for _ in range(12):
+        assert segmenter.feed(pcm16_to_float(pcm(600, 0.5))) == []
+        if segmenter.partial_due():
+            index, samples = segmenter.snapshot()
+            assert index == 0
+            sizes.append(samples.size)
+    # Six seconds of unbroken speech: each partial is about one interval long, not the whole segment so far
+    assert len(sizes) >= 5
+    assert max(sizes) <= RATE * 1.1
+    assert not segmenter.partial_due()
+
+    final = segmenter.flush()
+    assert final["samples"].size == 6 * RATE
+    # The next segment's first partial starts at its own beginning
+    segmenter.feed(pcm16_to_float(pcm(300, 1.5)))
+    assert segmenter.partial_due() and segmenter.snapshot()[1].size <= 1.5 * RATE
@@ -0,0 +1,94 @@
+import re
+import json
+import threading
+
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def run_threads(count, target):
+    results = [None] * count
+
+    def run(i):
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_limit_backs_off_on_429_and_every_call_still_succeeds():
+    from services.llm_gateway import LLMGateway, LLMUnavailable
+    server = FakeGroqServer(latency=0.05, max_in_flight=4, retry_after_ms=20).start()
+    client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+    gateway = LLMGateway(retries=8)
+    try:
+        # Distinct prompts, so none of them is deduplicated
+        results = run_threads(24, lambda i: gateway.chat(
+            client, model="burst-model", messages=[{"role": "user", "content": f"call {i}"}]
+        ))
+        stats = gateway.stats()["burst-model"]
+
+        # A provider that never lets up ends in a 503-able error, not an empty answer
+        server.max_in_flight = 0
+        try:
+            LLMGateway(retries=1).chat(client, model="burst-model", messages=MESSAGES)
+            raise AssertionError("expected LLMUnavailable")
+        except LLMUnavailable as e:
+            assert e.retry_after is not None and e.retry_after < 1
+    finally:
+        server.stop()
+
+    assert all(r.choices[0].message.content == '{"events": []}' for r in results)
+    assert server.throttled > 0
+    assert stats["throttled"] > 0
+    # Halved on the first 429s; additive increase has not climbed back to the ceiling yet
+    assert stats["limit"] < stats["ceiling"]
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_identical_prompts_in_flight_are_sent_once():
+    from services.llm_gateway import LLMGateway
+    server = FakeGroqServer(latency=0.3).start()
+    client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+    gateway = LLMGateway()
+    try:
+        results = run_threads(6, lambda i: gateway.chat(client, model="dedupe-model", messages=MESSAGES))
+    finally:
+        server.stop()
+    assert server.requests == 1
+    assert len({id(r) for r in results}) == 1
+
+
+def test_short_transcripts_are_micro_batched_and_split_back_out():
+    import services.calendar_service as calendar_module
+
+    def chat(request):
+        prompt = request["messages"][1]["content"]
+        segments = re.findall(r'Segment (\d+): "([^"]+)"', prompt)
+        return json.dumps({"results": [
+            {"segment": int(i), "events": [{"title": text.split(" tomorrow")[0], "date": "2026-03-03", "time": "10:00", "description": ""}]}
+            for i, text in segments
+        ]})
+
+    server = FakeGroqServer(latency=0.05, chat=chat).start()
+    window = calendar_module.BATCH_WINDOW_MS
+    calendar_module.BATCH_WINDOW_MS = 150
+    try:
+        service = calendar_module.CalendarService(client=Groq(api_key="test-key", base_url=server.url, max_retries=0))
+        names = ["Design review", "Budget sync", "Hiring panel", "Launch prep", "Vendor call"]
+        results = run_threads(len(names), lambda i: service.extract_calendar_intent(
+            f"{names[i]} tomorrow at 10", "Friday, February 27, 2026"
+        ))
+    finally:
+        calendar_module.BATCH_WINDOW_MS = window
+        server.stop()
+
+    assert server.requests == 1
+    assert [events[0]["title"] for events in results] == names
@@ -0,0 +1,66 @@
+import re
+import json
+import asyncio
+import logging
+
+import httpx
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+
+def test_profile_header_and_metrics_cover_routes_stages_and_tokens(main):
+    server = FakeGroqServer(latency=0.05).start()
+    calendar_service = main.get_calendar_service()
+    original = calendar_service.client
+    requests_before = main.HTTP_SECONDS.count(method="POST", route="/process-transcript")
+    calendar_service.client = Groq(api_key="test-key", base_url=server.url, max_retries=0)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            profiled = await client.post(
+                "/process-transcript",
+                json={"text": f"Sync with Priya tomorrow at 10 {id(server)}", "meeting_id": "m", "ghost_mode": True},
+                headers={"X-Aether-Profile": "1"},
+            )
+            plain = await client.get("/")
+            scrape = await client.get("/metrics")
+            return profiled, plain, scrape
+
+    try:
+        profiled, plain, scrape = asyncio.run(scenario())
+    finally:
+        calendar_service.client = original
+        server.stop()
+
+    assert profiled.status_code == 200
+    # The Groq call ran on a worker thread but is attributed to this request
+    timing = profiled.headers["Server-Timing"]
+    groq_ms = float(re.search(r"groq\.chat;dur=([\d.]+)", timing).group(1))
+    assert groq_ms >= 50
+    assert "total;dur=" in timing
+    assert "Server-Timing" not in plain.headers and plain.headers["X-Request-ID"]
+
+    body = scrape.text
+    assert scrape.headers["content-type"].startswith("text/plain")
+    # The registry is process-wide, so count relative to what earlier tests left in it
+    count = f'aether_http_request_duration_seconds_count{{method="POST",route="/process-transcript"}} {requests_before + 1}'
+    assert count in body
+    assert re.search(r'aether_stage_duration_seconds_bucket\{stage="groq.chat",le="\+Inf"\} [1-9]', body)
+    assert re.search(r'aether_llm_tokens_total\{model="[^"]+",kind="prompt"\} [1-9]', body)
+    assert 'aether_cache_hit_ratio{cache="auth_tokens"}' in body
+
+
+def test_logs_are_json_with_request_id_and_extra_fields():
+    import services.logging_setup as logging_setup
+    record = logging.LogRecord("aether.audio", logging.WARNING, __file__, 1, "Whisper failed", None, None)
+    record.chunk = 3
+    token = logging_setup.request_id.set("abc123")
+    try:
+        entry = json.loads(logging_setup.JsonFormatter().format(record))
+    finally:
+        logging_setup.request_id.reset(token)
+    assert entry["message"] == "Whisper failed"
+    assert entry["level"] == "warning"
+    assert (entry["request_id"], entry["chunk"]) == ("abc123", 3)
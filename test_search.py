@@ -0,0 +1,85 @@
+import re
+
+from services.keyword_index import KeywordIndex, tokenize
+from services.cache_service import LRUCache, MISSING
+from services.partitioning import collection_name
+
+
+def build_index():
+    index = KeywordIndex()
+    chunks = [
+        ("c1", "We profiled the NumPy vectorization of the ETL job.", ("m1", 100.0, "standup")),
+        ("c2", "Ticket JIRA-4521 blocks the release, Priya owns it.", ("m2", 200.0, "release")),
+        ("c3", "The release retro: JIRA-4521 is fixed, NumPy pinned.", ("m3", 300.0, "release")),
+        ("c4", "Lunch plans and chatter about the weather.", ("m4", 400.0, "standup")),
+    ]
+    index.add("alice", [c[0] for c in chunks], [c[1] for c in chunks], [c[2] for c in chunks])
+    return index
+
+
+def test_identifiers_are_indexed_whole_and_by_part():
+    assert tokenize("See JIRA-4521") == ["see", "jira-4521", "jira", "4521"]
+
+
+def test_exact_terms_rank_and_filters_apply():
+    index = build_index()
+
+    assert [hit[0] for hit in index.search("alice", "numpy", 10)][0] == "c1"
+    assert {hit[0] for hit in index.search("alice", "4521", 10)} == {"c2", "c3"}
+    assert [hit[0] for hit in index.search("alice", "4521", 10, meeting_id="release", since=250)] == ["c3"]
+    assert index.search("alice", "numpy", 10, until=50) == []
+    # Other users never see alice's chunks
+    assert index.search("bob", "numpy", 10) == []
+
+
+def test_reindexing_a_chunk_is_a_no_op():
+    index = build_index()
+    before = index.search("alice", "weather", 10)
+    index.add("alice", ["c4"], ["weather weather weather"], [("m4", 400.0, "standup")])
+    assert index.search("alice", "weather", 10) == before
+
+
+def test_result_cache_respects_its_byte_budget():
+    cache = LRUCache(max_entries=100, max_bytes=10)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+    assert cache.get("a") is MISSING
+    assert cache.get("c") == "zzzz"
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is MISSING
+    assert cache.stats()["bytes"] == 8
+
+
+def test_partition_names_are_stable_and_chroma_safe():
+    name = collection_name("alice@example.com / ü", "user")
+    assert name == collection_name("alice@example.com / ü", "user")
+    assert name != collection_name("bob", "user")
+    assert re.fullmatch(r"[a-z0-9_]{3,63}", name)
+    buckets = {collection_name(f"user{i}", "bucket", buckets=8) for i in range(200)}
+    assert len(buckets) == 8
+    assert collection_name("alice", "shared") == "meeting_memories"
+
+
+def test_unmigrated_memories_stay_visible_until_the_shared_collection_is_dropped(memory_service_factory, monkeypatch):
+    import services.memory_service as memory_module
+    monkeypatch.setattr(memory_module, "PARTITIONING_SETTING", None)
+
+    service = memory_service_factory()
+    assert service.partitioning == "user"
+    # A row as the pre-partitioning code wrote it
+    service.chroma_client.get_or_create_collection(
+        "meeting_memories", embedding_function=service.embedding_function
+    ).add(ids=["msg_1a2b3c4d"], documents=["Legacy roadmap note."],
+          metadatas=[{"meeting_id": "old", "timestamp": "2025-01-01T10:00:00", "username": "early"}])
+
+    reopened = memory_service_factory()
+    assert reopened.partitioning == "shared"
+    assert [m["text"] for m in reopened.get_all_memories("early")] == ["Legacy roadmap note."]
+
+    # An explicit setting wins
+    monkeypatch.setattr(memory_module, "PARTITIONING_SETTING", "user")
+    assert memory_service_factory().partitioning == "user"
+    reopened.chroma_client.delete_collection("meeting_memories")
+    monkeypatch.setattr(memory_module, "PARTITIONING_SETTING", None)
+    assert memory_service_factory().partitioning == "user"
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+# Runs in a fresh interpreter so the import really is cold and GROQ_API_KEY really is unset
+PROBE = """
+import sys, json, asyncio, httpx
+sys.path.insert(0, sys.argv[1])
+import main
+heavy = sorted(m for m in ("chromadb", "groq", "googleapiclient") if m in sys.modules)
+
+async def scenario():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        health = await client.get("/healthz")
+        transcribe = await client.post("/api/transcribe", files={"file": ("a.wav", b"x", "audio/wav")})
+        ready = await client.get("/readyz")
+        return health.status_code, transcribe.status_code, ready.status_code, ready.json()
+
+health, transcribe, ready, body = asyncio.run(scenario())
+print(json.dumps({"heavy": heavy, "health": health, "transcribe": transcribe, "ready": ready, "body": body}))
+"""
+
+
+def test_app_starts_without_building_services_or_a_groq_key():
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    env["AETHER_WARMUP"] = "0"
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, BACKEND_DIR],
+        cwd=tempfile.mkdtemp(prefix="aether_test_"), env=env, capture_output=True, text=True, timeout=120,
+    )
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+
+    # Nothing heavy is imported until a request needs it
+    assert result["heavy"] == []
+    assert result["health"] == 200
+    # A missing key only takes down what depends on it
+    assert result["transcribe"] == 503
+    assert result["ready"] == 503
+    assert "GROQ_API_KEY" in result["body"]["services"]["groq"]["error"]
+    assert result["body"]["services"]["memory"]["ready"] is False
@@ -0,0 +1,135 @@
+import time
+import tempfile
+
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+
+LONG = "Beta budget review. " + "We compared every line of the forecast with actual spend. " * 30
+
+
+def summarizer(prompts):
+    """Fake Groq chat: summaries name their first words, themes calls get a fixed answer."""
+    def chat(request):
+        system, prompt = (m["content"] for m in request["messages"])
+        prompts.append(prompt)
+        if "data analyst" in system:
+            return '{"themes": [{"name": "Roadmap", "value": 7}]}'
+        return "SUMMARY " + " ".join(prompt.split(": ", 1)[1].split()[:4])
+    return chat
+
+
+def build_service(server):
+    import services.embeddings as embeddings_module
+    import services.memory_service as memory_module
+    from services.summary_store import SummaryRefresher
+
+    path, kind = memory_module.CHROMA_PATH, embeddings_module.EMBEDDINGS
+    memory_module.CHROMA_PATH = tempfile.mkdtemp(prefix="aether_test_chroma_")
+    # No model download in tests
+    embeddings_module.EMBEDDINGS = "hashing"
+    try:
+        service = memory_module.MemoryService(client=Groq(api_key="test-key", base_url=server.url, max_retries=0))
+    finally:
+        memory_module.CHROMA_PATH, embeddings_module.EMBEDDINGS = path, kind
+    # Requests are recorded but never run on their own; the tests refresh explicitly
+    service.summary_refresher = SummaryRefresher(lambda *args: {}, delay=3600)
+    return service
+
+
+def test_memories_are_summarized_once_and_only_touched_rollups_rebuilt():
+    prompts = []
+    server = FakeGroqServer(chat=summarizer(prompts)).start()
+    try:
+        service = build_service(server)
+        service.add_memories([
+            {"text": "Alpha kickoff. We agreed on the roadmap.", "meeting_id": "alpha", "timestamp": "2026-02-02T10:00:00"},
+            {"text": "Alpha follow-up on hiring.", "meeting_id": "alpha", "timestamp": "2026-02-03T10:00:00"},
+            {"text": LONG, "meeting_id": "beta", "timestamp": "2026-03-10T10:00:00"},
+        ], "dana")
+
+        first = service.refresh_summaries("dana")
+        # Short memories are their own summary; one call for the long one, one per rollup
+        # (two meetings, two weeks, two months)
+        assert first == {"memories": 3, "summarized": 3, "rollups": 6}
+        assert server.requests == 7
+        meeting = {s["metadata"]["key"]: s for s in service.list_summaries("dana", "meeting")}
+        assert meeting["alpha"]["text"] == "SUMMARY Alpha follow-up on hiring."
+        assert meeting["alpha"]["metadata"]["memory_count"] == 2
+        assert [s["metadata"]["key"] for s in service.list_summaries("dana", "month")] == ["2026-03", "2026-02"]
+
+        assert service.refresh_summaries("dana") == {"memories": 3, "summarized": 0, "rollups": 0}
+        assert server.requests == 7
+
+        memory_id = service.add_memory("Beta budget approved.", "beta", "dana")
+        again = service.refresh_summaries("dana", [memory_id])
+        # Beta's rollup and the current week and month; alpha is untouched
+        assert again == {"memories": 1, "summarized": 1, "rollups": 3}
+        assert server.requests == 10
+        assert service.search_summaries("alpha roadmap hiring", "dana")[0]["metadata"]["key"] == "alpha"
+
+        # Analytics reads the stored summary of the long transcript, not the transcript
+        prompts.clear()
+        analytics = service.get_analytics("dana")
+        assert analytics["themes"] == [{"name": "Roadmap", "value": 7}]
+        assert "SUMMARY Beta budget review." in prompts[0] and "actual spend" not in prompts[0]
+
+        service.delete_user("dana")
+        assert service.list_summaries("dana", "meeting") == []
+    finally:
+        server.stop()
+
+
+def test_rollup_input_is_capped_however_long_the_meeting_runs():
+    import services.memory_service as memory_module
+    from services.context_packer import estimate_tokens
+
+    prompts = []
+    server = FakeGroqServer(chat=summarizer(prompts)).start()
+    budget = memory_module.ROLLUP_CONTEXT_TOKENS
+    memory_module.ROLLUP_CONTEXT_TOKENS = 200
+    try:
+        service = build_service(server)
+        for batch in range(3):
+            result = service.add_memories([
+                {"text": f"Segment {batch}-{i} of the never-ending standup about release {i}.",
+                 "meeting_id": "standup", "timestamp": f"2026-05-0{batch + 4}T10:{i:02d}:00"}
+                for i in range(20)
+            ], "erin")
+            prompts.clear()
+            service.refresh_summaries("erin", result["memory_ids"])
+            # One capped call per rollup touched (meeting, week, month), no per-memory calls
+            assert len(prompts) == 3
+            assert all(estimate_tokens(prompt) < 300 for prompt in prompts)
+    finally:
+        memory_module.ROLLUP_CONTEXT_TOKENS = budget
+        server.stop()
+
+
+def test_bulk_imports_only_summarize_when_asked():
+    server = FakeGroqServer().start()
+    try:
+        service = build_service(server)
+        service.add_memories([{"text": "Imported archive note.", "meeting_id": "import"}], "fay", summarize=False)
+        assert service.summary_refresher.pending == 0
+        service.add_memories([{"text": "Live note.", "meeting_id": "live"}], "fay")
+        assert service.summary_refresher.pending == 1
+    finally:
+        server.stop()
+    assert server.requests == 0
+
+
+def test_refreshes_are_coalesced_per_user():
+    from services.summary_store import SummaryRefresher
+
+    calls = []
+    refresher = SummaryRefresher(lambda username, ids: calls.append((username, ids)) or {}, delay=0.1)
+    for i in range(5):
+        refresher.request("dana", [f"m{i}"])
+    refresher.request("eli", ["x"])
+    deadline = time.time() + 5
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.2)
+    assert sorted(calls) == [("dana", ["m0", "m1", "m2", "m3", "m4"]), ("eli", ["x"])]
+    assert refresher.pending == 0
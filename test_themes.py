@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import numpy as np
+from groq import Groq
+
+from fake_servers import FakeGroqServer
+from services.embeddings import HashingEmbeddingFunction
+from services.theme_engine import ThemeEngine, kmeans, tokenize
+
+TOPICS = {
+    "budget": "budget forecast spend invoices finance quarter budget forecast spend",
+    "hiring": "hiring candidates interviews recruiter offers hiring candidates interviews",
+    "launch": "launch release checklist rollout marketing launch release checklist",
+}
+
+
+def memories(topic, count, start=0):
+    ids = [f"{topic}-{i}" for i in range(start, start + count)]
+    texts = [f"{TOPICS[topic]} note{i}" for i in range(start, start + count)]
+    return ids, texts
+
+
+def corpus(**counts):
+    ids, texts = [], []
+    for topic, count in counts.items():
+        topic_ids, topic_texts = memories(topic, count)
+        ids += topic_ids
+        texts += topic_texts
+    return ids, HashingEmbeddingFunction()(texts), texts
+
+
+def test_kmeans_separates_distinct_topics():
+    ids, embeddings, _ = corpus(budget=6, hiring=5, launch=4)
+    _, labels = kmeans(np.asarray(embeddings), 3, seed=0)
+    groups = [set(labels[i] for i, memory_id in enumerate(ids) if memory_id.startswith(topic)) for topic in TOPICS]
+    assert all(len(group) == 1 for group in groups)
+    assert len(set.union(*groups)) == 3
+
+
+def test_themes_are_counted_and_labelled_by_their_terms():
+    engine = ThemeEngine(n_themes=3)
+    engine.fit("ada", *corpus(budget=6, hiring=5, launch=4))
+
+    themes = engine.themes("ada")
+    assert [theme["value"] for theme in themes] == [6, 5, 4]
+    assert "budget" in themes[0]["terms"] and "hiring" in themes[1]["terms"] and "launch" in themes[2]["terms"]
+    assert themes[0]["name"] == " / ".join(term.title() for term in themes[0]["terms"])
+    # Stopwords and short tokens never make a label
+    assert tokenize("We think the team should ship it") == ["ship"]
+    assert engine.themes("nobody") == [] and engine.top_terms("nobody") == []
+
+
+def test_new_memories_are_folded_in_without_a_refit():
+    engine = ThemeEngine(n_themes=3, refit_growth=2.0)
+    ids, embeddings, texts = corpus(budget=6, hiring=5, launch=4)
+    engine.fit("ada", ids, embeddings, texts)
+    before = engine._users["ada"].centroids.copy()
+
+    new_ids, new_texts = memories("hiring", 3, start=100)
+    assert not engine.needs_refit("ada", len(ids) + len(new_ids))
+    # Known ids are skipped, so passing them again changes nothing
+    engine.update("ada", ids[:2] + new_ids, HashingEmbeddingFunction()(texts[:2] + new_texts), texts[:2] + new_texts)
+
+    assert {theme["terms"][0]: theme["value"] for theme in engine.themes("ada")}["hiring"] == 8
+    assert sum(theme["value"] for theme in engine.themes("ada")) == 18
+    assert engine.known_ids("ada") == set(ids) | set(new_ids)
+    changed = [not np.allclose(a, b) for a, b in zip(before, engine._users["ada"].centroids)]
+    assert changed.count(True) == 1
+
+
+def test_refits_happen_while_small_and_once_the_history_doubles():
+    engine = ThemeEngine(n_themes=2, refit_growth=2.0)
+    assert engine.needs_refit("ada", 3)
+    engine.fit("ada", *corpus(budget=2, hiring=2))
+    # Under n_themes * 4 memories every change refits
+    assert not engine.needs_refit("ada", 4) and engine.needs_refit("ada", 5)
+
+    engine.fit("ada", *corpus(budget=5, hiring=5))
+    assert not engine.needs_refit("ada", 19)
+    assert engine.needs_refit("ada", 20)
+    engine.drop("ada")
+    assert engine.needs_refit("ada", 10)
+
+
+def test_local_analytics_make_no_llm_call_and_bad_modes_are_rejected(main, memory_service_factory):
+    server = FakeGroqServer().start()
+    service = memory_service_factory(Groq(api_key="test-key", base_url=server.url, max_retries=0))
+    service.theme_engine = ThemeEngine(n_themes=2)
+    _, _, texts = corpus(budget=4, hiring=3)
+    service.add_memories([{"text": text, "meeting_id": f"m{i}"} for i, text in enumerate(texts)], "ada")
+    previous = main.providers.memory.override(service)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            local = await client.get("/api/analytics", params={"user_id": "ada", "mode": "local"})
+            typo = await client.get("/api/analytics", params={"user_id": "ada", "mode": "locl"})
+            return local, typo
+    try:
+        local, typo = asyncio.run(scenario())
+    finally:
+        main.providers.memory.override(previous)
+        server.stop()
+
+    assert local.status_code == 200
+    assert local.json()["totalMeetings"] == 7
+    assert sorted(theme["value"] for theme in local.json()["themes"]) == [3, 4]
+    assert typo.status_code == 422
+    assert server.requests == 0